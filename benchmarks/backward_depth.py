@@ -0,0 +1,75 @@
+"""
+Benchmark of `Tensor.backward` against the depth of the computational graph.
+
+Compares the recursive topological sort used before `Tensor._build_topo` with the
+iterative one, and shows the effect of reusing the cached order with `keep_graph=True`.
+
+Usage:
+    python benchmarks/backward_depth.py
+"""
+
+import os
+import sys
+import time
+from typing import List, Set
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.math import sum
+from clumsygrad.tensor import Tensor, TensorType
+
+DEPTHS = [100, 1_000, 10_000, 100_000]
+
+
+def recursive_topo(root: Tensor) -> List[Tensor]:
+    """The recursive topological sort that `Tensor.backward` used previously."""
+    topo_order: List[Tensor] = []
+    visited: Set[int] = set()
+    
+    def build_topo(node: Tensor):
+        if node._id in visited or not node._requires_grad:
+            return
+        visited.add(node._id)
+        
+        for parent in node._parents:
+            build_topo(parent)
+            
+        topo_order.append(node)
+    
+    build_topo(root)
+    return topo_order
+
+def build_chain(depth: int) -> Tensor:
+    x = Tensor(np.ones(16), tensor_type=TensorType.PARAMETER)
+    y = x
+    for _ in range(depth):
+        y = y * 1.0001
+    return sum(y)
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def main():
+    sys.setrecursionlimit(10_000)
+    print(f"{'depth':>8} {'recursive topo':>16} {'iterative topo':>16} {'backward':>10} {'cached backward':>16}")
+    
+    for depth in DEPTHS:
+        root = build_chain(depth)
+        
+        try:
+            recursive = f"{timed(lambda: recursive_topo(root)) * 1e3:14.2f}ms"
+        except RecursionError:
+            recursive = f"{'RecursionError':>16}"
+        
+        iterative = timed(root._build_topo)
+        first = timed(lambda: root.backward(keep_graph=True))
+        cached = timed(lambda: root.backward(keep_graph=True))
+        
+        print(f"{depth:>8} {recursive} {iterative * 1e3:14.2f}ms {first * 1e3:8.2f}ms {cached * 1e3:14.2f}ms")
+
+if __name__ == '__main__':
+    main()
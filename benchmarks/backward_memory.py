@@ -0,0 +1,68 @@
+"""
+Benchmark of peak memory and time spent in `Tensor.backward` on a wide MLP.
+
+Every hidden activation fans out into several heads, so parents receive many
+gradient contributions that have to be accumulated.
+
+Usage:
+    python benchmarks/backward_memory.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.activation import relu
+from clumsygrad.math import mean
+from clumsygrad.random import randn
+from clumsygrad.tensor import TensorType
+
+BATCH = 256
+WIDTH = 1024
+LAYERS = 4
+HEADS = 8
+REPEATS = 5
+
+
+def build_graph():
+    x = randn((BATCH, WIDTH))
+    loss = None
+    
+    for _ in range(LAYERS):
+        w = randn((WIDTH, WIDTH), tensor_type=TensorType.PARAMETER)
+        b = randn((WIDTH,), tensor_type=TensorType.PARAMETER)
+        x = relu(x @ w + b)
+        
+        for _ in range(HEADS):
+            head = mean(x * 0.5)
+            loss = head if loss is None else loss + head
+    
+    return loss
+
+def main():
+    peaks = []
+    times = []
+    
+    for _ in range(REPEATS):
+        loss = build_graph()
+        
+        tracemalloc.start()
+        start = time.perf_counter()
+        loss.backward()
+        times.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        
+        del loss
+    
+    print(f"MLP {LAYERS}x{WIDTH}, batch {BATCH}, {HEADS} heads per layer")
+    print(f"peak memory allocated in backward: {np.median(peaks) / 2**20:8.2f} MiB")
+    print(f"backward time:                     {np.median(times) * 1e3:8.2f} ms")
+
+if __name__ == '__main__':
+    main()
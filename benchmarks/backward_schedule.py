@@ -0,0 +1,65 @@
+"""
+Benchmark of the peak memory of the backward pass with the default and the memory-aware order, on a model
+with several branches, each multiplying a large activation by a scalar computed from another large one.
+
+Reports the peak bytes of live gradients predicted by `compare_schedules`, and the peak memory measured
+with tracemalloc during the backward pass.
+
+Usage:
+    python benchmarks/backward_schedule.py
+"""
+
+import contextlib
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.activation import tanh
+from clumsygrad.math import exp, sum
+from clumsygrad.schedule import MemoryAwareSchedule, compare_schedules
+from clumsygrad.tensor import Tensor, TensorType
+
+SIZE = 1000
+BRANCHES = 4
+
+
+def model(params):
+    loss = None
+    for a, b, c, d in params:
+        branch = sum(tanh(a @ b) * sum(exp(c @ d) * 3))
+        loss = branch if loss is None else loss + branch
+    return loss
+
+def measure(params, engine):
+    loss = model(params)
+    
+    tracemalloc.start()
+    with engine:
+        loss.backward()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    for branch in params:
+        for p in branch:
+            p.grad = None
+    return peak
+
+def main():
+    rng = np.random.default_rng(0)
+    params = [[Tensor(rng.standard_normal(shape) * 0.01, tensor_type=TensorType.PARAMETER)
+               for shape in [(SIZE, 1), (1, SIZE), (SIZE, 1), (1, SIZE)]] for _ in range(BRANCHES)]
+    
+    report = compare_schedules(model(params))
+    print(f"{BRANCHES} branches of {SIZE}x{SIZE} activations")
+    print(f"predicted live gradients   default: {report['default'] / 2**20:7.2f} MiB   memory-aware: {report['memory_aware'] / 2**20:7.2f} MiB")
+    
+    default = measure(params, contextlib.nullcontext())
+    aware = measure(params, MemoryAwareSchedule())
+    print(f"measured backward peak     default: {default / 2**20:7.2f} MiB   memory-aware: {aware / 2**20:7.2f} MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark of training steps with and without a `BufferPool`.
+
+Reports the time per step, and the hit rate of the pool once it is warm.
+
+Usage:
+    python benchmarks/buffer_pool.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.activation import relu
+from clumsygrad.loss import mse_loss
+from clumsygrad.optimizer import SGD
+from clumsygrad.pool import BufferPool
+from clumsygrad.random import randn
+from clumsygrad.tensor import TensorType
+
+BATCH = 256
+WIDTH = 512
+LAYERS = 4
+STEPS = 50
+
+
+def make_model():
+    params = []
+    for _ in range(LAYERS):
+        params.append(randn((WIDTH, WIDTH), tensor_type=TensorType.PARAMETER))
+        np.multiply(params[-1].data, 0.02, out=params[-1].data)
+        params.append(randn((WIDTH,), tensor_type=TensorType.PARAMETER))
+    return params
+
+def step(params, optimizer, x, y):
+    out = x
+    for w, b in zip(params[::2], params[1::2]):
+        out = relu(out @ w + b)
+    mse_loss(out, y).backward()
+    optimizer.step()
+    optimizer.zero_grad()
+
+def measure(pool):
+    params = make_model()
+    optimizer = SGD(params, lr=1e-4)
+    x = randn((BATCH, WIDTH))
+    y = randn((BATCH, WIDTH))
+    times = []
+    
+    for _ in range(STEPS):
+        start = time.perf_counter()
+        if pool is None:
+            step(params, optimizer, x, y)
+        else:
+            with pool:
+                step(params, optimizer, x, y)
+        times.append(time.perf_counter() - start)
+    
+    return np.median(times)
+
+def main():
+    pool = BufferPool()
+    default = measure(None)
+    pooled = measure(pool)
+    
+    print(f"MLP {LAYERS}x{WIDTH}, batch {BATCH}, {STEPS} steps")
+    print(f"default allocator: {default * 1e3:8.2f} ms/step")
+    print(f"buffer pool:       {pooled * 1e3:8.2f} ms/step")
+    print(f"pool hit rate:     {pool.hits / (pool.hits + pool.misses):8.2%} ({pool.nbytes / 2**20:.1f} MiB held)")
+
+if __name__ == '__main__':
+    main()
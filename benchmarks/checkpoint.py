@@ -0,0 +1,59 @@
+"""
+Benchmark of the peak memory and time of a training step on a deep MLP,
+with and without `checkpoint_sequential`.
+
+Usage:
+    python benchmarks/checkpoint.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.activation import tanh
+from clumsygrad.checkpoint import checkpoint_sequential
+from clumsygrad.math import mean
+from clumsygrad.random import randn
+from clumsygrad.tensor import Tensor, TensorType
+
+BATCH = 256
+WIDTH = 256
+DEPTH = 64
+
+
+def make_layers():
+    rng = np.random.default_rng(0)
+    weights = [Tensor(rng.standard_normal((WIDTH, WIDTH)) / np.sqrt(WIDTH), tensor_type=TensorType.PARAMETER)
+               for _ in range(DEPTH)]
+    return [lambda x, w=w: tanh(x @ w) for w in weights]
+
+def plain(layers, x):
+    for layer in layers:
+        x = layer(x)
+    return x
+
+def measure(forward, layers, x):
+    tracemalloc.start()
+    start = time.perf_counter()
+    mean(forward(layers, x)).backward()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    layers = make_layers()
+    x = randn((BATCH, WIDTH))
+    
+    print(f"MLP {DEPTH}x{WIDTH}, batch {BATCH}")
+    for name, forward in [("regular", plain), ("checkpointed", checkpoint_sequential)]:
+        elapsed, peak = measure(forward, layers, x)
+        print(f"{name:13s} time: {elapsed * 1e3:8.2f} ms   peak memory: {peak / 2**20:8.2f} MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark of the training steps per second of an MLP in eager mode, replayed by a static graph and run by
+the function generated from that graph with `generate`.
+
+Usage:
+    python benchmarks/codegen.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.activation import relu, tanh
+from clumsygrad.codegen import generate
+from clumsygrad.graph import StaticGraph
+from clumsygrad.loss import mse_loss
+from clumsygrad.tensor import Tensor, TensorType
+
+SIZES = {
+    'small': (32, 16, 32, 1),
+    'medium': (128, 256, 256, 10),
+}
+STEPS = 500
+
+
+def make_parameters(n_in, n_hidden, n_out, rng):
+    return [Tensor(rng.standard_normal((n_in, n_hidden)) * 0.1, tensor_type=TensorType.PARAMETER),
+            Tensor(np.zeros((1, n_hidden)), tensor_type=TensorType.PARAMETER),
+            Tensor(rng.standard_normal((n_hidden, n_hidden)) * 0.1, tensor_type=TensorType.PARAMETER),
+            Tensor(np.zeros((1, n_hidden)), tensor_type=TensorType.PARAMETER),
+            Tensor(rng.standard_normal((n_hidden, n_out)) * 0.1, tensor_type=TensorType.PARAMETER)]
+
+def model(x, y, params):
+    w1, b1, w2, b2, w3 = params
+    return mse_loss(tanh(relu(x @ w1 + b1) @ w2 + b2) @ w3, y)
+
+def sgd(params, lr=1e-5):
+    for param in params:
+        param._data -= lr * param._grad
+        param._grad = None
+
+def main():
+    rng = np.random.default_rng(0)
+    
+    for name, (batch, n_in, n_hidden, n_out) in SIZES.items():
+        x = rng.standard_normal((batch, n_in)).astype(np.float32)
+        y = rng.standard_normal((batch, n_out)).astype(np.float32)
+        params = make_parameters(n_in, n_hidden, n_out, rng)
+        
+        graph = StaticGraph()
+        x_in, y_in = graph.placeholder((batch, n_in)), graph.placeholder((batch, n_out))
+        with graph:
+            loss = model(x_in, y_in, params)
+        generated = generate(graph, loss, [x_in, y_in])
+        
+        results = {}
+        for label, run in (('eager', lambda: model(Tensor(x), Tensor(y), params).backward()),
+                           ('static graph', lambda: graph.run({x_in: x, y_in: y}, loss)),
+                           ('generated', lambda: generated(x, y))):
+            run()
+            sgd(params)
+            start = time.perf_counter()
+            for _ in range(STEPS):
+                run()
+                sgd(params)
+            results[label] = STEPS / (time.perf_counter() - start)
+        
+        print(f"{name} MLP (batch {batch}, {n_in}-{n_hidden}-{n_hidden}-{n_out})")
+        for label, steps in results.items():
+            print(f"  {label:>12}: {steps:8.0f} steps/s ({steps / results['eager']:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark of the time per training step of an MLP in eager mode and compiled with `compile`, including the
+steps that trace the function again when the batch size changes.
+
+Usage:
+    python benchmarks/compile.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.activation import relu
+from clumsygrad.compiler import compile
+from clumsygrad.loss import mse_loss
+from clumsygrad.tensor import Tensor, TensorType
+
+SIZES = {
+    'small': (32, 16, 32, 1),
+    'medium': (128, 256, 256, 10),
+}
+STEPS = 500
+
+
+def make_parameters(n_in, n_hidden, n_out, rng):
+    return [Tensor(rng.standard_normal((n_in, n_hidden)) * 0.1, tensor_type=TensorType.PARAMETER),
+            Tensor(np.zeros((1, n_hidden)), tensor_type=TensorType.PARAMETER),
+            Tensor(rng.standard_normal((n_hidden, n_out)) * 0.1, tensor_type=TensorType.PARAMETER),
+            Tensor(np.zeros((1, n_out)), tensor_type=TensorType.PARAMETER)]
+
+def sgd(params, lr=1e-5):
+    for param in params:
+        param._data -= lr * param._grad
+        param._grad = None
+
+def make_loss(params):
+    def loss(x, y):
+        w1, b1, w2, b2 = params
+        return mse_loss(relu(x @ w1 + b1) @ w2 + b2, y)
+    return loss
+
+def train(step, params, batches):
+    start = time.perf_counter()
+    for x, y in batches:
+        step(x, y)
+        sgd(params)
+    return (time.perf_counter() - start) / len(batches)
+
+def main():
+    rng = np.random.default_rng(0)
+    
+    for name, (batch, n_in, n_hidden, n_out) in SIZES.items():
+        # The last batch of each epoch is smaller, which makes the compiled function keep a second variant
+        sizes = [batch] * 9 + [batch // 2]
+        batches = [(rng.standard_normal((size, n_in)).astype(np.float32), rng.standard_normal((size, n_out)).astype(np.float32))
+                   for size in sizes * (STEPS // len(sizes))]
+        
+        params = make_parameters(n_in, n_hidden, n_out, rng)
+        loss = make_loss(params)
+        eager = lambda x, y: loss(Tensor(x), Tensor(y)).backward()
+        eager_time = train(eager, params, batches)
+        
+        compiled = compile(loss)
+        compiled_time = train(compiled, params, batches)
+        
+        print(f"{name:6s}   eager: {eager_time * 1e6:7.1f} us/step   compiled: {compiled_time * 1e6:7.1f} us/step   "
+              f"speedup {eager_time / compiled_time:4.1f}x   ({compiled.traces} traces)")
+
+if __name__ == '__main__':
+    main()
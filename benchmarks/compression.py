@@ -0,0 +1,70 @@
+"""
+Benchmark of the memory held by the graph of a deep ReLU MLP between the forward and the backward pass,
+with and without compression of the saved arrays.
+
+Usage:
+    python benchmarks/compression.py
+"""
+
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.activation import relu
+from clumsygrad.compression import Compression
+from clumsygrad.loss import mse_loss
+from clumsygrad.random import randn
+from clumsygrad.tensor import Tensor, TensorType
+
+BATCH = 1024
+WIDTH = 512
+LAYERS = 16
+
+
+def run(weights, x, y, compression):
+    tracemalloc.start()
+    
+    if compression is None:
+        out = x
+        for w in weights:
+            out = relu(out @ w)
+        loss = mse_loss(out, y)
+    else:
+        with compression:
+            out = x
+            for w in weights:
+                out = relu(out @ w)
+            loss = mse_loss(out, y)
+    del out
+    
+    held = tracemalloc.get_traced_memory()[0]
+    loss.backward()
+    tracemalloc.stop()
+    return held, [w.grad for w in weights]
+
+def main():
+    rng = np.random.default_rng(0)
+    weights = [Tensor(rng.standard_normal((WIDTH, WIDTH)) * np.sqrt(2 / WIDTH), tensor_type=TensorType.PARAMETER)
+               for _ in range(LAYERS)]
+    x = randn((BATCH, WIDTH))
+    y = randn((BATCH, WIDTH))
+    
+    print(f"ReLU MLP {LAYERS}x{WIDTH}, batch {BATCH}")
+    reference = None
+    for name, compression in [("float32", None), ("relu masks", Compression()),
+                              ("masks + fp16 matmul", Compression(half_matmul=True))]:
+        held, grads = run(weights, x, y, compression)
+        for w in weights:
+            w.grad = None
+        
+        if reference is None:
+            reference = grads
+        error = max(np.linalg.norm(g - r) / np.linalg.norm(r) for g, r in zip(grads, reference))
+        print(f"{name:20s} held after forward: {held / 2**20:8.2f} MiB   max relative gradient error: {error:.1e}")
+
+if __name__ == '__main__':
+    main()
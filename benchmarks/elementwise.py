@@ -0,0 +1,70 @@
+"""
+Benchmark of chunked multi-threaded element-wise operations, to find the size from which splitting a ufunc
+across threads pays off.
+
+For each size, times the forward and backward pass of `tanh(x) * exp(x)` with and without
+`ChunkedElementwise`, for several numbers of threads, and reports the smallest size where each
+number of threads is faster than a single call. That size is a good `threshold`.
+
+Usage:
+    python benchmarks/elementwise.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.activation import tanh
+from clumsygrad.elementwise import ChunkedElementwise
+from clumsygrad.math import exp
+from clumsygrad.random import randn
+from clumsygrad.tensor import TensorType
+
+SIZES = [2**exponent for exponent in range(12, 24, 2)]
+THREADS = [2, 4, 8]
+REPEATS = 5
+
+
+def step(x):
+    out = tanh(x) * exp(x)
+    out.backward(np.ones(x.shape, dtype=np.float32))
+    x.grad = None
+
+def measure(x):
+    times = []
+    
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        step(x)
+        times.append(time.perf_counter() - start)
+    
+    return np.median(times)
+
+def main():
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'size':>10s} {'serial':>10s}" + "".join(f" {f'{threads} threads':>12s}" for threads in THREADS))
+    crossover = {}
+    
+    for size in SIZES:
+        x = randn((size,), tensor_type=TensorType.PARAMETER)
+        serial = measure(x)
+        row = f"{size:>10d} {serial * 1000:>8.3f}ms"
+        
+        for threads in THREADS:
+            with ChunkedElementwise(threads=threads, threshold=0):
+                elapsed = measure(x)
+            row += f" {elapsed * 1000:>10.3f}ms"
+            if elapsed < serial and threads not in crossover:
+                crossover[threads] = size
+        
+        print(row)
+    
+    for threads in THREADS:
+        print(f"{threads} threads: faster from {crossover.get(threads, 'no size tested')}")
+
+if __name__ == '__main__':
+    main()
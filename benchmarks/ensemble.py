@@ -0,0 +1,75 @@
+"""
+Benchmark of ensemble training: K separate MLPs with K `Adam` optimizers against one `Ensemble`
+with stacked parameters and a single `Adam`, and against a single MLP as wide as the K members together.
+
+Usage:
+    python benchmarks/ensemble.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.activation import relu
+from clumsygrad.ensemble import Ensemble
+from clumsygrad.math import sum
+from clumsygrad.optimizer import Adam
+from clumsygrad.tensor import Tensor, TensorType
+
+BATCH = 128
+FEATURES = 16
+HIDDEN = 32
+STEPS = 20
+
+
+def make_mlp(hidden, rng):
+    sizes = [FEATURES, hidden, hidden, 1]
+    return [Tensor(rng.standard_normal(shape) / np.sqrt(shape[0]) if shape[0] > 1 else np.zeros(shape), tensor_type=TensorType.PARAMETER)
+            for fan_in, fan_out in zip(sizes[:-1], sizes[1:]) for shape in ((fan_in, fan_out), (1, fan_out))]
+
+def mlp_forward(params, x):
+    for index in range(0, len(params), 2):
+        x = x @ params[index] + params[index + 1]
+        if index < len(params) - 2:
+            x = relu(x)
+    return x
+
+def train_separate(members, x, y):
+    optimizers = [Adam(params) for params in members]
+    start = time.perf_counter()
+    for _ in range(STEPS):
+        for params, optimizer in zip(members, optimizers):
+            optimizer.zero_grad()
+            sum((mlp_forward(params, x) - y) ** 2).backward()
+            optimizer.step()
+    return (time.perf_counter() - start) / STEPS
+
+def train_ensemble(ensemble, x, y):
+    optimizer = Adam(ensemble.parameters)
+    start = time.perf_counter()
+    for _ in range(STEPS):
+        optimizer.zero_grad()
+        sum((ensemble(x) - y) ** 2).backward()
+        optimizer.step()
+    return (time.perf_counter() - start) / STEPS
+
+def main():
+    rng = np.random.default_rng(0)
+    x = Tensor(rng.standard_normal((BATCH, FEATURES)))
+    y = Tensor(rng.standard_normal((BATCH, 1)))
+    
+    for members in (4, 16, 64):
+        separate_time = train_separate([make_mlp(HIDDEN, rng) for _ in range(members)], x, y)
+        ensemble_time = train_ensemble(Ensemble(members, [FEATURES, HIDDEN, HIDDEN, 1], seed=0), x, y)
+        wide_time = train_separate([make_mlp(HIDDEN * members, rng)], x, y)
+        
+        print(f"{members:3d} members   separate models: {separate_time * 1000:7.2f} ms/step   "
+              f"ensemble: {ensemble_time * 1000:6.2f} ms/step ({separate_time / ensemble_time:4.1f}x)   "
+              f"one {HIDDEN * members}-wide model: {wide_time * 1000:6.2f} ms/step")
+
+if __name__ == '__main__':
+    main()
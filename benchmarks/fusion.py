@@ -0,0 +1,58 @@
+"""
+Benchmark of element-wise fusion on the expression `exp(x**2 + 3*x + 2)`.
+
+Compares the time and the peak memory of a forward and backward pass with and
+without `fuse`.
+
+Usage:
+    python benchmarks/fusion.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.fusion import fuse
+from clumsygrad.math import exp
+from clumsygrad.random import rand
+from clumsygrad.tensor import TensorType
+
+SIZE = 1_000_000
+REPEATS = 10
+
+
+def expression(x):
+    return exp(x**2 + 3*x + 2)
+
+def measure(fn, x):
+    peaks = []
+    times = []
+    
+    for _ in range(REPEATS):
+        tracemalloc.start()
+        start = time.perf_counter()
+        fn(x).backward(np.ones(SIZE, dtype=np.float32))
+        times.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        x.grad = None
+    
+    return np.median(times), np.median(peaks)
+
+def main():
+    x = rand((SIZE,), tensor_type=TensorType.PARAMETER)
+    fused = fuse(expression)
+    fused(x)
+    
+    print(f"exp(x**2 + 3*x + 2), {SIZE} elements")
+    for name, fn in [("unfused", expression), ("fused", fused)]:
+        elapsed, peak = measure(fn, x)
+        print(f"{name:8s} time: {elapsed * 1e3:8.2f} ms   peak memory: {peak / 2**20:8.2f} MiB")
+
+if __name__ == '__main__':
+    main()
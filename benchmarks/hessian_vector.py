@@ -0,0 +1,71 @@
+"""
+Benchmark of Hessian-vector products against plain gradients on a small two-layer network.
+
+`hvp` runs the forward pass, a backward pass with `create_graph=True` and a backward pass of the result,
+so it should cost a small constant multiple of one gradient. The Hessian itself, which has one row per
+parameter, is never formed.
+
+Usage:
+    python benchmarks/hessian_vector.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.activation import tanh
+from clumsygrad.hessian import hvp
+from clumsygrad.loss import mse_loss
+from clumsygrad.tensor import Tensor, TensorType
+
+BATCH = 256
+REPEATS = 20
+
+
+def make_loss(x, y):
+    def loss(w1, w2):
+        return mse_loss(tanh(x @ w1) @ w2, y)
+    return loss
+
+def gradient(loss, w1, w2):
+    params = [Tensor(w1, tensor_type=TensorType.PARAMETER), Tensor(w2, tensor_type=TensorType.PARAMETER)]
+    loss(*params).backward()
+    return [param.grad for param in params]
+
+def measure(fn, *args):
+    fn(*args)
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn(*args)
+    elapsed = (time.perf_counter() - start) / REPEATS
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    rng = np.random.default_rng(0)
+    
+    for features, hidden in ((64, 128), (256, 512), (512, 1024)):
+        x = Tensor(rng.standard_normal((BATCH, features)))
+        y = Tensor(rng.standard_normal((BATCH, 1)))
+        w1 = (rng.standard_normal((features, hidden)) / np.sqrt(features)).astype(np.float32)
+        w2 = (rng.standard_normal((hidden, 1)) / np.sqrt(hidden)).astype(np.float32)
+        v1, v2 = rng.standard_normal(w1.shape), rng.standard_normal(w2.shape)
+        loss = make_loss(x, y)
+        
+        grad_time, grad_peak = measure(gradient, loss, w1, w2)
+        hvp_time, hvp_peak = measure(hvp, loss, (w1, w2), (v1, v2))
+        
+        count = w1.size + w2.size
+        print(f"{count:7d} parameters   gradient: {grad_time * 1000:6.2f} ms, peak {grad_peak / 2**20:5.1f} MiB   "
+              f"hvp: {hvp_time * 1000:6.2f} ms ({hvp_time / grad_time:.1f}x), peak {hvp_peak / 2**20:5.1f} MiB   "
+              f"dense Hessian would take {4 * count ** 2 / 2**20:8.1f} MiB")
+
+if __name__ == '__main__':
+    main()
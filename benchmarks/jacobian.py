@@ -0,0 +1,76 @@
+"""
+Benchmark of full Jacobians: one batched backward sweep against one backward pass per output element.
+
+The per-output loop re-traverses the graph in Python for every row of the Jacobian, with
+`backward(gradient=e_i, keep_graph=True)`. `jacobian` traverses it once, with the rows stacked
+along a batch axis.
+
+Usage:
+    python benchmarks/jacobian.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.activation import sigmoid, tanh
+from clumsygrad.jacobian import jacobian
+from clumsygrad.tensor import Tensor, TensorType
+
+FEATURES = 32
+HIDDEN = 64
+LAYERS = 6
+
+
+def make_model(outputs, rng):
+    weights = [Tensor(rng.standard_normal((FEATURES, HIDDEN)) / np.sqrt(FEATURES))]
+    weights += [Tensor(rng.standard_normal((HIDDEN, HIDDEN)) / np.sqrt(HIDDEN)) for _ in range(LAYERS - 2)]
+    weights += [Tensor(rng.standard_normal((HIDDEN, outputs)) / np.sqrt(HIDDEN))]
+    
+    def model(x):
+        for weight in weights[:-1]:
+            x = tanh(x @ weight)
+        return sigmoid(x @ weights[-1])
+    return model
+
+def per_output(model, x):
+    param = Tensor(x, tensor_type=TensorType.PARAMETER)
+    out = model(param)
+    rows = []
+    
+    for index in range(out.shape[1]):
+        cotangent = np.zeros(out.shape, dtype=np.float32)
+        cotangent[0, index] = 1
+        param.grad = None
+        out.backward(cotangent, keep_graph=True)
+        rows.append(param.grad[0])
+    return np.stack(rows)
+
+def batched(model, x):
+    _, (result,) = jacobian(model, (x,))
+    return result[0, :, 0]
+
+def measure(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((1, FEATURES)).astype(np.float32)
+    
+    for outputs in (16, 64, 256, 1024):
+        model = make_model(outputs, rng)
+        expected, loop_time = measure(per_output, model, x)
+        result, batched_time = measure(batched, model, x)
+        np.testing.assert_allclose(result, expected, rtol=1e-4, atol=1e-6)
+        
+        print(f"{outputs:5d} outputs   one backward per output: {loop_time * 1000:8.1f} ms   "
+              f"batched sweep: {batched_time * 1000:6.1f} ms   speedup {loop_time / batched_time:5.1f}x")
+
+if __name__ == '__main__':
+    main()
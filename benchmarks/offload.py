@@ -0,0 +1,65 @@
+"""
+Benchmark of the memory held by the graph of an MLP between the forward and the backward pass,
+with the saved arrays kept in memory or offloaded to scratch files.
+
+Usage:
+    python benchmarks/offload.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.activation import relu
+from clumsygrad.loss import mse_loss
+from clumsygrad.offload import Offload
+from clumsygrad.random import randn
+from clumsygrad.tensor import Tensor, TensorType
+
+BATCH = 4096
+WIDTH = 512
+LAYERS = 8
+
+
+def run(weights, x, y, offload):
+    tracemalloc.start()
+    start = time.perf_counter()
+    
+    if offload is None:
+        out = x
+        for w in weights:
+            out = relu(out @ w)
+        loss = mse_loss(out, y)
+    else:
+        with offload:
+            out = x
+            for w in weights:
+                out = relu(out @ w)
+            loss = mse_loss(out, y)
+    del out
+    
+    held = tracemalloc.get_traced_memory()[0]
+    loss.backward()
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    return held, elapsed
+
+def main():
+    rng = np.random.default_rng(0)
+    weights = [Tensor(rng.standard_normal((WIDTH, WIDTH)) / np.sqrt(WIDTH), tensor_type=TensorType.PARAMETER)
+               for _ in range(LAYERS)]
+    x = randn((BATCH, WIDTH))
+    y = randn((BATCH, WIDTH))
+    
+    print(f"MLP {LAYERS}x{WIDTH}, batch {BATCH}")
+    for name, offload in [("in memory", None), ("offloaded", Offload()), ("prefetch 2", Offload(prefetch=2))]:
+        held, elapsed = run(weights, x, y, offload)
+        print(f"{name:11s} held after forward: {held / 2**20:8.2f} MiB   forward + backward: {elapsed * 1e3:8.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark of the memory held by the graph of an MLP between the forward and the backward pass.
+
+Backward functions only reference the arrays saved by their operation, and the graph stands for INTERMEDIATE
+tensors with nodes that do not hold their data, so the data of a tensor is freed as soon as the caller drops it
+unless an operation saved it. Each layer below keeps three activations: the input of the product, the output of
+the activation and the output of `exp`.
+
+Usage:
+    python benchmarks/saved_tensors.py
+"""
+
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.activation import relu, sigmoid, tanh
+from clumsygrad.loss import mse_loss
+from clumsygrad.math import exp
+from clumsygrad.random import randn
+from clumsygrad.tensor import Tensor, TensorType
+
+BATCH = 512
+WIDTH = 512
+LAYERS = 6
+
+
+def main():
+    rng = np.random.default_rng(0)
+    weights = [Tensor(rng.standard_normal((WIDTH, WIDTH)) / np.sqrt(WIDTH), tensor_type=TensorType.PARAMETER)
+               for _ in range(LAYERS)]
+    biases = [Tensor(np.zeros(WIDTH), tensor_type=TensorType.PARAMETER) for _ in range(LAYERS)]
+    activations = [relu, tanh, sigmoid]
+    x = randn((BATCH, WIDTH))
+    y = randn((BATCH, WIDTH))
+    
+    tracemalloc.start()
+    out = x
+    for index, (w, b) in enumerate(zip(weights, biases)):
+        out = activations[index % 3](out @ w + b) * 0.5 + exp(out * -1.0) * 0.1
+    loss = mse_loss(out, y)
+    held = tracemalloc.get_traced_memory()[0]
+    
+    tracemalloc.reset_peak()
+    loss.backward()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    activation_size = BATCH * WIDTH * 4
+    print(f"MLP {LAYERS}x{WIDTH}, batch {BATCH}")
+    print(f"memory held by the graph after forward: {held / 2**20:8.2f} MiB ({held / activation_size:5.1f} activations)")
+    print(f"peak memory during backward:            {peak / 2**20:8.2f} MiB")
+
+if __name__ == '__main__':
+    main()
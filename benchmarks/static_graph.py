@@ -0,0 +1,91 @@
+"""
+Benchmark of the time per training step of an MLP in eager mode, in static graph mode and in hand-written NumPy.
+
+Usage:
+    python benchmarks/static_graph.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clumsygrad.activation import relu
+from clumsygrad.graph import StaticGraph
+from clumsygrad.loss import mse_loss
+from clumsygrad.tensor import Tensor, TensorType
+
+SIZES = {
+    'small': (32, 16, 32, 1),
+    'medium': (128, 256, 256, 10),
+}
+STEPS = 500
+
+
+def make_parameters(n_in, n_hidden, n_out, rng):
+    return [Tensor(rng.standard_normal((n_in, n_hidden)) * 0.1, tensor_type=TensorType.PARAMETER),
+            Tensor(np.zeros(n_hidden), tensor_type=TensorType.PARAMETER),
+            Tensor(rng.standard_normal((n_hidden, n_out)) * 0.1, tensor_type=TensorType.PARAMETER),
+            Tensor(np.zeros(n_out), tensor_type=TensorType.PARAMETER)]
+
+def sgd(params, lr=1e-5):
+    for param in params:
+        param._data -= lr * param._grad
+        param._grad = None
+
+def eager_step(params, x, y):
+    w1, b1, w2, b2 = params
+    loss = mse_loss(relu(Tensor(x) @ w1 + b1) @ w2 + b2, Tensor(y))
+    loss.backward()
+    sgd(params)
+
+def numpy_step(params, x, y):
+    w1, b1, w2, b2 = (param._data for param in params)
+    z = x @ w1 + b1
+    h = np.maximum(0, z)
+    out = h @ w2 + b2
+    diff = out - y
+    grad_out = 2 * diff
+    grad_h = (grad_out @ w2.T) * (z > 0)
+    grads = [x.T @ grad_h, grad_h.sum(axis=0), h.T @ grad_out, grad_out.sum(axis=0)]
+    for param, grad in zip(params, grads):
+        param._data -= 1e-5 * grad
+
+def main():
+    rng = np.random.default_rng(0)
+    
+    for name, (batch, n_in, n_hidden, n_out) in SIZES.items():
+        x = rng.standard_normal((batch, n_in)).astype(np.float32)
+        y = rng.standard_normal((batch, n_out)).astype(np.float32)
+        params = make_parameters(n_in, n_hidden, n_out, rng)
+        
+        graph = StaticGraph()
+        x_in = graph.placeholder((batch, n_in))
+        y_in = graph.placeholder((batch, n_out))
+        with graph:
+            w1, b1, w2, b2 = params
+            loss = mse_loss(relu(x_in @ w1 + b1) @ w2 + b2, y_in)
+        
+        def static_step():
+            graph.run({x_in: x, y_in: y}, loss)
+            sgd(params)
+        
+        results = {}
+        for label, step in (('eager', lambda: eager_step(params, x, y)),
+                            ('static graph', static_step),
+                            ('numpy', lambda: numpy_step(params, x, y))):
+            step()
+            start = time.perf_counter()
+            for _ in range(STEPS):
+                step()
+            results[label] = (time.perf_counter() - start) / STEPS
+        
+        print(f"{name} MLP (batch {batch}, {n_in}-{n_hidden}-{n_out})")
+        for label, seconds in results.items():
+            print(f"  {label:>12}: {seconds * 1e6:8.1f} us/step")
+
+if __name__ == '__main__':
+    main()
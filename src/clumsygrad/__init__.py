@@ -4,7 +4,13 @@ It provides a `Tensor` class with support for building dynamic computation graph
 
 For detailed documentation, refer: `https://clumsygrad.readthedocs.io/en/latest/` 
 """
-from . import activation, grad, loss, math, optimizer, random, tensor
+from . import (activation, batching, checkpoint, codegen, compiler,
+               compression, elementwise, ensemble, forward, fusion, grad, graph,
+               hessian, jacobian, loss, math, memory, offload, optimizer,
+               parallel, pool, random, schedule, tape, tensor, vmap)
+from .compiler import compile
+from .tensor import (inference_mode, is_grad_enabled, no_grad,
+                     saved_tensors_hooks)
 
 __version__ = "0.2.0"
 
@@ -16,4 +22,27 @@ __all__ = [
     "loss",
     "math",
     "optimizer",
+    "tape",
+    "graph",
+    "fusion",
+    "pool",
+    "checkpoint",
+    "offload",
+    "compression",
+    "parallel",
+    "elementwise",
+    "schedule",
+    "forward",
+    "hessian",
+    "jacobian",
+    "vmap",
+    "batching",
+    "ensemble",
+    "compiler",
+    "codegen",
+    "memory",
+    "no_grad",
+    "inference_mode",
+    "is_grad_enabled",
+    "saved_tensors_hooks",
 ]
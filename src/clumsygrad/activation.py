@@ -4,7 +4,7 @@ This module provides various activation functions for tensors.
 
 import numpy as np
 
-from .tensor import Tensor
+from .tensor import Tensor, _empty, _ufunc
 
 
 def tanh(tensor: Tensor) -> Tensor:
@@ -23,10 +23,13 @@ def tanh(tensor: Tensor) -> Tensor:
     
     from .grad import tanh_backward
     
+    out = _ufunc(np.tanh, tensor._data, out=_empty(tensor._shape))
+    
     new_tensor = Tensor._create_node(
-        data=np.tanh(tensor._data),
+        data=out,
         grad_fn=tanh_backward,
-        parents=(tensor,)
+        parents=(tensor,),
+        saved=(out,)
     )
     return new_tensor
 
@@ -46,10 +49,13 @@ def relu(tensor: Tensor) -> Tensor:
     
     from .grad import relu_backward
 
+    out = _ufunc(np.maximum, 0, tensor._data, out=_empty(tensor._shape))
+    
     new_tensor = Tensor._create_node(
-        data=np.maximum(0, tensor._data),
+        data=out,
         grad_fn=relu_backward,
-        parents=(tensor,)
+        parents=(tensor,),
+        saved=(out,)
     )
     return new_tensor
 
@@ -69,10 +75,16 @@ def sigmoid(tensor: Tensor) -> Tensor:
     
     from .grad import sigmoid_backward
     
+    out = _ufunc(np.negative, tensor._data, out=_empty(tensor._shape))
+    _ufunc(np.exp, out, out=out)
+    _ufunc(np.add, out, 1, out=out)
+    _ufunc(np.divide, 1, out, out=out)
+    
     new_tensor = Tensor._create_node(
-        data=1 / (1 + np.exp(-tensor._data)),
+        data=out,
         grad_fn=sigmoid_backward,
-        parents=(tensor,)
+        parents=(tensor,),
+        saved=(out,)
     )
     return new_tensor
 
@@ -97,14 +109,15 @@ def softmax(tensor: Tensor, axis=-1) -> Tensor:
     
     from .grad import softmax_backward
     
-    x_shifted = tensor._data - np.max(tensor._data, axis=axis, keepdims=True)
-    exp_x = np.exp(x_shifted)
-    softmax_output = exp_x / np.sum(exp_x, axis=axis, keepdims=True)
+    softmax_output = _ufunc(np.subtract, tensor._data, np.max(tensor._data, axis=axis, keepdims=True), out=_empty(tensor._shape))
+    _ufunc(np.exp, softmax_output, out=softmax_output)
+    _ufunc(np.divide, softmax_output, np.sum(softmax_output, axis=axis, keepdims=True), out=softmax_output)
     
     new_tensor = Tensor._create_node(
         data=softmax_output,
         grad_fn=softmax_backward,
         parents=(tensor,),
-        extra={'axis': axis}
+        extra={'axis': axis},
+        saved=(softmax_output,)
     )
     return new_tensor
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+This module provides the automatic batching of many small independent graphs with the same signature.
+
+Running thousands of tiny models, such as one regressor per entity, through `Tensor` operations spends
+most of its time in the Python overhead of each operation rather than in NumPy. `AutoBatcher` collects
+the calls of a function on the arguments of each model, groups the calls with the same function and the
+same argument shapes, and runs each group as a single graph whose operands are stacked along a new
+leading axis: each operation and each backward function is run once for the whole group, with the
+batched kernels of `vmap` and the batched backward sweep of `jacobian`. The gradients are then scattered
+back to the PARAMETER tensors of each model.
+
+As with `vmap`, the function is traced once per group on the arguments of its first call, so the
+operations it performs must not depend on the values of its arguments.
+
+Example:
+    
+    >>> def loss(w, b, x, y):
+    ...     return mse_loss(x @ w + b, y)
+    >>> batcher = AutoBatcher()
+    >>> for model in models:
+    ...     batcher.add(loss, model.w, model.b, model.x, model.y)
+    >>> losses = batcher.run()  # the gradients are accumulated into model.w.grad and model.b.grad
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Tuple, Union
+
+import numpy as np
+
+from .jacobian import _sweep
+from .tensor import Tensor, TensorType, _GradMode
+from .vmap import _Trace, _batched_value, _replay
+
+def _group(calls: List[Tuple[Callable, tuple]]) -> Dict[tuple, List[int]]:
+    """Group the positions of the calls by function and by the shapes and tensor types of their arguments."""
+    groups: Dict[tuple, List[int]] = {}
+    for index, (f, args) in enumerate(calls):
+        key = (f,) + tuple((arg._shape, arg._tensor_type) for arg in args)
+        groups.setdefault(key, []).append(index)
+    return groups
+
+def _run_group(f: Callable[..., Tensor], members: List[tuple], backward: bool) -> List[Tensor]:
+    """
+    Run the calls of `f` on the arguments of each member as one graph stacked along a leading axis.
+    
+    Returns:
+        The output of each member, as an INPUT tensor without a graph.
+    """
+    size = len(members)
+    examples, stacked, values = [], [], {}
+    
+    for position, first in enumerate(members[0]):
+        if all(args[position] is first for args in members):
+            examples.append(first)
+            continue
+        
+        array = np.stack([args[position]._data for args in members])
+        example = Tensor(array[0], tensor_type=first._tensor_type)
+        values[id(example)] = (array, True)
+        examples.append(example)
+        stacked.append((position, example))
+    
+    trace = _Trace()
+    with trace:
+        output = f(*examples)
+    
+    if not isinstance(output, Tensor):
+        raise ValueError("Batched functions must return a tensor")
+    
+    _replay(trace.ops, values)
+    batch = _batched_value(output, size, values)
+    
+    if backward and output._requires_grad:
+        if output._data.size != 1:
+            raise ValueError("Gradient can only be implicitly created for scalar outputs")
+        
+        topo_order = output._build_topo()
+        leaves = _sweep(topo_order, np.ones((size,) + output._shape, dtype=np.float32))
+        
+        # Stacked arguments receive the gradient of their own call, shared ones the sum over the group
+        for position, example in stacked:
+            gradients = leaves.pop(id(example), None)
+            if gradients is not None:
+                for args, gradient in zip(members, gradients):
+                    args[position]._accumulate_grad(np.ascontiguousarray(gradient, dtype=np.float32))
+        
+        for node in topo_order:
+            gradients = leaves.get(id(node))
+            if gradients is not None and node._tensor_type == TensorType.PARAMETER:
+                node._accumulate_grad(np.sum(gradients, axis=0, dtype=np.float32), owned=True)
+    
+    return [Tensor(value) for value in batch]
+
+class AutoBatcher:
+    """
+    Executor running many calls of functions with the same signature as stacked graphs.
+    
+    Calls are added with `add` and run together with `run`. Calls of the same function with arguments of the
+    same shapes and tensor types form a group. Within a group, an argument position where every call passes
+    the same tensor is shared by the group, and the others are stacked along a new leading axis.
+    """
+    
+    def __init__(self):
+        self._calls: List[Tuple[Callable, tuple]] = []
+    
+    def __len__(self) -> int:
+        return len(self._calls)
+    
+    def add(self, f: Callable[..., Tensor], *args: Union[Tensor, np.ndarray, list, float]) -> int:
+        """
+        Add a call of `f` to run with the next batch.
+        
+        Args:
+            f: The function to call. It takes tensors and returns a tensor. Tensors it captures from an
+                enclosing scope are shared by every call.
+            *args: The arguments of the call: INPUT or PARAMETER tensors, or arrays.
+        
+        Returns:
+            The position of the output of the call in the list returned by `run`.
+        
+        Raises:
+            ValueError: If an argument is an INTERMEDIATE tensor, as the graph that produced it cannot be batched.
+        """
+        arguments = []
+        for arg in args:
+            if not isinstance(arg, Tensor):
+                arg = Tensor(arg)
+            elif arg._tensor_type == TensorType.INTERMEDIATE:
+                raise ValueError(f"Tensor {arg._id} is an INTERMEDIATE tensor and cannot be an argument of a batched call")
+            arguments.append(arg)
+        
+        self._calls.append((f, tuple(arguments)))
+        return len(self._calls) - 1
+    
+    def run(self, backward: bool = True) -> List[Tensor]:
+        """
+        Run the calls added since the last run, one stacked graph per group.
+        
+        Args:
+            backward: If True, each output is differentiated as by `backward()`, and the gradients are
+                accumulated into the `grad` of the PARAMETER tensors, whether passed as arguments or captured.
+        
+        Returns:
+            The output of each call, in the order they were added, as INPUT tensors without a graph.
+        
+        Raises:
+            ValueError: If a function performs an operation that is not supported by vmap, or if `backward`
+                is True and a function does not return a single element.
+            RuntimeError: If `backward` is True inside `inference_mode`, or if a backward function fails.
+        """
+        if backward and _GradMode.inference:
+            raise RuntimeError("backward cannot be called inside inference_mode")
+        
+        calls, self._calls = self._calls, []
+        outputs: List[Tensor] = [None] * len(calls)
+        
+        for (f, *_), indices in _group(calls).items():
+            members = [calls[index][1] for index in indices]
+            for index, output in zip(indices, _run_group(f, members, backward)):
+                outputs[index] = output
+        
+        return outputs
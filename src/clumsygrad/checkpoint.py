@@ -0,0 +1,107 @@
+"""
+This module provides activation checkpointing, which trades computation for memory during training.
+
+A checkpointed segment of the model is run without recording its internal graph: only its inputs are
+kept, and its output becomes a single node of the graph. During the backward pass, the segment is run
+again from its inputs to rebuild the internal graph, and the gradients are propagated through it.
+
+With `checkpoint_sequential`, a model made of `n` layers split into about `sqrt(n)` segments keeps
+O(sqrt(n)) activations alive instead of O(n), for the cost of roughly one extra forward pass.
+
+Example:
+    
+    >>> layers = [lambda x, w=w: tanh(x @ w) for w in weights]
+    >>> out = checkpoint_sequential(layers, x)
+    >>> mean(out).backward()
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Callable, List, Optional, Sequence
+
+from .tensor import Tensor, TensorType, _GradMode, no_grad
+
+def checkpoint(fn: Callable[..., Tensor], *tensors: Tensor) -> Tensor:
+    """
+    Run `fn(*tensors)` without keeping its internal graph, and recompute it during the backward pass.
+    
+    Args:
+        fn: The segment to run. It must be deterministic, and every tensor it depends on must either be
+            passed in `tensors` or be a PARAMETER tensor.
+        *tensors: The inputs of the segment.
+    
+    Returns:
+        The output of `fn`, as a single INTERMEDIATE node whose parents are `tensors`.
+        Outside of `no_grad`, it always requires gradients, as `fn` may use PARAMETER tensors.
+    """
+    
+    from .grad import checkpoint_backward
+    
+    with no_grad():
+        output = fn(*tensors)
+    
+    saved = tuple(tensor._data for tensor in tensors)
+    
+    node = Tensor._create_node(
+        data=output._data,
+        grad_fn=checkpoint_backward,
+        parents=tensors,
+        extra={'fn': fn},
+        saved=saved
+    )
+    
+    if _GradMode.enabled and node._tensor_type == TensorType.INPUT:
+        node._tensor_type = TensorType.INTERMEDIATE
+        node._grad_fn = checkpoint_backward
+        node._parents = tensors
+        node._saved = saved
+        node._extra['fn'] = fn
+    
+    node._requires_grad = _GradMode.enabled
+    return node
+
+def checkpoint_sequential(functions: Sequence[Callable[[Tensor], Tensor]],
+                          tensor: Tensor,
+                          segments: Optional[int] = None) -> Tensor:
+    """
+    Apply a sequence of layers, checkpointing them in segments of consecutive layers.
+    
+    The last segment is run normally, since its activations are needed as soon as the backward pass starts.
+    
+    Args:
+        functions: The layers to apply in order, each taking and returning a single tensor.
+        tensor: The input of the first layer.
+        segments: The number of segments. Default is the square root of the number of layers.
+    
+    Returns:
+        The output of the last layer.
+    
+    Raises:
+        ValueError: If `segments` is not positive.
+    """
+    
+    functions = list(functions)
+    
+    if segments is None:
+        segments = max(1, round(math.sqrt(len(functions))))
+    if segments < 1:
+        raise ValueError("The number of segments must be positive")
+    
+    size = math.ceil(len(functions) / segments) if functions else 1
+    chunks: List[List[Callable]] = [functions[start:start + size] for start in range(0, len(functions), size)]
+    
+    def run(chunk: List[Callable]) -> Callable[[Tensor], Tensor]:
+        def segment(x: Tensor) -> Tensor:
+            for function in chunk:
+                x = function(x)
+            return x
+        return segment
+    
+    for chunk in chunks[:-1]:
+        tensor = checkpoint(run(chunk), tensor)
+    
+    if chunks:
+        tensor = run(chunks[-1])(tensor)
+    
+    return tensor
@@ -0,0 +1,251 @@
+"""
+This module provides the generation of straight-line NumPy source code from a static graph.
+
+A `StaticGraph` replays its forward pass through a list of kernels and its backward pass through a loop
+that tracks which gradients have been written. Since the graph is fixed, all of that is known in advance:
+`generate` emits it as the source of a single Python function, with one NumPy call per operation writing
+into the buffers of the graph with `out=`, followed by one call per backward function of `grad.py`,
+and the accumulation of the gradients unrolled, so a call runs no dispatch and no bookkeeping.
+
+The source is kept on the returned `GeneratedFunction` and registered with `linecache`, so it can be
+printed, and tracebacks and debuggers show the generated lines.
+
+Example:
+    
+    >>> graph = StaticGraph()
+    >>> x, y = graph.placeholder((32, 4)), graph.placeholder((32, 1))
+    >>> with graph:
+    ...     loss = mse_loss(relu(x @ w1 + b1) @ w2, y)
+    >>> step = generate(graph, loss, inputs=[x, y])
+    >>> print(step.source)
+    >>> for x_batch, y_batch in batches:
+    ...     step(x_batch, y_batch)  # gradients are accumulated into w1, b1 and w2
+    ...     optimizer.step()
+"""
+
+from __future__ import annotations
+
+import itertools
+import linecache
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from . import grad
+from .graph import StaticGraph
+from .tensor import Tensor, TensorType
+
+def _softmax(args, out, extra):
+    axis = extra.get('axis', -1)
+    return (f"np.subtract({args[0]}, np.max({args[0]}, axis={axis!r}, keepdims=True), out={out})\n"
+            f"np.exp({out}, out={out})\n"
+            f"np.divide({out}, np.sum({out}, axis={axis!r}, keepdims=True), out={out})")
+
+def _sigmoid(args, out, extra):
+    return (f"np.negative({args[0]}, out={out})\n"
+            f"np.exp({out}, out={out})\n"
+            f"np.add({out}, 1, out={out})\n"
+            f"np.divide(1, {out}, out={out})")
+
+def _reduce(name):
+    def template(args, out, extra):
+        return f"np.{name}({args[0]}, axis={extra.get('axis')!r}, keepdims={extra.get('keepdims', False)!r}, out={out})"
+    return template
+
+def _loss(name):
+    def template(args, out, extra):
+        return f"{out}[...] = np.mean(np.{name}({args[0]} - {args[1]}))"
+    return template
+
+def _call(name, scalar=None):
+    def template(args, out, extra):
+        operands = list(args) if scalar is None else [args[0], repr(extra[scalar])]
+        return f"np.{name}({', '.join(operands)}, out={out})"
+    return template
+
+_FORWARD: Dict[Callable, Callable] = {
+    grad.transpose_backward: lambda args, out, extra: f"np.copyto({out}, {args[0]}.T)",
+    grad.add_backward: _call('add'),
+    grad.add_broadcast_backward: _call('add'),
+    grad.add_scalar_backward: _call('add', 'scalar_value'),
+    grad.sub_backward: _call('subtract'),
+    grad.sub_broadcast_backward: _call('subtract'),
+    grad.sub_scalar_backward: _call('subtract', 'scalar_value'),
+    grad.mul_backward: _call('multiply'),
+    grad.mul_broadcast_backward: _call('multiply'),
+    grad.mul_scalar_backward: _call('multiply', 'scalar_value'),
+    grad.matmul_backward: _call('matmul'),
+    grad.power_backward: _call('power', 'power'),
+    grad.negate_backward: _call('negative'),
+    grad.abs_backward: _call('abs'),
+    grad.reshape_backward: lambda args, out, extra: f"np.copyto({out}, {args[0]}.reshape({out}.shape))",
+    grad.sum_backward: _reduce('sum'),
+    grad.mean_backward: _reduce('mean'),
+    grad.exp_backward: _call('exp'),
+    grad.log_backward: _call('log'),
+    grad.sqrt_backward: _call('sqrt'),
+    grad.sin_backward: _call('sin'),
+    grad.cos_backward: _call('cos'),
+    grad.tan_backward: _call('tan'),
+    grad.relu_backward: lambda args, out, extra: f"np.maximum(0, {args[0]}, out={out})",
+    grad.sigmoid_backward: _sigmoid,
+    grad.tanh_backward: _call('tanh'),
+    grad.softmax_backward: _softmax,
+    grad.mse_backward: _loss('square'),
+    grad.mae_backward: _loss('abs'),
+}
+"""
+Source templates of the forward pass of the operations, keyed by their backward function.
+Each template takes the names of the input arrays, the name of the output buffer and the extra metadata
+of the operation, and returns the lines computing the output, matching the kernels of `graph.py`.
+"""
+
+_counter = itertools.count()
+
+class GeneratedFunction:
+    """
+    A function generated from a static graph, taking one array per input placeholder.
+    
+    Calling it feeds the arrays into the placeholders, runs the forward pass and, if generated with
+    `backward=True`, the backward pass, accumulating the gradients into the PARAMETER tensors. It returns
+    the data of the output, which is overwritten by the next call.
+    
+    Attributes:
+        source: The generated Python source.
+        fn: The generated function.
+    """
+    
+    def __init__(self, source: str, fn: Callable[..., np.ndarray]):
+        self.source = source
+        self.fn = fn
+    
+    def __call__(self, *inputs) -> np.ndarray:
+        return self.fn(*inputs)
+    
+    def __repr__(self):
+        return f"GeneratedFunction({self.fn.__name__})"
+
+def generate(graph: StaticGraph, output: Tensor, inputs: Sequence[Tensor],
+             backward: bool = True, name: str = 'step') -> GeneratedFunction:
+    """
+    Generate a Python function running the forward and backward passes of `output` with direct NumPy calls.
+    
+    Args:
+        graph: The static graph that recorded `output`.
+        output: The tensor to compute, typically the loss. For the backward pass, it must be a scalar.
+        inputs: The placeholders of the graph fed by the arguments of the generated function, in order.
+            Placeholders that are left out keep the data they were last fed with.
+        backward: If True, the generated function also runs the backward pass of `output`.
+        name: The name of the generated function.
+    
+    Returns:
+        The generated function, with its source.
+    
+    Raises:
+        ValueError: If an input is not a placeholder of the graph, or if `output` was not recorded in it.
+        RuntimeError: If `backward` is True and `output` is not a scalar.
+    """
+    
+    for placeholder in inputs:
+        if id(placeholder) not in graph._placeholders:
+            raise ValueError("Only placeholders of the graph can be inputs of the generated function")
+    
+    plan = graph._plan(output)
+    namespace: Dict[str, object] = {'np': np}
+    indices: Dict[int, int] = {}
+    
+    def index(tensor: Tensor) -> int:
+        position = indices.get(id(tensor))
+        if position is None:
+            position = indices[id(tensor)] = len(indices)
+            namespace[f'v{position}'] = tensor._data
+            namespace[f'n{position}'] = tensor
+        return position
+    
+    arguments = [f'x{position}' for position in range(len(inputs))]
+    lines = [f"def {name}({', '.join(arguments)}):"]
+    for argument, placeholder in zip(arguments, inputs):
+        lines.append(f"    np.copyto(v{index(placeholder)}, {argument})")
+    
+    lines.append("    # forward")
+    for op in plan.ops:
+        out = f"v{index(op.node)}"
+        code = _FORWARD[op.grad_fn]([f"v{index(node)}" for node in op.inputs], out, op.extra)
+        lines.append(f"    # tensor {op.node._id}: {op.grad_fn.__name__[:-len('_backward')]}")
+        lines.extend(f"    {line}" for line in code.split('\n'))
+    
+    if backward and output._requires_grad:
+        if output._data.size != 1:
+            raise RuntimeError("Gradient can only be implicitly created for scalar outputs")
+        
+        lines.extend(_backward(plan, index, namespace))
+    
+    lines.append(f"    return v{index(output)}")
+    source = '\n'.join(lines) + '\n'
+    
+    filename = f"<clumsygrad-generated-{next(_counter)}>"
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    exec(compile(source, filename, 'exec'), namespace)
+    
+    return GeneratedFunction(source, namespace[name])
+
+def _backward(plan, index: Callable[[Tensor], int], namespace: Dict[str, object]) -> List[str]:
+    """
+    Generate the lines of the backward pass of a plan.
+    
+    Whether each gradient has already been written is known in advance, so the accumulation is unrolled:
+    a tensor receiving a single contribution binds it directly, and a tensor receiving several ones gets a
+    buffer, which the first contribution is copied into and the others are added to. As in the default
+    engine, a gradient is dropped once propagated, and the gradient of a PARAMETER tensor is accumulated
+    into it as soon as its last contribution is in.
+    """
+    contributions: Dict[int, int] = {}
+    for _, _, _, targets in plan.backward_steps:
+        for target in targets:
+            if target >= 0:
+                contributions[target] = contributions.get(target, 0) + 1
+    
+    for target, count in contributions.items():
+        if count > 1:
+            node = plan.nodes[target]
+            namespace[f'd{index(node)}'] = np.empty(node._shape, dtype=np.float32)
+    output = plan.nodes[plan.output_index]
+    namespace[f'd{index(output)}'] = np.ones(output._shape, dtype=np.float32)
+    
+    lines = ["    # backward"]
+    remaining = dict(contributions)
+    
+    for position, node, grad_fn, targets in plan.backward_steps:
+        namespace[grad_fn.__name__] = grad_fn
+        names, updates = [], []
+        
+        for slot, target in enumerate(targets):
+            if target < 0:
+                names.append('_')
+                continue
+            
+            gradient = f"d{index(plan.nodes[target])}"
+            if contributions[target] == 1:
+                names.append(gradient)
+            else:
+                names.append(f"g{slot}")
+                if remaining[target] < contributions[target]:
+                    updates.append(f"    np.add({gradient}, g{slot}, out={gradient})")
+                else:
+                    updates.append(f"    np.copyto({gradient}, g{slot})")
+            
+            remaining[target] -= 1
+            leaf = plan.nodes[target]
+            if remaining[target] == 0 and leaf._tensor_type == TensorType.PARAMETER:
+                updates.append(f"    n{index(leaf)}._accumulate_grad({gradient})")
+                if contributions[target] == 1:
+                    updates.append(f"    del {gradient}")
+        
+        value = index(node)
+        targets = ', '.join(names) if len(names) > 1 else f"{names[0]},"
+        lines.append(f"    {targets} = {grad_fn.__name__}(n{value}, d{value})")
+        if contributions.get(position) == 1:
+            lines.append(f"    del d{value}")
+        lines.extend(updates)
+    
+    return lines
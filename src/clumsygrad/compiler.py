@@ -0,0 +1,192 @@
+"""
+This module provides `compile`, a decorator tracing a function into static graphs cached by input shapes.
+
+The first call of a compiled function with a given signature, i.e. the shapes and tensor types of its
+tensor arguments and the values of its other arguments, runs the function once inside a `StaticGraph`,
+which records the sequence of operations, the arrays each one saves for backward and the buffers it
+writes into. Later calls with the same signature feed the arguments into the placeholders of the graph
+and replay its forward and backward passes from the cached plan: no `Tensor` is created, and none of the
+dispatch, type checks or broadcasting logic of the operations runs again.
+
+A call with a new signature traces the function again. At most `max_variants` graphs are cached, and the
+least recently used one is dropped beyond that.
+
+As with `StaticGraph`, the operations performed by the function must not depend on the values of its
+tensor arguments, and parameters have to be updated in place between calls, as done by the optimizers.
+
+Example:
+    
+    >>> @compile
+    ... def train_step(x, y):
+    ...     return mse_loss(relu(x @ w1 + b1) @ w2, y)
+    >>> for x_batch, y_batch in batches:
+    ...     loss = train_step(x_batch, y_batch)  # gradients are accumulated into w1, b1 and w2
+    ...     optimizer.step()
+    ...     optimizer.zero_grad()
+"""
+
+from __future__ import annotations
+
+import functools
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from .graph import StaticGraph
+from .tensor import Tensor, TensorType, _GradMode
+
+class _Variant:
+    """
+    The static graph traced for one signature, with the placeholder fed by each tensor argument.
+    """
+    
+    __slots__ = ('graph', 'placeholders', 'output')
+    
+    def __init__(self, graph: StaticGraph, placeholders: List[Tuple[int, Tensor]], output: Tensor):
+        self.graph = graph
+        self.placeholders = placeholders
+        self.output = output
+
+class CompiledFunction:
+    """
+    A function traced into static graphs, one per signature of its arguments.
+    
+    Tensor arguments are guarded on their shape and tensor type. INPUT tensors and arrays are fed into
+    placeholders, so calls with new data reuse the graph. PARAMETER tensors are used as they are, so they
+    are also guarded on their identity, and receive their gradients like the parameters captured by the
+    function. Other arguments are guarded on their value.
+    """
+    
+    def __init__(self, fn: Callable[..., Tensor], backward: bool = True, max_variants: int = 8):
+        """
+        Initialize the compiled function.
+        
+        Args:
+            fn: The function to compile. It takes tensors and returns a tensor computed from them.
+            backward: If True, each call also runs the backward pass of the output, which must then be
+                a scalar, and accumulates the gradients into the PARAMETER tensors. The backward pass is
+                skipped when the graph is disabled, inside `no_grad` or `inference_mode`.
+            max_variants: The maximum number of traced graphs kept in the cache.
+        
+        Raises:
+            ValueError: If `max_variants` is not positive.
+        """
+        
+        if max_variants < 1:
+            raise ValueError("At least one variant must be cached")
+        
+        functools.update_wrapper(self, fn)
+        self.fn = fn
+        self.backward = backward
+        self.max_variants = max_variants
+        self.traces = 0
+        self._variants: OrderedDict = OrderedDict()
+    
+    @property
+    def variants(self) -> int:
+        """The number of traced graphs in the cache."""
+        return len(self._variants)
+    
+    def clear(self):
+        """Drop every traced graph, so the next calls trace the function again."""
+        self._variants.clear()
+    
+    def _signature(self, args: tuple) -> Tuple[tuple, list]:
+        """Return the guard of the arguments, and the arrays fed by the position of each tensor argument."""
+        key, arrays = [], []
+        
+        for position, arg in enumerate(args):
+            if isinstance(arg, (list, np.ndarray)):
+                arg = np.asarray(arg, dtype=np.float32)
+                key.append((arg.shape, TensorType.INPUT))
+                arrays.append((position, arg))
+            elif not isinstance(arg, Tensor):
+                key.append(arg)
+            elif arg._tensor_type == TensorType.INPUT:
+                key.append((arg._shape, TensorType.INPUT))
+                arrays.append((position, arg._data))
+            elif arg._tensor_type == TensorType.PARAMETER:
+                key.append((arg._shape, TensorType.PARAMETER, id(arg)))
+            else:
+                raise ValueError(f"Tensor {arg._id} is an INTERMEDIATE tensor and cannot be an argument of a compiled function")
+        
+        return tuple(key), arrays
+    
+    def _trace(self, args: tuple, arrays: list) -> _Variant:
+        """Run the function inside a new static graph, with a placeholder for each tensor argument."""
+        graph = StaticGraph()
+        args = list(args)
+        placeholders = []
+        
+        for position, array in arrays:
+            placeholder = graph.placeholder(array.shape)
+            np.copyto(placeholder._data, array)
+            args[position] = placeholder
+            placeholders.append((position, placeholder))
+        
+        # The graph is recorded even inside `no_grad`, and its buffers are neither packed nor pooled
+        previous = (_GradMode.enabled, _GradMode.saved_hooks, _GradMode.allocator)
+        _GradMode.enabled, _GradMode.saved_hooks, _GradMode.allocator = True, None, None
+        try:
+            with graph:
+                output = self.fn(*args)
+        finally:
+            _GradMode.enabled, _GradMode.saved_hooks, _GradMode.allocator = previous
+        
+        if not isinstance(output, Tensor):
+            raise ValueError("A compiled function must return a tensor")
+        
+        self.traces += 1
+        return _Variant(graph, placeholders, output)
+    
+    def __call__(self, *args) -> Tensor:
+        """
+        Run the function, tracing it first if no graph is cached for the signature of the arguments.
+        
+        Returns:
+            The output of the function, as an INPUT tensor without a graph.
+        
+        Raises:
+            ValueError: If an argument is an INTERMEDIATE tensor, or if the function returns something else
+                than a tensor or performs an operation that is not supported in a static graph.
+            RuntimeError: If the backward pass runs on an output that is not a scalar.
+        """
+        
+        key, arrays = self._signature(args)
+        variant: Optional[_Variant] = self._variants.get(key)
+        
+        if variant is None:
+            variant = self._trace(args, arrays)
+            self._variants[key] = variant
+            if len(self._variants) > self.max_variants:
+                self._variants.popitem(last=False)
+        else:
+            self._variants.move_to_end(key)
+            for (_, placeholder), (_, array) in zip(variant.placeholders, arrays):
+                np.copyto(placeholder._data, array)
+            variant.graph.forward(variant.output)
+        
+        if self.backward and _GradMode.enabled and variant.output._requires_grad:
+            variant.graph.backward(variant.output)
+        
+        return Tensor(variant.output._data.copy())
+
+def compile(fn: Optional[Callable[..., Tensor]] = None, *, backward: bool = True, max_variants: int = 8):
+    """
+    Compile a function into static graphs, traced once per signature of its arguments.
+    
+    Can be used as `@compile` or with options, as `@compile(backward=False, max_variants=4)`.
+    
+    Args:
+        fn: The function to compile.
+        backward: If True, each call also runs the backward pass of the output. Default is True.
+        max_variants: The maximum number of traced graphs kept in the cache. Default is 8.
+    
+    Returns:
+        A `CompiledFunction`, or a decorator returning one if `fn` is not given.
+    """
+    
+    if fn is None:
+        return lambda fn: CompiledFunction(fn, backward=backward, max_variants=max_variants)
+    return CompiledFunction(fn, backward=backward, max_variants=max_variants)
@@ -0,0 +1,174 @@
+"""
+This module provides compressed storage of the arrays saved for backward.
+
+Many saved arrays do not need to be kept at full float32 precision. While a `Compression` policy is
+active, the arrays saved by some operations are stored in a compact form and decompressed when the
+backward function of the operation runs:
+
+- The output of `relu` is only used for its sign, and is stored as a bit-packed mask (32x smaller).
+- The outputs of `sigmoid` and `tanh` are stored as float16 (2x smaller).
+- Optionally, the input activation saved by a matrix multiplication is stored as float16 (2x smaller).
+
+A compact copy only saves memory if nothing else keeps the full array. The data of leaves is never
+compressed, as the graph references the leaves anyway, and once another operation saves an array at
+full precision, its compact copies are dropped and the full array is used instead.
+
+Example:
+    
+    >>> with Compression(half_matmul=True):
+    ...     loss = mse_loss(relu(x @ w1) @ w2, y)
+    >>> loss.backward()
+"""
+
+from __future__ import annotations
+
+import weakref
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import grad
+from .tensor import Tensor, _held_by_leaves, saved_tensors_hooks
+
+class _Mask:
+    """
+    Bit-packed mask of the positive elements of an array.
+    """
+    
+    __slots__ = ('bits', 'shape', 'full', '__weakref__')
+    
+    def __init__(self, array: np.ndarray):
+        self.bits = np.packbits(array > 0, axis=None)
+        self.shape = array.shape
+        self.full: Optional[np.ndarray] = None
+    
+    def share(self, array: np.ndarray):
+        """Drop the mask in favor of `array`, the array it was computed from."""
+        self.full = array
+        self.bits = None
+    
+    def decompress(self) -> np.ndarray:
+        if self.full is not None:
+            return self.full
+        
+        size = int(np.prod(self.shape))
+        return np.unpackbits(self.bits, count=size).view(np.bool_).reshape(self.shape)
+    
+    @property
+    def nbytes(self) -> int:
+        return 0 if self.bits is None else self.bits.nbytes
+
+class _Half:
+    """
+    Array stored in float16.
+    """
+    
+    __slots__ = ('array', 'full', '__weakref__')
+    
+    def __init__(self, array: np.ndarray):
+        self.array = array.astype(np.float16)
+        self.full: Optional[np.ndarray] = None
+    
+    def share(self, array: np.ndarray):
+        """Drop the float16 copy in favor of `array`, the array it was made from."""
+        self.full = array
+        self.array = None
+    
+    def decompress(self) -> np.ndarray:
+        if self.full is not None:
+            return self.full
+        
+        return self.array.astype(np.float32)
+    
+    @property
+    def nbytes(self) -> int:
+        return 0 if self.array is None else self.array.nbytes
+
+class Compression(saved_tensors_hooks):
+    """
+    Saved-tensors hooks storing the arrays saved by some operations in a compact form.
+    
+    The masks of `relu` are exact. Storing the outputs of `sigmoid` and `tanh` or the inputs of matrix
+    multiplications in float16 introduces a relative error of about 1e-3 in the gradients flowing through
+    these operations.
+    
+    Attributes:
+        saved_bytes: Number of bytes saved for backward by the compressed operations, before compression,
+            not counting the arrays whose compact copies were dropped.
+        stored_bytes: Number of bytes actually stored for them.
+    """
+    
+    def __init__(self, relu_masks: bool = True, half_activations: bool = True, half_matmul: bool = False):
+        """
+        Initialize the compression policy.
+        
+        Args:
+            relu_masks: Whether to store the outputs of `relu` as bit-packed masks.
+            half_activations: Whether to store the outputs of `sigmoid` and `tanh` as float16.
+            half_matmul: Whether to store the left input of matrix multiplications as float16.
+                The right input, typically a weight, is kept as is.
+        """
+        
+        super().__init__(lambda array: array, self._decompress)
+        
+        self._rules = {}
+        if relu_masks:
+            self._rules[grad.relu_backward] = (_Mask,)
+        if half_activations:
+            self._rules[grad.sigmoid_backward] = (_Half,)
+            self._rules[grad.tanh_backward] = (_Half,)
+        if half_matmul:
+            self._rules[grad.matmul_backward] = (_Half, None)
+        
+        self.saved_bytes = 0
+        self.stored_bytes = 0
+        
+        # The compact copies of each saved array, or None once it is saved at full precision, by id of the
+        # array. Entries are removed when the array is garbage collected
+        self._copies: Dict[int, Optional[List[weakref.ref]]] = {}
+    
+    def pack_saved(self, grad_fn: Callable, saved: Tuple[np.ndarray, ...], parents: Tuple[Tensor, ...]) -> tuple:
+        """Compress the arrays saved for `grad_fn` according to the policy."""
+        rule = self._rules.get(grad_fn, ())
+        
+        packed = []
+        for position, array in enumerate(saved):
+            compress = rule[position] if position < len(rule) else None
+            
+            if id(array) not in self._copies:
+                weakref.finalize(array, self._copies.pop, id(array), None)
+                self._copies[id(array)] = []
+            copies = self._copies[id(array)]
+            
+            if compress is None or copies is None or _held_by_leaves(array, parents):
+                self._keep(array)
+                packed.append(array)
+                continue
+            
+            value = compress(array)
+            copies.append(weakref.ref(value))
+            self.saved_bytes += array.nbytes
+            self.stored_bytes += value.nbytes
+            packed.append(value)
+        
+        return tuple(packed)
+    
+    def _keep(self, array: np.ndarray):
+        """Record that `array` is saved at full precision, and drop its compact copies."""
+        copies = self._copies[id(array)]
+        if copies is None:
+            return
+        
+        self._copies[id(array)] = None
+        for entry in copies:
+            value = entry()
+            if value is not None:
+                self.saved_bytes -= array.nbytes
+                self.stored_bytes -= value.nbytes
+                value.share(array)
+    
+    @staticmethod
+    def _decompress(value: object) -> np.ndarray:
+        if isinstance(value, (_Mask, _Half)):
+            return value.decompress()
+        return value
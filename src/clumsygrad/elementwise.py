@@ -0,0 +1,131 @@
+"""
+This module provides multi-threaded execution of large element-wise operations.
+
+NumPy ufuncs such as `np.exp` or `np.tanh` run on a single core, but they release the GIL while they run.
+While a `ChunkedElementwise` executor is active, the ufuncs of the element-wise operations and of their
+backward functions are split into contiguous chunks when their output exceeds a size threshold, and the
+chunks are evaluated with `out=` slices on a thread pool.
+
+Chunking does not change the arithmetic of an element-wise operation, so the results are identical to
+the ones of a single call.
+
+Example:
+    
+    >>> with ChunkedElementwise(threads=8, threshold=2**18):
+    ...     loss = mean(tanh(x) * exp(-x))
+    ...     loss.backward()
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .tensor import _GradMode
+
+class ChunkedElementwise:
+    """
+    Executor splitting large element-wise ufuncs into chunks evaluated on a thread pool.
+    
+    The executor is selected for the duration of a `with` block. The thread pool is created when the block
+    is entered and shut down when it exits. The calling thread evaluates the first chunk itself.
+    
+    When every array argument has the shape of the output and all of them are C-contiguous, the flattened
+    arrays are split into equal chunks. Otherwise, the chunks are slices along the first axis of the output,
+    and arguments broadcast along that axis are passed whole.
+    """
+    
+    def __init__(self, threads: Optional[int] = None, threshold: int = 2**18):
+        """
+        Initialize the executor.
+        
+        Args:
+            threads: The number of chunks a large ufunc is split into, one per thread. Default is the number of CPUs.
+            threshold: The number of elements of the output from which a ufunc is split into chunks.
+        
+        Raises:
+            ValueError: If `threads` is not positive.
+        """
+        
+        if threads is None:
+            threads = os.cpu_count() or 1
+        if threads < 1:
+            raise ValueError("The number of threads must be positive")
+        
+        self.threads = threads
+        self.threshold = threshold
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._previous: List[object] = []
+    
+    def __enter__(self) -> ChunkedElementwise:
+        if self._executor is None and self.threads > 1:
+            self._executor = ThreadPoolExecutor(max_workers=self.threads - 1, thread_name_prefix='clumsygrad-elementwise')
+        
+        self._previous.append(_GradMode.elementwise)
+        _GradMode.elementwise = self
+        return self
+    
+    def __exit__(self, *exc):
+        _GradMode.elementwise = self._previous.pop()
+        
+        if not self._previous and self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        return False
+    
+    def _chunks(self, args: Sequence[object], out: np.ndarray) -> List[tuple]:
+        """
+        Split the arguments and the output of a ufunc into `(args, out)` chunks.
+        """
+        arrays = [arg for arg in args if isinstance(arg, np.ndarray) and arg.ndim > 0]
+        
+        if out.flags.c_contiguous and all(array.shape == out.shape and array.flags.c_contiguous for array in arrays):
+            flat_out = out.reshape(-1)
+            flat_args = [arg.reshape(-1) if isinstance(arg, np.ndarray) and arg.ndim > 0 else arg for arg in args]
+            bounds = np.linspace(0, out.size, self.threads + 1).astype(int)
+            
+            return [(tuple(arg[start:stop] if isinstance(arg, np.ndarray) and arg.ndim > 0 else arg for arg in flat_args),
+                     flat_out[start:stop])
+                    for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+        
+        length = out.shape[0]
+        bounds = np.linspace(0, length, min(self.threads, length) + 1).astype(int)
+        
+        def split(arg: object, start: int, stop: int) -> object:
+            # Arguments with fewer dimensions or a leading dimension of one are broadcast along the first axis
+            if not isinstance(arg, np.ndarray) or arg.ndim < out.ndim or arg.shape[0] == 1:
+                return arg
+            return arg[start:stop]
+        
+        return [(tuple(split(arg, start, stop) for arg in args), out[start:stop])
+                for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+    
+    def apply(self, ufunc: np.ufunc, args: Sequence[object], out: np.ndarray) -> np.ndarray:
+        """
+        Evaluate `ufunc(*args, out=out)` in chunks.
+        
+        Args:
+            ufunc: The element-wise ufunc to evaluate.
+            args: The arguments of the ufunc: arrays broadcastable to the shape of `out`, or scalars.
+            out: The array to write the result into.
+        
+        Returns:
+            `out`.
+        """
+        
+        if self._executor is None or out.size == 0 or out.ndim == 0:
+            return ufunc(*args, out=out)
+        
+        chunks = self._chunks(args, out)
+        futures = [self._executor.submit(ufunc, *chunk_args, out=chunk_out) for chunk_args, chunk_out in chunks[1:]]
+        
+        chunk_args, chunk_out = chunks[0]
+        ufunc(*chunk_args, out=chunk_out)
+        
+        for future in futures:
+            future.result()
+        
+        return out
@@ -0,0 +1,125 @@
+"""
+This module provides ensembles of identical multilayer perceptrons with stacked parameters.
+
+Training `K` copies of a model separately builds `K` graphs and steps `K` optimizers, and for small
+models most of that time is spent in Python rather than in NumPy. An `Ensemble` instead stores the
+weights of each layer of all the members as one PARAMETER tensor with a leading member axis, so the
+forward pass of the whole ensemble is one batched matrix multiplication per layer, the backward pass
+traverses a single graph, and one optimizer steps over the stacked parameters.
+
+The members do not share any parameter, so as long as the loss is a sum of the losses of the members,
+the gradient of each slice of the stacked parameters is the gradient its member would get on its own.
+The optimizers update each element independently, so a single optimizer over the stacked parameters
+trains each member as its own optimizer would.
+
+Example:
+    
+    >>> ensemble = Ensemble(members=8, layer_sizes=[4, 32, 1])
+    >>> optimizer = Adam(ensemble.parameters, lr=1e-3)
+    >>> pred = ensemble(x)  # shape (8, batch, 1)
+    >>> loss = sum((pred - y) ** 2)
+    >>> loss.backward()
+    >>> optimizer.step()
+"""
+
+from __future__ import annotations
+
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from .activation import relu
+from .tensor import Tensor, TensorType
+
+class Ensemble:
+    """
+    An ensemble of identical multilayer perceptrons, with the parameters of each layer stacked along a
+    leading member axis.
+    """
+    
+    def __init__(self, members: int, layer_sizes: Sequence[int],
+                 activation: Callable[[Tensor], Tensor] = relu,
+                 output_activation: Optional[Callable[[Tensor], Tensor]] = None,
+                 seed: Optional[int] = None):
+        """
+        Initialize the ensemble.
+        
+        Args:
+            members: The number of members of the ensemble.
+            layer_sizes: The number of features of the input and of the output of each layer, e.g.
+                `[4, 32, 1]` for one hidden layer of 32 units.
+            activation: The activation function applied after each hidden layer. Default is ReLU.
+            output_activation: The activation function applied after the last layer. Default is none.
+            seed: The seed of the random initialization of the weights, drawn from a normal distribution
+                scaled by the inverse square root of the number of input features of each layer.
+                The biases are initialized to zero.
+        
+        Raises:
+            ValueError: If there are no members or fewer than two layer sizes.
+        """
+        
+        if members < 1:
+            raise ValueError("An ensemble must have at least one member")
+        if len(layer_sizes) < 2:
+            raise ValueError("At least an input size and an output size are required")
+        
+        rng = np.random.default_rng(seed)
+        self.members = members
+        self.activation = activation
+        self.output_activation = output_activation
+        self.weights: List[Tensor] = []
+        self.biases: List[Tensor] = []
+        
+        for fan_in, fan_out in zip(layer_sizes[:-1], layer_sizes[1:]):
+            weight = rng.standard_normal((members, fan_in, fan_out)) / np.sqrt(fan_in)
+            self.weights.append(Tensor(weight, tensor_type=TensorType.PARAMETER))
+            self.biases.append(Tensor(np.zeros((members, 1, fan_out)), tensor_type=TensorType.PARAMETER))
+    
+    @property
+    def parameters(self) -> List[Tensor]:
+        """The stacked PARAMETER tensors of the ensemble, to pass to a single optimizer."""
+        return [param for pair in zip(self.weights, self.biases) for param in pair]
+    
+    def __call__(self, x: Tensor) -> Tensor:
+        """
+        Run every member on its input.
+        
+        Args:
+            x: The input, either of shape `(batch, features)` and shared by all the members,
+                or of shape `(members, batch, features)` with one batch per member.
+        
+        Returns:
+            The output of every member, of shape `(members, batch, outputs)`.
+        
+        Raises:
+            ValueError: If the shape of the input does not match the ensemble.
+        """
+        
+        if not isinstance(x, Tensor):
+            x = Tensor(x)
+        
+        if len(x._shape) not in (2, 3) or (len(x._shape) == 3 and x._shape[0] != self.members):
+            raise ValueError(f"Expected an input of shape (batch, features) or ({self.members}, batch, features), got {x._shape}")
+        
+        last = len(self.weights) - 1
+        for index, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            x = x @ weight + bias
+            
+            if index < last:
+                x = self.activation(x)
+            elif self.output_activation is not None:
+                x = self.output_activation(x)
+        
+        return x
+    
+    def member(self, index: int) -> List[np.ndarray]:
+        """
+        Return a copy of the parameters of one member, in the order of `parameters`, without the member axis.
+        
+        Raises:
+            IndexError: If there is no member at `index`.
+        """
+        
+        if not -self.members <= index < self.members:
+            raise IndexError(f"Member index {index} out of range for an ensemble of {self.members}")
+        return [param._data[index].copy() for param in self.parameters]
@@ -0,0 +1,199 @@
+"""
+This module provides forward-mode automatic differentiation.
+
+In forward mode, every tensor carries a tangent, the directional derivative of its value along a given
+direction of the inputs, and each operation computes the tangent of its result from the tangents of its
+inputs in the same pass as its value. A single pass gives the Jacobian-vector product `J @ v`, which is
+much cheaper than reverse mode for functions with few inputs and many outputs.
+
+The function is evaluated under `no_grad`, so no graph is built: the tangent of a tensor is freed along
+with the tensor, and the memory used does not grow with the depth of the computation.
+
+Example:
+    
+    >>> def f(theta):
+    ...     return tanh(x @ theta) * 2
+    >>> out, tangent = jvp(f, (theta,), (np.ones(theta.shape),))
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import grad
+from .tensor import Tensor, TensorType, _GradMode, no_grad
+
+def _linear(sign: float):
+    def rule(tangents, args, out, extra):
+        left, right = tangents
+        if right is None:
+            return left
+        if left is None:
+            return -right if sign < 0 else right
+        return left + right if sign > 0 else left - right
+    return rule
+
+def _mul(tangents, args, out, extra):
+    result = None
+    if tangents[0] is not None:
+        result = tangents[0] * args[1]
+    if tangents[1] is not None:
+        result = args[0] * tangents[1] if result is None else result + args[0] * tangents[1]
+    return result
+
+def _matmul(tangents, args, out, extra):
+    result = None
+    if tangents[0] is not None:
+        result = np.matmul(tangents[0], args[1])
+    if tangents[1] is not None:
+        result = np.matmul(args[0], tangents[1]) if result is None else result + np.matmul(args[0], tangents[1])
+    return result
+
+def _reduce(reduction):
+    def rule(tangents, args, out, extra):
+        return reduction(tangents[0], axis=extra.get('axis'), keepdims=extra.get('keepdims', False))
+    return rule
+
+def _softmax(tangents, args, out, extra):
+    product = out * tangents[0]
+    return product - out * np.sum(product, axis=extra.get('axis', -1), keepdims=True)
+
+def _loss(derivative):
+    def rule(tangents, args, out, extra):
+        pred, target = tangents
+        difference = pred if target is None else (-target if pred is None else pred - target)
+        return np.mean(derivative(args[0] - args[1]) * difference)
+    return rule
+
+_JVP: Dict[Callable, Callable] = {
+    grad.transpose_backward: lambda tangents, args, out, extra: tangents[0].T,
+    grad.add_backward: _linear(1),
+    grad.add_broadcast_backward: _linear(1),
+    grad.add_scalar_backward: lambda tangents, args, out, extra: tangents[0],
+    grad.sub_backward: _linear(-1),
+    grad.sub_broadcast_backward: _linear(-1),
+    grad.sub_scalar_backward: lambda tangents, args, out, extra: tangents[0],
+    grad.mul_backward: _mul,
+    grad.mul_broadcast_backward: _mul,
+    grad.mul_scalar_backward: lambda tangents, args, out, extra: tangents[0] * extra['scalar_value'],
+    grad.matmul_backward: _matmul,
+    grad.power_backward: lambda tangents, args, out, extra: extra['power'] * np.power(args[0], extra['power'] - 1) * tangents[0],
+    grad.negate_backward: lambda tangents, args, out, extra: -tangents[0],
+    grad.abs_backward: lambda tangents, args, out, extra: np.sign(args[0]) * tangents[0],
+    grad.reshape_backward: lambda tangents, args, out, extra: tangents[0].reshape(out.shape),
+    grad.sum_backward: _reduce(np.sum),
+    grad.mean_backward: _reduce(np.mean),
+    grad.exp_backward: lambda tangents, args, out, extra: out * tangents[0],
+    grad.log_backward: lambda tangents, args, out, extra: tangents[0] / args[0],
+    grad.sqrt_backward: lambda tangents, args, out, extra: tangents[0] / (2 * out),
+    grad.sin_backward: lambda tangents, args, out, extra: np.cos(args[0]) * tangents[0],
+    grad.cos_backward: lambda tangents, args, out, extra: -np.sin(args[0]) * tangents[0],
+    grad.tan_backward: lambda tangents, args, out, extra: tangents[0] / np.square(np.cos(args[0])),
+    grad.relu_backward: lambda tangents, args, out, extra: (out > 0) * tangents[0],
+    grad.sigmoid_backward: lambda tangents, args, out, extra: out * (1 - out) * tangents[0],
+    grad.tanh_backward: lambda tangents, args, out, extra: (1 - np.square(out)) * tangents[0],
+    grad.softmax_backward: _softmax,
+    grad.mse_backward: _loss(lambda difference: 2 * difference),
+    grad.mae_backward: _loss(np.sign),
+}
+"""
+Jacobian-vector products of the operations, keyed by their backward function.
+
+Each rule takes the tangents of the inputs, the input arrays, the output array and the extra metadata of the
+operation, and returns the tangent of the output. The tangent of an input that does not depend on the primals
+is None, and rules of unary operations are only called when the tangent of their input is set.
+"""
+
+class _DualRecorder:
+    """
+    Recorder computing the tangent of every tensor created while it is active.
+    """
+    
+    def __init__(self):
+        self._previous: List[object] = []
+    
+    def __enter__(self) -> _DualRecorder:
+        self._previous.append(_GradMode.recorder)
+        _GradMode.recorder = self
+        return self
+    
+    def __exit__(self, *exc):
+        _GradMode.recorder = self._previous.pop()
+        return False
+    
+    def owns(self, tensor: Tensor) -> bool:
+        return False
+    
+    def record(self, node: Tensor, grad_fn: Optional[Callable], parents: tuple, extra: Optional[dict]):
+        """Compute the tangent of `node` from the tangents of its parents."""
+        tangents = [parent._tangent for parent in parents]
+        if all(tangent is None for tangent in tangents):
+            return
+        
+        rule = _JVP.get(grad_fn)
+        if rule is None:
+            raise ValueError(f"Operation {getattr(grad_fn, '__name__', grad_fn)} is not supported in forward mode")
+        
+        tangent = rule(tangents, [parent._data for parent in parents], node._data, extra or {})
+        tangent = np.asarray(tangent, dtype=np.float32)
+        
+        if tangent.shape != node._shape:
+            tangent = np.ascontiguousarray(np.broadcast_to(tangent, node._shape))
+        
+        node._tangent = tangent
+
+Outputs = Union[Tensor, Sequence[Tensor]]
+
+def jvp(f: Callable[..., Outputs],
+        primals: Sequence[Union[Tensor, np.ndarray, list, float]],
+        tangents: Sequence[Union[np.ndarray, list, float]]) -> Tuple[Outputs, Union[np.ndarray, Tuple[np.ndarray, ...]]]:
+    """
+    Evaluate `f(*primals)` and its Jacobian-vector product along `tangents` in a single forward pass.
+    
+    Args:
+        f: The function to differentiate. It takes one tensor per primal and returns a tensor or a sequence of tensors.
+            Tensors it captures from an enclosing scope are treated as constants.
+        primals: The point at which `f` is evaluated.
+        tangents: The direction of the derivative, one array per primal with the same shape.
+    
+    Returns:
+        A tuple `(outputs, output_tangents)`: the outputs of `f`, as INPUT tensors without a graph, and the tangent
+        of each output, i.e. the derivative of the output along `tangents`, with the same structure as the outputs.
+    
+    Raises:
+        ValueError: If the numbers or the shapes of `primals` and `tangents` do not match, or if `f` performs an
+            operation that is not supported in forward mode.
+    """
+    
+    if len(primals) != len(tangents):
+        raise ValueError(f"Got {len(primals)} primals but {len(tangents)} tangents")
+    
+    inputs = []
+    for primal, tangent in zip(primals, tangents):
+        value = Tensor(primal._data if isinstance(primal, Tensor) else primal, tensor_type=TensorType.INPUT)
+        tangent = np.array(tangent, dtype=np.float32)
+        
+        if tangent.shape != value._shape:
+            raise ValueError(f"Tangent shape {tangent.shape} does not match primal shape {value._shape}")
+        
+        value._tangent = tangent
+        inputs.append(value)
+    
+    with no_grad(), _DualRecorder():
+        outputs = f(*inputs)
+    
+    # The tangents are detached from the outputs, so they are not mistaken for primals of an enclosing `jvp`
+    def tangent_of(output: Tensor) -> np.ndarray:
+        tangent = output._tangent
+        output._tangent = None
+        
+        if tangent is None:
+            return np.zeros(output._shape, dtype=np.float32)
+        return tangent
+    
+    if isinstance(outputs, Tensor):
+        return outputs, tangent_of(outputs)
+    
+    return outputs, tuple(tangent_of(output) for output in outputs)
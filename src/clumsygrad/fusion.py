@@ -0,0 +1,259 @@
+"""
+This module provides fusion of chains of element-wise operations into a single node of the computational graph.
+
+A function decorated with `fuse` is traced once per combination of input shapes. The element-wise operations
+it performs are then evaluated one after the other with in-place ufuncs writing into scratch buffers, and only
+the result is allocated. The graph contains a single fused node instead of one node per operation, and its
+backward function recomputes the chain and applies the chain rule in one sweep, again with in-place ufuncs.
+
+Example:
+    
+    >>> @fuse
+    ... def f(x):
+    ...     return exp(x**2 + 3*x + 2)
+    >>> x = Tensor([1.0, 2.0, 3.0], tensor_type=TensorType.PARAMETER)
+    >>> y = f(x)  # a single node with grad_fn=fused_backward
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import grad
+from .graph import StaticGraph
+from .tensor import Tensor, no_grad
+
+def _power(g, args, out, extra, tmp, spare):
+    np.power(args[0], extra['power'] - 1, out=tmp)
+    np.multiply(tmp, extra['power'], out=tmp)
+    return ((np.multiply(g, tmp, out=tmp), 1),)
+
+def _sigmoid(g, args, out, extra, tmp, spare):
+    np.subtract(1, out, out=tmp)
+    np.multiply(tmp, out, out=tmp)
+    return ((np.multiply(g, tmp, out=tmp), 1),)
+
+def _tanh(g, args, out, extra, tmp, spare):
+    np.square(out, out=tmp)
+    np.subtract(1, tmp, out=tmp)
+    return ((np.multiply(g, tmp, out=tmp), 1),)
+
+def _tan(g, args, out, extra, tmp, spare):
+    np.cos(args[0], out=tmp)
+    np.square(tmp, out=tmp)
+    np.divide(1, tmp, out=tmp)
+    return ((np.multiply(g, tmp, out=tmp), 1),)
+
+def _sqrt(g, args, out, extra, tmp, spare):
+    np.multiply(out, 2, out=tmp)
+    return ((np.divide(g, tmp, out=tmp), 1),)
+
+def _unary(fn):
+    def rule(g, args, out, extra, tmp, spare):
+        fn(args[0], out=tmp)
+        return ((np.multiply(g, tmp, out=tmp), 1),)
+    return rule
+
+_RULES: Dict[Callable, Callable] = {
+    grad.add_backward: lambda g, args, out, extra, tmp, spare: ((g, 1), (g, 1)),
+    grad.sub_backward: lambda g, args, out, extra, tmp, spare: ((g, 1), (g, -1)),
+    grad.mul_backward: lambda g, args, out, extra, tmp, spare: ((np.multiply(g, args[1], out=tmp), 1), (np.multiply(g, args[0], out=spare), 1)),
+    grad.add_scalar_backward: lambda g, args, out, extra, tmp, spare: ((g, 1),),
+    grad.sub_scalar_backward: lambda g, args, out, extra, tmp, spare: ((g, 1),),
+    grad.mul_scalar_backward: lambda g, args, out, extra, tmp, spare: ((g, extra['scalar_value']),),
+    grad.negate_backward: lambda g, args, out, extra, tmp, spare: ((g, -1),),
+    grad.power_backward: _power,
+    grad.abs_backward: _unary(np.sign),
+    grad.exp_backward: lambda g, args, out, extra, tmp, spare: ((np.multiply(g, out, out=tmp), 1),),
+    grad.log_backward: lambda g, args, out, extra, tmp, spare: ((np.divide(g, args[0], out=tmp), 1),),
+    grad.sqrt_backward: _sqrt,
+    grad.sin_backward: _unary(np.cos),
+    grad.cos_backward: lambda g, args, out, extra, tmp, spare: ((np.multiply(g, np.negative(np.sin(args[0], out=tmp), out=tmp), out=tmp), 1),),
+    grad.tan_backward: _tan,
+    grad.relu_backward: lambda g, args, out, extra, tmp, spare: ((np.multiply(g, out > 0, out=tmp), 1),),
+    grad.sigmoid_backward: _sigmoid,
+    grad.tanh_backward: _tanh,
+}
+"""
+Local derivatives of the element-wise operations that can be fused, keyed by their backward function.
+
+Each rule takes the incoming gradient, the input values, the output value, the extra metadata of the operation
+and two scratch buffers, and returns one `(array, scale)` pair per input: the gradient of that input is `scale * array`.
+The arrays may be the scratch buffers, which are consumed before the next rule runs. Rules with a single input only use `tmp`.
+"""
+
+class FusedProgram:
+    """
+    A traced chain of element-wise operations, evaluated with in-place ufuncs into reusable scratch buffers.
+    
+    Values are numbered by slot: first the inputs of the fused function, then the tensors it captured
+    (e.g. parameters from an enclosing scope), then the result of each operation in order. The program
+    ends with the operation producing the output: the operations traced after it do not contribute to
+    the output, and are left out.
+    """
+    
+    def __init__(self, graph: StaticGraph, inputs: List[Tensor], output: Tensor):
+        slots: Dict[int, int] = {id(tensor): slot for slot, tensor in enumerate(inputs)}
+        self.captured: List[Tensor] = []
+        self.steps: List[Tuple[Callable, Callable, List[int], dict]] = []
+        shape = output._shape
+        
+        end = next((index + 1 for index, op in enumerate(graph._ops) if op.node is output), 0)
+        if end == 0:
+            raise ValueError("The fused function must return the result of an element-wise operation")
+        
+        for op in graph._ops[:end]:
+            rule = _RULES.get(op.grad_fn)
+            if rule is None:
+                raise ValueError(f"Operation {op.grad_fn.__name__} is not element-wise and cannot be fused")
+            
+            args = []
+            for tensor in op.inputs:
+                if tensor._shape != shape:
+                    raise ValueError(f"Cannot fuse operations on tensors of shapes {tensor._shape} and {shape}")
+                
+                if id(tensor) not in slots:
+                    slots[id(tensor)] = len(inputs) + len(self.captured)
+                    self.captured.append(tensor)
+                args.append(slots[id(tensor)])
+            
+            self.steps.append((op.kernel, rule, args, op.extra))
+            slots[id(op.node)] = -len(self.steps)
+        
+        self.num_inputs = len(inputs)
+        self.shape = shape
+        self._values = [np.empty(shape, dtype=np.float32) for _ in self.steps]
+        self._grads = [np.empty(shape, dtype=np.float32) for _ in self.steps]
+        self._scratch = (np.empty(shape, dtype=np.float32), np.empty(shape, dtype=np.float32))
+        self._lock = threading.Lock()
+        
+        # Re-index the results of the operations after the inputs and the captured tensors
+        offset = len(inputs) + len(self.captured)
+        self.steps = [(kernel, rule, [arg if arg >= 0 else offset - arg - 1 for arg in args], extra)
+                      for kernel, rule, args, extra in self.steps]
+    
+    def _evaluate(self, arrays: List[np.ndarray], out: Optional[np.ndarray] = None) -> List[np.ndarray]:
+        values = list(arrays)
+        last = len(self.steps) - 1
+        
+        for index, (kernel, rule, args, extra) in enumerate(self.steps):
+            buffer = out if index == last and out is not None else self._values[index]
+            kernel([values[arg] for arg in args], extra, buffer)
+            values.append(buffer)
+        
+        return values
+    
+    def forward(self, arrays: List[np.ndarray]) -> np.ndarray:
+        """
+        Evaluate the chain of operations.
+        
+        Args:
+            arrays: The data of the inputs followed by the data of the captured tensors.
+        
+        Returns:
+            A newly allocated array with the result.
+        """
+        
+        with self._lock:
+            out = np.empty(self.shape, dtype=np.float32)
+            self._evaluate(arrays, out)
+            return out
+    
+    def backward(self, arrays: List[np.ndarray], grad: np.ndarray, needs_grad: List[bool]) -> Tuple[Optional[np.ndarray], ...]:
+        """
+        Recompute the chain of operations and propagate `grad` back to its inputs.
+        
+        Args:
+            arrays: The data of the inputs followed by the data of the captured tensors.
+            grad: The gradient of the result.
+            needs_grad: Whether a gradient is needed for each of `arrays`.
+        
+        Returns:
+            A tuple with a newly allocated gradient, or None, for each of `arrays`.
+        
+        Note:
+            - The scratch buffers are shared by every node of the program, so concurrent calls are serialized.
+        """
+        
+        with self._lock:
+            values = self._evaluate(arrays)
+            num_leaves = len(arrays)
+            grads: List[Optional[np.ndarray]] = [None] * len(values)
+            grads[-1] = grad
+            scratch = self._scratch
+            
+            for index in range(len(self.steps) - 1, -1, -1):
+                kernel, rule, args, extra = self.steps[index]
+                g = grads[num_leaves + index]
+                
+                if g is None:
+                    continue
+                
+                for arg, (contribution, scale) in zip(args, rule(g, [values[arg] for arg in args], values[num_leaves + index], extra, *scratch)):
+                    if arg < num_leaves and not needs_grad[arg]:
+                        continue
+                    
+                    target = grads[arg]
+                    if target is None:
+                        target = grads[arg] = np.empty(self.shape, dtype=np.float32) if arg < num_leaves else self._grads[arg - num_leaves]
+                        np.multiply(contribution, scale, out=target)
+                    elif scale == 1:
+                        np.add(target, contribution, out=target)
+                    else:
+                        target += contribution * scale
+            
+            return tuple(grads[:num_leaves])
+
+def fuse(fn: Callable) -> Callable:
+    """
+    Decorator fusing the element-wise operations performed by `fn` into a single node.
+    
+    `fn` must take tensors of the same shape and combine them, and any tensor it captures, with element-wise
+    operations only: arithmetic between tensors of the same shape or with scalars, powers, functions of
+    `clumsygrad.math` other than reductions, and the `relu`, `sigmoid` and `tanh` activations.
+    The function is traced again for each new combination of input shapes.
+    
+    The tensors captured by `fn` are bound when it is traced. Their data is read at every call, so
+    in-place updates such as optimizer steps are seen, but if `fn` captures a name that is later bound to
+    another tensor, the program keeps using the tensor it was traced with.
+    
+    Args:
+        fn: The function to fuse.
+    
+    Returns:
+        A function with the same signature, returning a single fused node.
+    
+    Raises:
+        ValueError: When `fn` is traced, if it performs an operation that cannot be fused.
+    """
+    
+    programs: Dict[Tuple[tuple, ...], FusedProgram] = {}
+    
+    @functools.wraps(fn)
+    def wrapper(*tensors: Tensor) -> Tensor:
+        key = tuple(tensor._shape for tensor in tensors)
+        program = programs.get(key)
+        
+        if program is None:
+            graph = StaticGraph()
+            inputs = [graph.placeholder(shape) for shape in key]
+            with no_grad(), graph, np.errstate(all='ignore'):
+                output = fn(*inputs)
+            program = programs[key] = FusedProgram(graph, inputs, output)
+        
+        parents = tensors + tuple(program.captured)
+        arrays = tuple(tensor._data for tensor in parents)
+        
+        return Tensor._create_node(
+            data=program.forward(arrays),
+            grad_fn=grad.fused_backward,
+            parents=parents,
+            extra={'program': program},
+            saved=arrays
+        )
+    
+    return wrapper
@@ -10,6 +10,14 @@ Args:
     
 Returns:
     Tuple of gradients for each parent tensor
+    
+Note:
+    Backward functions only read the arrays saved by the forward operation in `tensor._saved`
+    and the metadata in `tensor._extra`.
+    
+    A returned gradient may be `grad` itself or a view of it (e.g. a transpose or a broadcast).
+    Any other returned array must be freshly allocated, as the backward pass takes ownership
+    of it and accumulates further gradients into it in place.
 """
 
 from __future__ import annotations
@@ -18,13 +26,17 @@ from typing import Tuple
 
 import numpy as np
 
-from .tensor import Tensor
+from .tensor import Tensor, _empty, _ufunc
 
 GradientTuple = Tuple[np.ndarray, ...]
 """
 A tuple of gradients for each parent tensor.
 """
 
+def _matmul(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    shape = np.broadcast_shapes(a.shape[:-2], b.shape[:-2]) + (a.shape[-2], b.shape[-1])
+    return np.matmul(a, b, out=_empty(shape))
+
 """
 Elemetary backward functions for tensor operations.
 """
@@ -40,6 +52,18 @@ def transpose_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     """
     return (grad.T,)
 
+def swapaxes_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
+    r"""
+    Backward function for the transpose of each matrix of a batch, used by `clumsygrad.hessian`
+    to differentiate batched matrix multiplications.
+    
+    For :math:`z_b = x_b^T`:
+    
+    .. math::
+        \frac{\partial z_b}{\partial x_b} = \text{grad}_b^T
+    """
+    return (np.swapaxes(grad, -1, -2),)
+
 def add_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
     Backward function for addition operation.
@@ -71,7 +95,7 @@ def sub_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     .. math::
         \frac{\partial z}{\partial x} = 1, \quad \frac{\partial z}{\partial y} = -1
     """
-    return (grad, -grad)
+    return (grad, _ufunc(np.negative, grad, out=_empty(grad.shape)))
 
 def sub_scalar_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
@@ -93,8 +117,8 @@ def mul_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     .. math::
         \frac{\partial z}{\partial x} = y, \quad \frac{\partial z}{\partial y} = x
     """
-    x, y = tensor._parents
-    return (grad * y._data, grad * x._data)
+    x, y = tensor._saved
+    return (_ufunc(np.multiply, grad, y, out=_empty(grad.shape)), _ufunc(np.multiply, grad, x, out=_empty(grad.shape)))
 
 def mul_scalar_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
@@ -107,7 +131,7 @@ def mul_scalar_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     """
     
     scalar = tensor._extra.get('scalar_value', 1)
-    return (grad * scalar,)
+    return (_ufunc(np.multiply, grad, scalar, out=_empty(grad.shape)),)
 
 def matmul_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
@@ -118,9 +142,16 @@ def matmul_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     .. math::
         \frac{\partial Z}{\partial X} = \text{grad} \cdot Y^T, \quad 
         \frac{\partial Z}{\partial Y} = X^T \cdot \text{grad}
+    
+    For stacks of matrices, the transposes swap the last two axes, and the gradients are
+    summed over the leading axes each operand was broadcast along.
     """
-    x, y = tensor._parents
-    return (grad @ y._data.T, x._data.T @ grad)
+    x, y = tensor._saved
+    if x.ndim == 2 and y.ndim == 2:
+        return (_matmul(grad, y.T), _matmul(x.T, grad))
+    
+    return (_reduce_gradient_to_shape(_matmul(grad, np.swapaxes(y, -1, -2)), x.shape),
+            _reduce_gradient_to_shape(_matmul(np.swapaxes(x, -1, -2), grad), y.shape))
 
 def power_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
@@ -131,9 +162,12 @@ def power_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     .. math::
         \frac{\partial z}{\partial x} = n \cdot x^{n-1}
     """
-    x = tensor._parents[0]
+    x, = tensor._saved
     power = tensor._extra.get('power', 1)
-    return (grad * (power * (x._data ** (power - 1))),)
+    
+    grad_input = _ufunc(np.power, x, power - 1, out=_empty(grad.shape))
+    _ufunc(np.multiply, grad_input, power, out=grad_input)
+    return (_ufunc(np.multiply, grad, grad_input, out=grad_input),)
 
 def negate_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
@@ -144,7 +178,7 @@ def negate_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     .. math::
         \frac{\partial z}{\partial x} = -1
     """
-    return (-grad,)
+    return (_ufunc(np.negative, grad, out=_empty(grad.shape)),)
 
 def abs_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
@@ -159,8 +193,9 @@ def abs_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
         0 & \text{if } x = 0
         \end{cases}
     """
-    x = tensor._parents[0]
-    return (grad * np.sign(x._data),)
+    x, = tensor._saved
+    grad_input = _ufunc(np.sign, x, out=_empty(grad.shape))
+    return (_ufunc(np.multiply, grad, grad_input, out=grad_input),)
 
 def reshape_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
@@ -266,7 +301,8 @@ def exp_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     .. math::
         \frac{\partial z}{\partial x} = e^x
     """
-    return (grad * tensor._data,)
+    exp_output, = tensor._saved
+    return (_ufunc(np.multiply, grad, exp_output, out=_empty(grad.shape)),)
 
 def log_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
@@ -277,8 +313,8 @@ def log_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     .. math::
         \frac{\partial z}{\partial x} = \frac{1}{x}
     """
-    x = tensor._parents[0]
-    return (grad / x._data,)
+    x, = tensor._saved
+    return (_ufunc(np.divide, grad, x, out=_empty(grad.shape)),)
 
 def sqrt_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
@@ -289,8 +325,9 @@ def sqrt_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     .. math::
         \frac{\partial z}{\partial x} = \frac{1}{2\sqrt{x}}
     """
-    x = tensor._parents[0]
-    return (grad / (2 * np.sqrt(x._data)),)
+    sqrt_output, = tensor._saved
+    grad_input = _ufunc(np.multiply, sqrt_output, 2, out=_empty(grad.shape))
+    return (_ufunc(np.divide, grad, grad_input, out=grad_input),)
 
 def sin_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
@@ -301,8 +338,9 @@ def sin_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     .. math::
         \frac{\partial z}{\partial x} = \cos(x)
     """
-    x = tensor._parents[0]
-    return (grad * np.cos(x._data),)
+    x, = tensor._saved
+    grad_input = _ufunc(np.cos, x, out=_empty(grad.shape))
+    return (_ufunc(np.multiply, grad, grad_input, out=grad_input),)
 
 def cos_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
@@ -313,8 +351,10 @@ def cos_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     .. math::
         \frac{\partial z}{\partial x} = -\sin(x)
     """
-    x = tensor._parents[0]
-    return (grad * -np.sin(x._data),)
+    x, = tensor._saved
+    grad_input = _ufunc(np.sin, x, out=_empty(grad.shape))
+    _ufunc(np.negative, grad_input, out=grad_input)
+    return (_ufunc(np.multiply, grad, grad_input, out=grad_input),)
 
 def tan_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
@@ -325,8 +365,11 @@ def tan_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     .. math::
         \frac{\partial z}{\partial x} = \sec^2(x)
     """
-    x = tensor._parents[0]
-    return (grad * (1 / np.cos(x._data) ** 2),)
+    x, = tensor._saved
+    grad_input = _ufunc(np.cos, x, out=_empty(grad.shape))
+    _ufunc(np.square, grad_input, out=grad_input)
+    _ufunc(np.divide, 1, grad_input, out=grad_input)
+    return (_ufunc(np.multiply, grad, grad_input, out=grad_input),)
 
 
 """
@@ -345,7 +388,9 @@ def relu_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
         0 & \text{otherwise}
         \end{cases}
     """
-    return (grad * (tensor._data > 0).astype(np.float32),)
+    relu_output, = tensor._saved
+    grad_input = _ufunc(np.greater, relu_output, 0, out=_empty(grad.shape))
+    return (_ufunc(np.multiply, grad, grad_input, out=grad_input),)
 
 def sigmoid_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
@@ -356,8 +401,10 @@ def sigmoid_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     .. math::
         \frac{\partial z}{\partial x} = \sigma(x) \cdot (1 - \sigma(x))
     """
-    sigmoid_output = 1 / (1 + np.exp(-tensor._data))
-    return (grad * sigmoid_output * (1 - sigmoid_output),)
+    sigmoid_output, = tensor._saved
+    grad_input = _ufunc(np.subtract, 1, sigmoid_output, out=_empty(grad.shape))
+    _ufunc(np.multiply, grad_input, sigmoid_output, out=grad_input)
+    return (_ufunc(np.multiply, grad, grad_input, out=grad_input),)
 
 def tanh_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
@@ -368,8 +415,10 @@ def tanh_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     .. math::
         \frac{\partial z}{\partial x} = 1 - \tanh^2(x)
     """
-    tanh_output = tensor._data
-    return (grad * (1 - tanh_output ** 2),)
+    tanh_output, = tensor._saved
+    grad_input = _ufunc(np.square, tanh_output, out=_empty(grad.shape))
+    _ufunc(np.subtract, 1, grad_input, out=grad_input)
+    return (_ufunc(np.multiply, grad, grad_input, out=grad_input),)
 
 def softmax_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     r"""
@@ -388,10 +437,12 @@ def softmax_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     .. math::
         \frac{\partial L}{\partial x} = z \odot \left(\text{grad} - \sum(z \odot \text{grad})\right)
     """
-    softmax_output = tensor._data
+    softmax_output, = tensor._saved
     
     axis = tensor._extra.get('axis', -1)
-    grad_input = softmax_output * (grad - np.sum(softmax_output * grad, axis=axis, keepdims=True))
+    grad_input = _ufunc(np.multiply, softmax_output, grad, out=_empty(grad.shape))
+    _ufunc(np.subtract, grad, np.sum(grad_input, axis=axis, keepdims=True), out=grad_input)
+    _ufunc(np.multiply, softmax_output, grad_input, out=grad_input)
     
     return (grad_input,)
 
@@ -411,8 +462,8 @@ def mse_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
         
         \frac{\partial L}{\partial \text{target}} = -2(\text{pred} - \text{target})
     """
-    pred, target = tensor._parents
-    diff = pred._data - target._data
+    pred, target = tensor._saved
+    diff = pred - target
     return (2 * diff * grad, -2 * diff * grad)
 
 def mae_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
@@ -428,9 +479,9 @@ def mae_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     
     where :math:`n` is the number of elements.
     """
-    pred, target = tensor._parents
-    diff = pred._data - target._data
-    n = pred._data.size
+    pred, target = tensor._saved
+    diff = pred - target
+    n = pred.size
     sign_diff = np.sign(diff)
     
     return (grad * sign_diff / n, grad * (-sign_diff) / n)
@@ -500,16 +551,64 @@ def mul_broadcast_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
     
     left_shape = tensor._extra.get('left_shape')
     right_shape = tensor._extra.get('right_shape')
-    x, y = tensor._parents
+    x, y = tensor._saved
     
-    y_broadcasted = np.broadcast_to(y._data, grad.shape)
-    x_broadcasted = np.broadcast_to(x._data, grad.shape)
+    y_broadcasted = np.broadcast_to(y, grad.shape)
+    x_broadcasted = np.broadcast_to(x, grad.shape)
     
     left_grad = _reduce_gradient_to_shape(grad * y_broadcasted, left_shape)
     right_grad = _reduce_gradient_to_shape(grad * x_broadcasted, right_shape)
     
     return (left_grad, right_grad)
 
+"""
+Backward functions for fused and checkpointed operations.
+"""
+
+def fused_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
+    r"""
+    Backward function for a chain of element-wise operations fused by `clumsygrad.fusion.fuse`.
+    
+    For :math:`z = f_k(\dots f_1(x_1, \dots, x_n))`, the intermediate values are recomputed into
+    scratch buffers and the chain rule is applied to each operation in reverse order:
+    
+    .. math::
+        \frac{\partial z}{\partial x_i} = \sum_{\text{paths}} \prod_j \frac{\partial f_j}{\partial f_{j-1}}
+    """
+    program = tensor._extra['program']
+    return program.backward(list(tensor._saved), grad, [parent._requires_grad for parent in tensor._parents])
+
+def checkpoint_backward(tensor: Tensor, grad: np.ndarray) -> GradientTuple:
+    r"""
+    Backward function for a segment run by `clumsygrad.checkpoint.checkpoint`.
+    
+    For :math:`z = f(x_1, \dots, x_n)`, the segment :math:`f` is run again on detached copies of its inputs
+    to rebuild its internal graph, which is then differentiated with an inner backward pass:
+    
+    .. math::
+        \frac{\partial z}{\partial x_i} = \frac{\partial f}{\partial x_i}
+    
+    PARAMETER tensors used inside the segment receive their gradients from the inner backward pass.
+    """
+    from .tensor import TensorType, _GradMode
+    
+    leaves = []
+    for parent, data in zip(tensor._parents, tensor._saved):
+        leaf = Tensor.__new__(Tensor)
+        leaf._setup(data, TensorType.PARAMETER if parent._requires_grad else TensorType.INPUT)
+        leaves.append(leaf)
+    
+    enabled, recorder = _GradMode.enabled, _GradMode.recorder
+    _GradMode.enabled, _GradMode.recorder = True, None
+    try:
+        output = tensor._extra['fn'](*leaves)
+        if output._requires_grad:
+            output.backward(grad)
+    finally:
+        _GradMode.enabled, _GradMode.recorder = enabled, recorder
+    
+    return tuple(leaf._grad for leaf in leaves)
+
 def _reduce_gradient_to_shape(grad: np.ndarray, target_shape: tuple) -> np.ndarray:
     r"""
     Reduce gradient from broadcasted shape back to target shape.
@@ -537,6 +636,7 @@ def _reduce_gradient_to_shape(grad: np.ndarray, target_shape: tuple) -> np.ndarr
         if target_dim == 1 and result_dim > 1:
             result = np.sum(result, axis=i, keepdims=True)
 
-    result = result.reshape(target_shape)
+    if result.shape != target_shape:
+        result = result.reshape(target_shape)
     
     return result
\ No newline at end of file
@@ -0,0 +1,311 @@
+"""
+This module provides a static graph mode, where a computational graph is built once and executed repeatedly.
+
+Placeholders stand in for the data that changes between iterations. Operations performed inside a
+`StaticGraph` block are recorded, and `StaticGraph.run` then feeds new arrays into the placeholders and
+replays the forward and backward passes of the recorded graph. No `Tensor` is created during a run:
+every result is written in place into the buffers allocated when the graph was built, and only the
+gradients of PARAMETER tensors are written out.
+
+Example:
+    
+    >>> graph = StaticGraph()
+    >>> x = graph.placeholder((32, 4))
+    >>> y = graph.placeholder((32, 1))
+    >>> with graph:
+    ...     loss = mse_loss(relu(x @ w1 + b1) @ w2 + b2, y)
+    >>> for x_batch, y_batch in batches:
+    ...     graph.run({x: x_batch, y: y_batch}, loss)
+    ...     optimizer.step()
+    ...     optimizer.zero_grad()
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import grad
+from .tensor import Tensor, TensorType, _GradMode
+
+def _softmax(inputs, extra, out):
+    axis = extra.get('axis', -1)
+    np.subtract(inputs[0], np.max(inputs[0], axis=axis, keepdims=True), out=out)
+    np.exp(out, out=out)
+    np.divide(out, np.sum(out, axis=axis, keepdims=True), out=out)
+
+def _sigmoid(inputs, extra, out):
+    np.negative(inputs[0], out=out)
+    np.exp(out, out=out)
+    np.add(out, 1, out=out)
+    np.divide(1, out, out=out)
+
+def _reduce(reduction):
+    def kernel(inputs, extra, out):
+        reduction(inputs[0], axis=extra.get('axis'), keepdims=extra.get('keepdims', False), out=out)
+    return kernel
+
+def _loss(fn):
+    def kernel(inputs, extra, out):
+        out[...] = np.mean(fn(inputs[0] - inputs[1]))
+    return kernel
+
+_FORWARD: Dict[Callable, Callable] = {
+    grad.transpose_backward: lambda inputs, extra, out: np.copyto(out, inputs[0].T),
+    grad.add_backward: lambda inputs, extra, out: np.add(inputs[0], inputs[1], out=out),
+    grad.add_broadcast_backward: lambda inputs, extra, out: np.add(inputs[0], inputs[1], out=out),
+    grad.add_scalar_backward: lambda inputs, extra, out: np.add(inputs[0], extra['scalar_value'], out=out),
+    grad.sub_backward: lambda inputs, extra, out: np.subtract(inputs[0], inputs[1], out=out),
+    grad.sub_broadcast_backward: lambda inputs, extra, out: np.subtract(inputs[0], inputs[1], out=out),
+    grad.sub_scalar_backward: lambda inputs, extra, out: np.subtract(inputs[0], extra['scalar_value'], out=out),
+    grad.mul_backward: lambda inputs, extra, out: np.multiply(inputs[0], inputs[1], out=out),
+    grad.mul_broadcast_backward: lambda inputs, extra, out: np.multiply(inputs[0], inputs[1], out=out),
+    grad.mul_scalar_backward: lambda inputs, extra, out: np.multiply(inputs[0], extra['scalar_value'], out=out),
+    grad.matmul_backward: lambda inputs, extra, out: np.matmul(inputs[0], inputs[1], out=out),
+    grad.power_backward: lambda inputs, extra, out: np.power(inputs[0], extra['power'], out=out),
+    grad.negate_backward: lambda inputs, extra, out: np.negative(inputs[0], out=out),
+    grad.abs_backward: lambda inputs, extra, out: np.abs(inputs[0], out=out),
+    grad.reshape_backward: lambda inputs, extra, out: np.copyto(out, inputs[0].reshape(out.shape)),
+    grad.sum_backward: _reduce(np.sum),
+    grad.mean_backward: _reduce(np.mean),
+    grad.exp_backward: lambda inputs, extra, out: np.exp(inputs[0], out=out),
+    grad.log_backward: lambda inputs, extra, out: np.log(inputs[0], out=out),
+    grad.sqrt_backward: lambda inputs, extra, out: np.sqrt(inputs[0], out=out),
+    grad.sin_backward: lambda inputs, extra, out: np.sin(inputs[0], out=out),
+    grad.cos_backward: lambda inputs, extra, out: np.cos(inputs[0], out=out),
+    grad.tan_backward: lambda inputs, extra, out: np.tan(inputs[0], out=out),
+    grad.relu_backward: lambda inputs, extra, out: np.maximum(0, inputs[0], out=out),
+    grad.sigmoid_backward: _sigmoid,
+    grad.tanh_backward: lambda inputs, extra, out: np.tanh(inputs[0], out=out),
+    grad.softmax_backward: _softmax,
+    grad.mse_backward: _loss(np.square),
+    grad.mae_backward: _loss(np.abs),
+}
+"""
+Forward kernels of the operations, keyed by their backward function.
+Each kernel takes the input arrays, the extra metadata of the operation and the output buffer to write into.
+"""
+
+class _Op:
+    __slots__ = ('node', 'kernel', 'grad_fn', 'inputs', 'extra')
+    
+    def __init__(self, node: Tensor, kernel: Callable, grad_fn: Callable, inputs: Tuple[Tensor, ...], extra: dict):
+        self.node = node
+        self.kernel = kernel
+        self.grad_fn = grad_fn
+        self.inputs = inputs
+        self.extra = extra
+
+class _Plan:
+    """
+    Execution plan of the subgraph needed to compute one output.
+    """
+    
+    def __init__(self, ops: List[_Op], output: Tensor):
+        needed = {id(output)}
+        selected: List[_Op] = []
+        
+        for op in reversed(ops):
+            if id(op.node) in needed:
+                selected.append(op)
+                needed.update(id(node) for node in op.inputs)
+        selected.reverse()
+        
+        self.ops = selected
+        self.forward_steps = [(op.kernel, [node._data for node in op.inputs], op.extra, op.node._data)
+                              for op in selected]
+        
+        # Each tensor receiving a gradient gets a slot: first the recorded ops, then the leaves
+        self.nodes = [op.node for op in selected]
+        slots = {id(node): position for position, node in enumerate(self.nodes)}
+        self.backward_steps = []
+        
+        for position in reversed(range(len(selected))):
+            op = selected[position]
+            if not op.node._requires_grad:
+                continue
+            
+            targets = []
+            for node in op.inputs:
+                if not node._requires_grad:
+                    targets.append(-1)
+                    continue
+                
+                if id(node) not in slots:
+                    slots[id(node)] = len(self.nodes)
+                    self.nodes.append(node)
+                targets.append(slots[id(node)])
+            
+            self.backward_steps.append((position, op.node, op.grad_fn, targets))
+        
+        self.grad_buffers = [np.empty(node._shape, dtype=np.float32) for node in self.nodes]
+        self.parameters = [(position, node) for position, node in enumerate(self.nodes)
+                           if node._tensor_type == TensorType.PARAMETER]
+        self.output_index = slots[id(output)]
+
+class StaticGraph:
+    """
+    A computational graph that is built once and executed repeatedly with new input data.
+    
+    Operations performed inside a `with` block on the graph are recorded. The tensors created while
+    recording own the buffers that are reused by every run, so the data of a recorded tensor always
+    holds the result of the latest run.
+    
+    Note:
+        - Parameters have to be updated in place between runs, as done by the optimizers.
+        - Tensors of the graph should not be passed to `Tensor.backward`, which would free the graph.
+          Use `StaticGraph.backward` or `StaticGraph.run` instead.
+    """
+    
+    def __init__(self):
+        self._ops: List[_Op] = []
+        self._placeholders: Dict[int, Tensor] = {}
+        self._plans: Dict[int, _Plan] = {}
+        self._previous: List[object] = []
+    
+    def __enter__(self) -> StaticGraph:
+        self._previous.append(_GradMode.recorder)
+        _GradMode.recorder = self
+        return self
+    
+    def __exit__(self, *exc):
+        _GradMode.recorder = self._previous.pop()
+        return False
+    
+    def placeholder(self, shape: Tuple[int, ...]) -> Tensor:
+        """
+        Create an INPUT tensor whose data is fed to the graph on each run.
+        
+        Args:
+            shape: The shape of the arrays that will be fed to the placeholder.
+        
+        Returns:
+            A new INPUT Tensor, filled with zeros until data is fed.
+        """
+        
+        tensor = Tensor(np.zeros(shape, dtype=np.float32))
+        self._placeholders[id(tensor)] = tensor
+        return tensor
+    
+    def owns(self, tensor: Tensor) -> bool:
+        return False
+    
+    def record(self, node: Tensor, grad_fn: Optional[Callable], parents: tuple, extra: Optional[dict]):
+        """Record the operation that created `node`."""
+        kernel = _FORWARD.get(grad_fn)
+        if kernel is None:
+            raise ValueError(f"Operation {getattr(grad_fn, '__name__', grad_fn)} is not supported in a static graph")
+        
+        self._ops.append(_Op(node, kernel, grad_fn, parents, extra or {}))
+        self._plans.clear()
+    
+    def _plan(self, output: Tensor) -> _Plan:
+        plan = self._plans.get(id(output))
+        
+        if plan is None:
+            if not any(op.node is output for op in self._ops):
+                raise ValueError("The output tensor has not been recorded in this graph")
+            plan = self._plans[id(output)] = _Plan(self._ops, output)
+        
+        return plan
+    
+    def feed(self, feed: Dict[Tensor, np.ndarray]):
+        """
+        Copy new data into the placeholders.
+        
+        Args:
+            feed: A mapping from placeholders to the arrays to feed them with.
+        
+        Raises:
+            ValueError: If a key is not a placeholder of this graph, or the shape of an array does not match.
+        """
+        
+        for placeholder, value in feed.items():
+            if id(placeholder) not in self._placeholders:
+                raise ValueError("Only placeholders of the graph can be fed")
+            
+            value = np.asarray(value)
+            if value.shape != placeholder._shape:
+                raise ValueError(f"Cannot feed an array of shape {value.shape} to a placeholder of shape {placeholder._shape}")
+            
+            np.copyto(placeholder._data, value)
+    
+    def forward(self, output: Tensor, feed: Optional[Dict[Tensor, np.ndarray]] = None) -> np.ndarray:
+        """
+        Run the forward pass needed to compute `output`.
+        
+        Args:
+            output: A tensor recorded in the graph.
+            feed: Optional mapping from placeholders to the arrays to feed them with.
+        
+        Returns:
+            The data of `output`. It is overwritten by the next run.
+        """
+        
+        if feed:
+            self.feed(feed)
+        
+        for kernel, inputs, extra, out in self._plan(output).forward_steps:
+            kernel(inputs, extra, out)
+        
+        return output._data
+    
+    def backward(self, output: Tensor, gradient: Optional[np.ndarray | float] = None):
+        """
+        Run the backward pass of `output` using the values of the latest forward pass.
+        Gradients are accumulated into the PARAMETER tensors only.
+        
+        Args:
+            output: A tensor recorded in the graph.
+            gradient: Optional gradient of `output`. If None, `output` must be a scalar and ones are used.
+        """
+        
+        plan = self._plan(output)
+        buffers = plan.grad_buffers
+        written = [False] * len(buffers)
+        
+        if gradient is None:
+            if output._data.size != 1:
+                raise RuntimeError("Gradient can only be implicitly created for scalar outputs")
+            buffers[plan.output_index].fill(1)
+        else:
+            np.copyto(buffers[plan.output_index], gradient)
+        written[plan.output_index] = True
+        
+        for position, node, grad_fn, targets in plan.backward_steps:
+            if not written[position]:
+                continue
+            
+            gradients = grad_fn(node, buffers[position])
+            
+            for target, grad in zip(targets, gradients):
+                if target < 0 or grad is None:
+                    continue
+                
+                if written[target]:
+                    np.add(buffers[target], grad, out=buffers[target])
+                else:
+                    np.copyto(buffers[target], grad)
+                    written[target] = True
+        
+        for position, parameter in plan.parameters:
+            if written[position]:
+                parameter._accumulate_grad(buffers[position])
+    
+    def run(self, feed: Dict[Tensor, np.ndarray], output: Tensor, gradient: Optional[np.ndarray | float] = None) -> np.ndarray:
+        """
+        Feed the placeholders, then run the forward and backward passes of `output`.
+        
+        Args:
+            feed: A mapping from placeholders to the arrays to feed them with.
+            output: A tensor recorded in the graph, typically the loss.
+            gradient: Optional gradient of `output`. If None, `output` must be a scalar and ones are used.
+        
+        Returns:
+            The data of `output`. It is overwritten by the next run.
+        """
+        
+        result = self.forward(output, feed)
+        self.backward(output, gradient)
+        return result
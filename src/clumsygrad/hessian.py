@@ -0,0 +1,322 @@
+"""
+This module provides differentiable backward passes and Hessian-vector products.
+
+The default backward pass computes gradients as plain arrays, so it cannot itself be differentiated. With
+`Tensor.backward(create_graph=True)`, the gradient of every node is instead computed with tensor operations,
+using the differentiable rules below, keyed by backward function. The gradients are then tensors attached
+to a graph of their own, which reaches back into the graph of the forward pass, and can be differentiated
+again.
+
+`hvp` uses this to compute the product of the Hessian with a vector as the gradient of the scalar
+`grad(f) . v`, at the cost of a few gradient evaluations and without ever forming the Hessian.
+
+Example:
+    
+    >>> def f(w):
+    ...     return mse_loss(tanh(x @ w), y)
+    >>> value, (product,) = hvp(f, (w,), (v,))
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import grad, math
+from .tensor import Tensor, TensorType
+
+def _constant(array: np.ndarray) -> Tensor:
+    return Tensor(array, tensor_type=TensorType.INPUT)
+
+def _operand(tensor: Tensor, array: np.ndarray) -> Tensor:
+    """
+    Return `tensor`, whose value is `array`, as an operand of a rule. Graph nodes do not hold the data of
+    the tensors they stand for, so the saved value is attached to them through an identity operation.
+    """
+    if tensor._data is not None:
+        return tensor
+    
+    return Tensor._create_node(array, grad.add_scalar_backward, (tensor,), extra={'scalar_value': 0.0})
+
+def _transpose(tensor: Tensor) -> Tensor:
+    # `Tensor.T` folds double transposes by detaching its operand, which other gradients may still use
+    return Tensor._create_node(tensor._data.T, grad.transpose_backward, (tensor,))
+
+def _transpose_matrices(tensor: Tensor) -> Tensor:
+    """Transpose the last two axes of `tensor`, as the gradients of batched matrix multiplications need."""
+    if len(tensor._shape) == 2:
+        return _transpose(tensor)
+    
+    return Tensor._create_node(np.swapaxes(tensor._data, -1, -2), grad.swapaxes_backward, (tensor,))
+
+def _sum_to(tensor: Tensor, shape: tuple) -> Tensor:
+    """Sum a broadcast gradient back to `shape`, as `grad._reduce_gradient_to_shape` does."""
+    if tensor._shape == shape:
+        return tensor
+    
+    added = len(tensor._shape) - len(shape)
+    axes = tuple(range(added)) + tuple(added + index for index, dim in enumerate(shape)
+                                       if dim == 1 and tensor._shape[added + index] > 1)
+    
+    return math.sum(tensor, axis=axes, keepdims=True).reshape(shape)
+
+def _broadcast_to(tensor: Tensor, shape: tuple, axis, keepdims: bool) -> Tensor:
+    """Broadcast the gradient of a reduction along `axis` back to the shape of its input."""
+    if axis is not None and not keepdims:
+        axes = (axis,) if isinstance(axis, int) else axis
+        expanded = list(tensor._shape)
+        for ax in sorted(ax % len(shape) for ax in axes):
+            expanded.insert(ax, 1)
+        tensor = tensor.reshape(tuple(expanded))
+    
+    if tensor._shape == shape:
+        return tensor
+    
+    return tensor + _constant(np.zeros(shape, dtype=np.float32))
+
+def _linear(sign: float):
+    def rule(node, grad_tensor, saved):
+        return (grad_tensor, -grad_tensor if sign < 0 else grad_tensor)
+    return rule
+
+def _linear_broadcast(sign: float):
+    def rule(node, grad_tensor, saved):
+        right = -grad_tensor if sign < 0 else grad_tensor
+        return (_sum_to(grad_tensor, node._extra['left_shape']), _sum_to(right, node._extra['right_shape']))
+    return rule
+
+def _mul(node, grad_tensor, saved):
+    x, y = (_operand(parent, array) for parent, array in zip(node._parents, saved))
+    return (_sum_to(grad_tensor * y, x._shape), _sum_to(grad_tensor * x, y._shape))
+
+def _matmul(node, grad_tensor, saved):
+    x, y = (_operand(parent, array) for parent, array in zip(node._parents, saved))
+    return (_sum_to(grad_tensor @ _transpose_matrices(y), x._shape), _sum_to(_transpose_matrices(x) @ grad_tensor, y._shape))
+
+def _power(node, grad_tensor, saved):
+    x = _operand(node._parents[0], saved[0])
+    power = node._extra.get('power', 1)
+    return (grad_tensor * (x ** (power - 1)) * power,)
+
+def _sum(node, grad_tensor, saved):
+    extra = node._extra
+    return (_broadcast_to(grad_tensor, extra['input_shape'], extra.get('axis'), extra.get('keepdims', False)),)
+
+def _mean(node, grad_tensor, saved):
+    extra = node._extra
+    input_shape, axis = extra['input_shape'], extra.get('axis')
+    
+    if axis is None:
+        n = np.prod(input_shape)
+    else:
+        n = np.prod([input_shape[ax] for ax in ((axis,) if isinstance(axis, int) else axis)])
+    
+    return (_broadcast_to(grad_tensor * (1 / n), input_shape, axis, extra.get('keepdims', False)),)
+
+def _exp(node, grad_tensor, saved):
+    return (grad_tensor * _operand(node, saved[0]),)
+
+def _sqrt(node, grad_tensor, saved):
+    return (grad_tensor * (_operand(node, saved[0]) ** -1) * 0.5,)
+
+def _tan(node, grad_tensor, saved):
+    return (grad_tensor * (math.cos(_operand(node._parents[0], saved[0])) ** -2),)
+
+def _sigmoid(node, grad_tensor, saved):
+    out = _operand(node, saved[0])
+    return (grad_tensor * out * (-out + 1),)
+
+def _tanh(node, grad_tensor, saved):
+    out = _operand(node, saved[0])
+    return (grad_tensor * (-(out * out) + 1),)
+
+def _softmax(node, grad_tensor, saved):
+    out = _operand(node, saved[0])
+    product = out * grad_tensor
+    return (product - out * math.sum(product, axis=node._extra.get('axis', -1), keepdims=True),)
+
+def _mse(node, grad_tensor, saved):
+    # Follows `grad.mse_backward`, so that the gradients match the ones of the default backward pass
+    pred, target = (_operand(parent, array) for parent, array in zip(node._parents, saved))
+    scaled = (pred - target) * grad_tensor * 2
+    return (scaled, -scaled)
+
+def _mae(node, grad_tensor, saved):
+    pred, target = saved
+    scaled = grad_tensor * _constant(np.sign(pred - target) / pred.size)
+    return (scaled, -scaled)
+
+_VJP: Dict[Callable, Callable] = {
+    grad.transpose_backward: lambda node, grad_tensor, saved: (_transpose(grad_tensor),),
+    grad.swapaxes_backward: lambda node, grad_tensor, saved: (_transpose_matrices(grad_tensor),),
+    grad.add_backward: _linear(1),
+    grad.add_broadcast_backward: _linear_broadcast(1),
+    grad.add_scalar_backward: lambda node, grad_tensor, saved: (grad_tensor,),
+    grad.sub_backward: _linear(-1),
+    grad.sub_broadcast_backward: _linear_broadcast(-1),
+    grad.sub_scalar_backward: lambda node, grad_tensor, saved: (grad_tensor,),
+    grad.mul_backward: _mul,
+    grad.mul_broadcast_backward: _mul,
+    grad.mul_scalar_backward: lambda node, grad_tensor, saved: (grad_tensor * node._extra['scalar_value'],),
+    grad.matmul_backward: _matmul,
+    grad.power_backward: _power,
+    grad.negate_backward: lambda node, grad_tensor, saved: (-grad_tensor,),
+    grad.abs_backward: lambda node, grad_tensor, saved: (grad_tensor * _constant(np.sign(saved[0])),),
+    grad.reshape_backward: lambda node, grad_tensor, saved: (grad_tensor.reshape(node._extra['original_shape']),),
+    grad.sum_backward: _sum,
+    grad.mean_backward: _mean,
+    grad.exp_backward: _exp,
+    grad.log_backward: lambda node, grad_tensor, saved: (grad_tensor * (_operand(node._parents[0], saved[0]) ** -1),),
+    grad.sqrt_backward: _sqrt,
+    grad.sin_backward: lambda node, grad_tensor, saved: (grad_tensor * math.cos(_operand(node._parents[0], saved[0])),),
+    grad.cos_backward: lambda node, grad_tensor, saved: (-(grad_tensor * math.sin(_operand(node._parents[0], saved[0]))),),
+    grad.tan_backward: _tan,
+    grad.relu_backward: lambda node, grad_tensor, saved: (grad_tensor * _constant(saved[0] > 0),),
+    grad.sigmoid_backward: _sigmoid,
+    grad.tanh_backward: _tanh,
+    grad.softmax_backward: _softmax,
+    grad.mse_backward: _mse,
+    grad.mae_backward: _mae,
+}
+"""
+Differentiable backward functions of the operations, keyed by their backward function.
+
+Each rule takes the node, the gradient of the node as a tensor and the arrays saved by the operation, and
+returns the gradients of the parents as tensors, built with operations that are themselves differentiable.
+Parents are used as operands, with the values saved for them, so the gradients depend on them in the new graph.
+"""
+
+def _run_create_graph(topo_order: List[Tensor], gradient: np.ndarray):
+    """
+    Propagate `gradient`, the gradient of the last tensor of `topo_order`, to the rest of the graph
+    with differentiable rules. This is the engine of `Tensor.backward(create_graph=True)`.
+    
+    Leaves and the INTERMEDIATE tensors on which `retain_grad` was called accumulate the values of their
+    gradients in `grad`, as in the default backward pass. Leaves also accumulate the gradient tensors in
+    `grad_tensor`. The graph is left in place.
+    
+    Args:
+        topo_order: The tensors of the graph in topological order.
+        gradient: The float32 gradient of the last tensor, with the same shape as it.
+    
+    Raises:
+        RuntimeError: If a backward function fails or has no differentiable rule.
+    """
+    grads: Dict[int, Tensor] = {id(topo_order[-1]): _constant(gradient)}
+    
+    for node in reversed(topo_order):
+        grad_tensor = grads.pop(id(node), None)
+        if grad_tensor is None:
+            continue
+        
+        if node._tensor_type != TensorType.INTERMEDIATE:
+            node._accumulate_grad(grad_tensor._data)
+            node._grad_tensor = grad_tensor if node._grad_tensor is None else node._grad_tensor + grad_tensor
+            continue
+        
+        if node._retain_grad:
+            node._accumulate_grad(grad_tensor._data)
+        
+        if node._grad_fn is None:
+            continue
+        
+        try:
+            rule = _VJP.get(node._grad_fn)
+            if rule is None:
+                raise ValueError(f"Operation {node._grad_fn.__name__} does not support create_graph")
+            
+            saved = node._saved if node._unpack is None else tuple(node._unpack(value) for value in node._saved)
+            gradients = rule(node, grad_tensor, saved)
+            
+            for parent, parent_grad in zip(node._parents, gradients):
+                if parent._requires_grad and parent_grad is not None:
+                    if parent_grad._shape != parent._shape:
+                        raise ValueError(f"Gradient shape mismatch for tensor {parent._id}")
+                    
+                    previous = grads.get(id(parent))
+                    grads[id(parent)] = parent_grad if previous is None else previous + parent_grad
+        
+        except Exception as e:
+            raise RuntimeError(f"Error in backward pass at tensor {node._id}: {str(e)}")
+
+def hvp(f: Callable[..., Tensor],
+        primals: Sequence[Union[Tensor, np.ndarray, list, float]],
+        tangents: Sequence[Union[np.ndarray, list, float]]) -> Tuple[Tensor, Tuple[np.ndarray, ...]]:
+    """
+    Compute the product of the Hessian of the scalar function `f` at `primals` with the vector `tangents`.
+    
+    The gradient of `f` is computed with `create_graph=True`, and the gradient of its dot product with
+    `tangents` is then computed with a second backward pass. This costs a small constant multiple of one
+    gradient evaluation, and the Hessian is never formed.
+    
+    Args:
+        f: The function to differentiate. It takes one tensor per primal and returns a tensor with a single element.
+            Tensors it captures from an enclosing scope are treated as constants, and their gradients are left as is.
+        primals: The point at which the Hessian is evaluated.
+        tangents: The vector to multiply the Hessian with, one array per primal with the same shape.
+    
+    Returns:
+        A tuple `(value, products)`: the value of `f` as an INPUT tensor without a graph, and the product of
+        the Hessian with `tangents`, one array per primal.
+    
+    Raises:
+        ValueError: If the numbers or the shapes of `primals` and `tangents` do not match, or if `f` does not
+            return a single element.
+        RuntimeError: If `f` performs an operation that does not support `create_graph`.
+    """
+    
+    if len(primals) != len(tangents):
+        raise ValueError(f"Got {len(primals)} primals but {len(tangents)} tangents")
+    
+    inputs = [Tensor(primal._data if isinstance(primal, Tensor) else primal, tensor_type=TensorType.PARAMETER)
+              for primal in primals]
+    vectors = []
+    for value, tangent in zip(inputs, tangents):
+        tangent = np.array(tangent, dtype=np.float32)
+        if tangent.shape != value._shape:
+            raise ValueError(f"Tangent shape {tangent.shape} does not match primal shape {value._shape}")
+        vectors.append(tangent)
+    
+    output = f(*inputs)
+    if output._data.size != 1:
+        raise ValueError("hvp requires a function returning a single element")
+    
+    value = Tensor(output._data)
+    products = [np.zeros(primal._shape, dtype=np.float32) for primal in inputs]
+    
+    if not output._requires_grad:
+        return value, tuple(products)
+    
+    # The gradients of the captured leaves are set aside, so that both passes leave them unchanged
+    captured = [node for node in output._build_topo() if node._tensor_type != TensorType.INTERMEDIATE]
+    previous = [(node._grad, node._grad_tensor) for node in captured]
+    for node in captured:
+        node._grad, node._grad_tensor = None, None
+    
+    try:
+        output.backward(create_graph=True)
+        
+        dot: Optional[Tensor] = None
+        for primal, vector in zip(inputs, vectors):
+            gradient = primal._grad_tensor
+            if gradient is not None and gradient._requires_grad:
+                term = math.sum(gradient * _constant(vector))
+                dot = term if dot is None else dot + term
+        
+        for node in captured:
+            node._grad, node._grad_tensor = None, None
+        output._topo_cache = None
+        
+        if dot is not None:
+            dot.backward()
+            
+            for index, primal in enumerate(inputs):
+                if primal._grad is not None:
+                    products[index] = primal._grad
+    
+    finally:
+        for node, (node_grad, node_grad_tensor) in zip(captured, previous):
+            node._grad, node._grad_tensor = node_grad, node_grad_tensor
+    
+    return value, tuple(products)
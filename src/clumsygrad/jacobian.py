@@ -0,0 +1,248 @@
+"""
+This module provides the computation of full Jacobians with batched backward passes.
+
+The Jacobian of a function with `m` outputs has one row per output, and each row is the gradient of the
+corresponding output. Rather than running `m` backward passes, `jacobian` stacks the `m` cotangent vectors
+along a leading batch axis and pushes the whole batch through the backward functions in a single sweep
+over the graph, relying on NumPy broadcasting over the batch axis.
+
+Most backward functions of `grad.py` broadcast over the batch axis as they are. The ones that reshape or
+reduce their gradient to the shape of their inputs have batched counterparts below, keyed by backward
+function. Other operations, such as fused ones, are run once per row of the batch.
+
+Example:
+    
+    >>> def f(x):
+    ...     return tanh(x @ w)
+    >>> out, (jac,) = jacobian(f, (x,))  # jac.shape == out.shape + x.shape
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import grad
+from .tensor import Tensor, TensorType, _call_grad_fn
+
+_ELEMENTWISE = frozenset((
+    grad.add_backward, grad.add_scalar_backward, grad.sub_backward, grad.sub_scalar_backward,
+    grad.mul_backward, grad.mul_scalar_backward, grad.power_backward,
+    grad.negate_backward, grad.abs_backward, grad.exp_backward, grad.log_backward, grad.sqrt_backward,
+    grad.sin_backward, grad.cos_backward, grad.tan_backward, grad.relu_backward, grad.sigmoid_backward,
+    grad.tanh_backward,
+))
+"""
+Backward functions that broadcast over a leading batch axis of their gradient as they are.
+"""
+
+def _sum_to(batch: np.ndarray, shape: tuple) -> np.ndarray:
+    """Sum a batch of broadcast gradients back to `shape`, as `grad._reduce_gradient_to_shape` does for one."""
+    added = batch.ndim - 1 - len(shape)
+    if added > 0:
+        batch = np.sum(batch, axis=tuple(range(1, 1 + added)))
+    
+    axes = tuple(1 + index for index, dim in enumerate(shape) if dim == 1 and batch.shape[1 + index] > 1)
+    if axes:
+        batch = np.sum(batch, axis=axes, keepdims=True)
+    
+    return batch.reshape(batch.shape[:1] + shape)
+
+def _expand(batch: np.ndarray, extra: dict) -> np.ndarray:
+    """Insert the axes removed by a reduction back into a batch of gradients of its output."""
+    input_shape, axis = extra['input_shape'], extra.get('axis')
+    
+    if extra.get('keepdims', False):
+        return batch
+    
+    if axis is None:
+        return batch.reshape(batch.shape[:1] + (1,) * len(input_shape))
+    
+    axes = (axis,) if isinstance(axis, int) else axis
+    for ax in sorted(ax % len(input_shape) for ax in axes):
+        batch = np.expand_dims(batch, axis=ax + 1)
+    return batch
+
+def _broadcast(sign: float, scaled: bool):
+    def rule(node, batch, saved):
+        left_shape, right_shape = node._extra['left_shape'], node._extra['right_shape']
+        
+        if scaled:
+            x, y = saved
+            return (_sum_to(batch * y, left_shape), _sum_to(batch * x, right_shape))
+        
+        return (_sum_to(batch, left_shape), _sum_to(-batch if sign < 0 else batch, right_shape))
+    return rule
+
+def _matmul(node, batch, saved):
+    x, y = saved
+    left, right = node._parents
+    left_batch = right_batch = None
+    
+    # With 2D operands, the batch is folded into the rows or the columns of a single matrix product
+    if x.ndim == 2 and y.ndim == 2:
+        count, rows, columns = batch.shape
+        if left._requires_grad:
+            left_batch = np.matmul(batch.reshape(count * rows, columns), y.T).reshape(count, rows, x.shape[1])
+        if right._requires_grad:
+            folded = np.matmul(x.T, batch.transpose(1, 0, 2).reshape(rows, count * columns))
+            right_batch = np.ascontiguousarray(folded.reshape(y.shape[0], count, columns).transpose(1, 0, 2))
+        return (left_batch, right_batch)
+    
+    if left._requires_grad:
+        left_batch = _sum_to(np.matmul(batch, np.swapaxes(y, -1, -2)), left._shape)
+    if right._requires_grad:
+        right_batch = _sum_to(np.matmul(np.swapaxes(x, -1, -2), batch), right._shape)
+    return (left_batch, right_batch)
+
+def _mean(node, batch, saved):
+    input_shape = node._extra['input_shape']
+    n = math.prod(input_shape) / math.prod(node._shape)
+    return (np.broadcast_to(_expand(batch, node._extra) / n, batch.shape[:1] + input_shape),)
+
+def _softmax(node, batch, saved):
+    out, = saved
+    axis = node._extra.get('axis', -1)
+    axis = axis if axis < 0 else axis + 1
+    product = out * batch
+    return (product - out * np.sum(product, axis=axis, keepdims=True),)
+
+def _loss(derivative):
+    def rule(node, batch, saved):
+        pred, target = saved
+        shape = node._parents[0]._shape
+        scaled = batch.reshape(batch.shape[:1] + (1,) * len(shape)) * derivative(pred - target, math.prod(shape))
+        return (scaled, -scaled)
+    return rule
+
+_BATCHED: Dict[Callable, Callable] = {
+    grad.transpose_backward: lambda node, batch, saved: (np.transpose(batch, (0,) + tuple(range(batch.ndim - 1, 0, -1))),),
+    grad.reshape_backward: lambda node, batch, saved: (batch.reshape(batch.shape[:1] + node._extra['original_shape']),),
+    grad.matmul_backward: _matmul,
+    grad.add_broadcast_backward: _broadcast(1, scaled=False),
+    grad.sub_broadcast_backward: _broadcast(-1, scaled=False),
+    grad.mul_broadcast_backward: _broadcast(1, scaled=True),
+    grad.sum_backward: lambda node, batch, saved: (np.broadcast_to(_expand(batch, node._extra), batch.shape[:1] + node._extra['input_shape']),),
+    grad.mean_backward: _mean,
+    grad.softmax_backward: _softmax,
+    grad.mse_backward: _loss(lambda difference, size: 2 * difference),
+    grad.mae_backward: _loss(lambda difference, size: np.sign(difference) / size),
+}
+"""
+Backward functions of the operations for a batch of gradients stacked along a leading axis, keyed by their
+backward function. Each rule takes the node, the batch of gradients and the arrays saved by the operation,
+and returns the batch of gradients of each parent. The saved arrays may carry the batch axis themselves,
+as they do for the operations replayed by `vmap`.
+"""
+
+def _backward_batch(node: Tensor, batch: np.ndarray) -> tuple:
+    """Propagate a batch of gradients of `node` to its parents."""
+    grad_fn = node._grad_fn
+    
+    if grad_fn in _ELEMENTWISE:
+        return grad_fn(node, batch) if node._unpack is None else _call_grad_fn(node, batch)
+    
+    rule = _BATCHED.get(grad_fn)
+    if rule is not None:
+        saved = node._saved if node._unpack is None else tuple(node._unpack(value) for value in node._saved)
+        return rule(node, batch, saved)
+    
+    if grad_fn is grad.checkpoint_backward:
+        raise ValueError("Checkpointed segments are not supported by jacobian")
+    
+    # Operations without a batched form are run once per row of the batch
+    rows = [grad_fn(node, row) if node._unpack is None else _call_grad_fn(node, row) for row in batch]
+    return tuple(None if any(row[position] is None for row in rows) else np.stack([row[position] for row in rows])
+                 for position in range(len(node._parents)))
+
+def _sweep(topo_order: List[Tensor], seed: np.ndarray) -> Dict[int, np.ndarray]:
+    """
+    Push a batch of cotangents of the last tensor of `topo_order` through the graph in a single sweep.
+    
+    Returns:
+        The batch of gradients of each leaf of the graph, keyed by the identity of the leaf.
+    """
+    batches: Dict[int, np.ndarray] = {id(topo_order[-1]): seed}
+    leaves: Dict[int, np.ndarray] = {}
+    
+    for node in reversed(topo_order):
+        batch = batches.pop(id(node), None)
+        if batch is None:
+            continue
+        
+        if node._grad_fn is None:
+            leaves[id(node)] = batch
+            continue
+        
+        try:
+            gradients = _backward_batch(node, batch)
+            
+            for parent, parent_batch in zip(node._parents, gradients):
+                if parent._requires_grad and parent_batch is not None:
+                    if parent_batch.shape != batch.shape[:1] + parent._shape:
+                        raise ValueError(f"Gradient shape mismatch for tensor {parent._id}")
+                    
+                    previous = batches.get(id(parent))
+                    batches[id(parent)] = parent_batch if previous is None else previous + parent_batch
+        
+        except Exception as e:
+            raise RuntimeError(f"Error in backward pass at tensor {node._id}: {str(e)}")
+    
+    return leaves
+
+def jacobian(f: Callable[..., Tensor],
+             primals: Sequence[Union[Tensor, np.ndarray, list, float]],
+             chunk_size: Optional[int] = None) -> Tuple[Tensor, Tuple[np.ndarray, ...]]:
+    """
+    Compute the Jacobian of `f` at `primals` with a single batched backward sweep.
+    
+    The cotangents of all the elements of the output, i.e. the rows of the identity matrix, are stacked
+    along a leading batch axis and propagated together, so the graph is traversed once instead of once
+    per output element.
+    
+    Args:
+        f: The function to differentiate. It takes one tensor per primal and returns a tensor.
+            Tensors it captures from an enclosing scope are treated as constants, and their gradients are left as is.
+        primals: The point at which the Jacobian is evaluated.
+        chunk_size: The maximum number of cotangents propagated together. The intermediate gradients of the
+            sweep hold `chunk_size` times the memory of a single backward pass. Default is all of them at once.
+    
+    Returns:
+        A tuple `(value, jacobians)`: the value of `f` as an INPUT tensor without a graph, and the Jacobian with
+        respect to each primal, of shape `value.shape + primal.shape`.
+    
+    Raises:
+        ValueError: If `chunk_size` is not positive.
+        RuntimeError: If a backward function fails, e.g. for a checkpointed segment.
+    """
+    
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError("The chunk size must be positive")
+    
+    inputs = [Tensor(primal._data if isinstance(primal, Tensor) else primal, tensor_type=TensorType.PARAMETER)
+              for primal in primals]
+    output = f(*inputs)
+    
+    value = Tensor(output._data)
+    size = output._data.size
+    jacobians = [np.zeros((size,) + primal._shape, dtype=np.float32) for primal in inputs]
+    
+    if output._requires_grad:
+        topo_order = output._build_topo()
+        chunk_size = chunk_size or size
+        
+        for start in range(0, size, chunk_size):
+            stop = min(start + chunk_size, size)
+            seed = np.zeros((stop - start, size), dtype=np.float32)
+            seed[np.arange(stop - start), np.arange(start, stop)] = 1
+            
+            leaves = _sweep(topo_order, seed.reshape((stop - start,) + output._shape))
+            
+            for primal, rows in zip(inputs, jacobians):
+                batch = leaves.get(id(primal))
+                if batch is not None:
+                    rows[start:stop] = batch
+    
+    return value, tuple(rows.reshape(output._shape + primal._shape) for primal, rows in zip(inputs, jacobians))
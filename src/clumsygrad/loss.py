@@ -32,7 +32,8 @@ def mse_loss(pred: Tensor, target: Tensor) -> Tensor:
     new_tensor = Tensor._create_node(
         data=mse,
         grad_fn=mse_backward,
-        parents=(pred, target)
+        parents=(pred, target),
+        saved=(pred._data, target._data)
     )
     
     return new_tensor
@@ -60,7 +61,8 @@ def mae_loss(pred: Tensor, target: Tensor) -> Tensor:
     new_tensor = Tensor._create_node(
         data=mae,
         grad_fn=mae_backward,
-        parents=(pred, target)  
+        parents=(pred, target),
+        saved=(pred._data, target._data)
     )
     
     return new_tensor
\ No newline at end of file
@@ -4,7 +4,7 @@ This module provides basic mathematical operations.
 
 import numpy as np
 
-from .tensor import Tensor
+from .tensor import Tensor, _empty, _ufunc
 
 
 def sum(tensor: Tensor, axis=None, keepdims=False) -> Tensor:
@@ -61,9 +61,10 @@ def abs(tensor: Tensor) -> Tensor:
     from .grad import abs_backward
     
     new_tensor = Tensor._create_node(
-        data=np.abs(tensor._data),
+        data=_ufunc(np.abs, tensor._data, out=_empty(tensor._shape)),
         grad_fn=abs_backward,
         parents=(tensor,),
+        saved=(tensor._data,)
     )
     return new_tensor
 
@@ -74,10 +75,13 @@ def sqrt(tensor: Tensor) -> Tensor:
     
     from .grad import sqrt_backward
     
+    out = _ufunc(np.sqrt, tensor._data, out=_empty(tensor._shape))
+    
     new_tensor = Tensor._create_node(
-        data=np.sqrt(tensor._data),
+        data=out,
         grad_fn=sqrt_backward,
         parents=(tensor,),
+        saved=(out,)
     )
     return new_tensor
 
@@ -88,10 +92,13 @@ def exp(tensor: Tensor) -> Tensor:
     
     from .grad import exp_backward
     
+    out = _ufunc(np.exp, tensor._data, out=_empty(tensor._shape))
+    
     new_tensor = Tensor._create_node(
-        data=np.exp(tensor._data),
+        data=out,
         grad_fn=exp_backward,
         parents=(tensor,),
+        saved=(out,)
     )
     return new_tensor
 
@@ -103,9 +110,10 @@ def log(tensor: Tensor) -> Tensor:
     from .grad import log_backward
     
     new_tensor = Tensor._create_node(
-        data=np.log(tensor._data),
+        data=_ufunc(np.log, tensor._data, out=_empty(tensor._shape)),
         grad_fn=log_backward,
         parents=(tensor,),
+        saved=(tensor._data,)
     )
     return new_tensor
 
@@ -117,9 +125,10 @@ def sin(tensor: Tensor) -> Tensor:
     from .grad import sin_backward
     
     new_tensor = Tensor._create_node(
-        data=np.sin(tensor._data),
+        data=_ufunc(np.sin, tensor._data, out=_empty(tensor._shape)),
         grad_fn=sin_backward,
         parents=(tensor,),
+        saved=(tensor._data,)
     )
     return new_tensor
 
@@ -131,9 +140,10 @@ def cos(tensor: Tensor) -> Tensor:
     from .grad import cos_backward
     
     new_tensor = Tensor._create_node(
-        data=np.cos(tensor._data),
+        data=_ufunc(np.cos, tensor._data, out=_empty(tensor._shape)),
         grad_fn=cos_backward,
         parents=(tensor,),
+        saved=(tensor._data,)
     )
     return new_tensor
 
@@ -145,8 +155,9 @@ def tan(tensor: Tensor) -> Tensor:
     from .grad import tan_backward
     
     new_tensor = Tensor._create_node(
-        data=np.tan(tensor._data),
+        data=_ufunc(np.tan, tensor._data, out=_empty(tensor._shape)),
         grad_fn=tan_backward,
         parents=(tensor,),
+        saved=(tensor._data,)
     )
     return new_tensor
\ No newline at end of file
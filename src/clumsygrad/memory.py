@@ -0,0 +1,223 @@
+"""
+This module provides static memory planning for the graphs captured by `StaticGraph`.
+
+Once the structure of a graph is known, so is the lifetime of each of its arrays: the result of an
+operation is needed from the step that computes it until its last use, either as the input of a later
+operation or as an array saved for a backward function, and the gradient buffer of a tensor is needed
+from its first contribution until its own backward step. Most of these lifetimes are disjoint.
+
+`plan_memory` computes them for the forward and backward passes of one output, and assigns the arrays to
+a small set of slots of a single float32 arena, so that arrays whose lifetimes do not overlap share the
+same memory. The results of the operations and the saved arrays of the backward functions are rebound
+to views of the arena, and the gradients returned by the backward functions of `grad.py` are written into
+the gradient slots, so every run of the graph reuses the arena instead of one buffer per array.
+
+Example:
+    
+    >>> graph = StaticGraph()
+    >>> x, y = graph.placeholder((32, 4)), graph.placeholder((32, 1))
+    >>> with graph:
+    ...     loss = mse_loss(relu(x @ w1 + b1) @ w2, y)
+    >>> plan = plan_memory(graph, loss)
+    >>> plan.planned_bytes, plan.naive_bytes
+    >>> graph.run({x: x_batch, y: y_batch}, loss)
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .graph import StaticGraph, _Plan
+from .tensor import Tensor
+
+_ALIGNMENT = 16
+"""
+Number of float32 elements each slot is aligned to, i.e. 64 bytes.
+"""
+
+class MemoryPlan:
+    """
+    The assignment of the arrays of a captured graph to the slots of an arena.
+    
+    Attributes:
+        arena: The float32 array holding every slot.
+        slots: The offset and the size of each slot in the arena, in elements.
+        arrays: The number of arrays assigned to the slots.
+        planned_bytes: The number of bytes of the arena.
+        naive_bytes: The number of bytes taken by the same arrays with one buffer each.
+    """
+    
+    def __init__(self, arena: np.ndarray, slots: List[Tuple[int, int]], arrays: int, naive_bytes: int):
+        self.arena = arena
+        self.slots = slots
+        self.arrays = arrays
+        self.planned_bytes = arena.nbytes
+        self.naive_bytes = naive_bytes
+    
+    def __repr__(self):
+        return (f"MemoryPlan({self.arrays} arrays in {len(self.slots)} slots, "
+                f"{self.planned_bytes} bytes planned, {self.naive_bytes} bytes naive)")
+    
+    def stats(self) -> Dict[str, int]:
+        """Return the number of arrays and slots, and the planned and naive bytes."""
+        return {
+            'arrays': self.arrays,
+            'slots': len(self.slots),
+            'planned_bytes': self.planned_bytes,
+            'naive_bytes': self.naive_bytes,
+        }
+
+def _liveness(plan: _Plan, output: Tensor) -> List[Tuple[int, int, tuple, str, int]]:
+    """
+    Compute the lifetime of every array of a plan, on a timeline where each forward operation, the seeding
+    of the output gradient, each backward step and the accumulation into the parameters take one step.
+    
+    Returns:
+        One interval `(start, end, shape, kind, index)` per array, both ends included. `kind` is
+        'value' for the result of the `index`-th operation, and 'grad' for the gradient buffer of the
+        `index`-th node of the plan.
+    
+    Raises:
+        ValueError: If a backward function saves an array that is neither the result of an operation nor
+            the data of a leaf, such as a packed or a view of one.
+    """
+    forward = len(plan.ops)
+    end = forward + 1 + len(plan.backward_steps)
+    
+    producers: Dict[int, int] = {id(op.node._data): index for index, op in enumerate(plan.ops)}
+    last_use = list(range(forward))
+    
+    for index, op in enumerate(plan.ops):
+        for node in op.inputs:
+            producer = producers.get(id(node._data))
+            if producer is not None:
+                last_use[producer] = max(last_use[producer], index)
+    last_use[producers[id(output._data)]] = end
+    
+    leaves = {id(node._data) for op in plan.ops for node in op.inputs}
+    first_write: Dict[int, int] = {plan.output_index: forward}
+    last_read: Dict[int, int] = {}
+    
+    for step, (position, node, grad_fn, targets) in enumerate(plan.backward_steps):
+        time = forward + 1 + step
+        last_read[position] = time
+        
+        if node._unpack is not None:
+            raise ValueError(f"The arrays saved by tensor {node._id} are packed, and cannot be planned")
+        
+        for array in node._saved:
+            producer = producers.get(id(array))
+            if producer is not None:
+                last_use[producer] = max(last_use[producer], time)
+            elif id(array) not in leaves:
+                raise ValueError(f"Operation {grad_fn.__name__} saves an array that the memory planner cannot follow")
+        
+        for target in targets:
+            if target >= 0:
+                first_write.setdefault(target, time)
+    
+    intervals = [(index, last_use[index], op.node._shape, 'value', index) for index, op in enumerate(plan.ops)]
+    
+    # Leaves keep their gradient buffer until it is accumulated into them, after the last backward step
+    for target, start in first_write.items():
+        intervals.append((start, last_read.get(target, end) if target < forward else end,
+                          plan.nodes[target]._shape, 'grad', target))
+    
+    return intervals
+
+def _assign(intervals: List[tuple]) -> Tuple[List[int], List[int]]:
+    """
+    Assign intervals to slots, such that intervals sharing a slot do not overlap.
+    
+    Intervals are placed by increasing start. Each one takes the smallest free slot large enough to hold
+    it, or else the largest free slot, which is grown, or else a new slot.
+    
+    Returns:
+        The slot of each interval, and the size of each slot in elements.
+    """
+    sizes: List[int] = []
+    assignment = [0] * len(intervals)
+    active: List[Tuple[int, int]] = []
+    free: List[int] = []
+    
+    for order in sorted(range(len(intervals)), key=lambda order: intervals[order][:2]):
+        start, end, shape = intervals[order][:3]
+        size = -(-max(int(np.prod(shape)), 1) // _ALIGNMENT) * _ALIGNMENT
+        
+        while active and active[0][0] < start:
+            free.append(heapq.heappop(active)[1])
+        
+        fitting = [slot for slot in free if sizes[slot] >= size]
+        if fitting:
+            slot = min(fitting, key=lambda slot: sizes[slot])
+        elif free:
+            slot = max(free, key=lambda slot: sizes[slot])
+            sizes[slot] = size
+        else:
+            slot = len(sizes)
+            sizes.append(size)
+        
+        if slot in free:
+            free.remove(slot)
+        heapq.heappush(active, (end, slot))
+        assignment[order] = slot
+    
+    return assignment, sizes
+
+def plan_memory(graph: StaticGraph, output: Tensor) -> MemoryPlan:
+    """
+    Plan the memory of the forward and backward passes of `output`, and rebind its arrays to an arena.
+    
+    Args:
+        graph: The static graph that recorded `output`.
+        output: The tensor the graph is run for, typically the loss.
+    
+    Returns:
+        The memory plan, with its arena and the planned and naive bytes.
+    
+    Raises:
+        ValueError: If `output` was not recorded in the graph, or if a backward function saves an array that
+            cannot be followed.
+    
+    Note:
+        - The arrays of the graph only hold meaningful values after the next run, and the data of a tensor
+          of the graph other than `output` may be overwritten by later steps of the same run.
+        - After planning, the graph should only be run for `output`. Functions generated from the graph
+          with `codegen.generate` should be generated after planning.
+    """
+    
+    plan = graph._plan(output)
+    intervals = _liveness(plan, output)
+    assignment, sizes = _assign(intervals)
+    
+    offsets = np.cumsum([0] + sizes)
+    arena = np.empty(int(offsets[-1]), dtype=np.float32)
+    
+    def view(slot: int, shape: tuple) -> np.ndarray:
+        start = int(offsets[slot])
+        return arena[start:start + int(np.prod(shape))].reshape(shape)
+    
+    rebound: Dict[int, np.ndarray] = {}
+    gradients: Dict[int, np.ndarray] = {}
+    
+    for (_, _, shape, kind, index), slot in zip(intervals, assignment):
+        if kind == 'value':
+            node = plan.ops[index].node
+            rebound[id(node._data)] = node._data = view(slot, shape)
+        else:
+            gradients[index] = view(slot, shape)
+    
+    for op in plan.ops:
+        op.node._saved = tuple(rebound.get(id(array), array) for array in op.node._saved)
+    
+    # The forward steps of the plans hold the arrays they write into, so the plan is built again
+    graph._plans.clear()
+    plan = graph._plan(output)
+    for index, buffer in gradients.items():
+        plan.grad_buffers[index] = buffer
+    
+    naive_bytes = sum(4 * int(np.prod(shape)) for _, _, shape, _, _ in intervals)
+    return MemoryPlan(arena, [(int(offsets[slot]), size) for slot, size in enumerate(sizes)], len(intervals), naive_bytes)
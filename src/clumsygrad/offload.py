@@ -0,0 +1,174 @@
+"""
+This module provides offloading of the arrays saved for backward to memory-mapped scratch files.
+
+While an `Offload` context is active, every array saved by an operation for its backward function whose
+size exceeds a threshold is written to a scratch file, and only a small handle is kept on the node.
+The array is mapped back from the file when the backward function of the node runs. The graph holds no
+other reference to the data of intermediate tensors, so once the caller drops them, between the forward
+and the backward pass their arrays larger than the threshold only live on disk. The data of leaves, such
+as inputs and parameters, stays in memory and is not spilled.
+
+With `prefetch` set, a background thread reads the spilled arrays ahead of the backward pass, in the
+reverse order of their creation, which is the order in which the backward pass needs them.
+
+Example:
+    
+    >>> with Offload(threshold=2**20, prefetch=2):
+    ...     loss = mse_loss(model(x), y)
+    >>> loss.backward()  # saved arrays are read back from disk
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .tensor import Tensor, _held_by_leaves, saved_tensors_hooks
+
+class _Spilled:
+    """
+    Handle of an array written to a scratch file. The file is removed when the handle is garbage collected.
+    """
+    
+    __slots__ = ('path', 'shape', 'dtype', 'index', 'data', '__weakref__')
+    
+    def __init__(self, path: str, shape: Tuple[int, ...], dtype: np.dtype, index: int):
+        self.path = path
+        self.shape = shape
+        self.dtype = dtype
+        self.index = index
+        self.data: Optional[np.ndarray] = None
+    
+    def read(self) -> np.ndarray:
+        return np.fromfile(self.path, dtype=self.dtype).reshape(self.shape)
+    
+    def map(self) -> np.ndarray:
+        return np.asarray(np.memmap(self.path, dtype=self.dtype, mode='r', shape=self.shape))
+
+def _remove(spilled: Dict[int, weakref.ref], index: int, path: str):
+    """Forget a garbage-collected handle and remove its scratch file."""
+    spilled.pop(index, None)
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class Offload(saved_tensors_hooks):
+    """
+    Saved-tensors hooks spilling large saved arrays to memory-mapped scratch files.
+    
+    The scratch files are removed as soon as the graph referencing them is freed.
+    """
+    
+    def __init__(self, directory: Optional[str] = None, threshold: int = 2**20, prefetch: int = 0):
+        """
+        Initialize the offloading hooks.
+        
+        Args:
+            directory: The directory to write the scratch files to. Default is a new temporary directory,
+                removed once the hooks and every graph built with them are gone.
+            threshold: The size in bytes from which a saved array is spilled to disk.
+            prefetch: The number of spilled arrays to read ahead of the backward pass in a background thread.
+                Default is 0, where each array is mapped from its file when needed.
+        """
+        
+        super().__init__(self._pack, self._unpack)
+        
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix='clumsygrad-')
+            weakref.finalize(self, shutil.rmtree, directory, ignore_errors=True)
+        else:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.directory = directory
+        self.threshold = threshold
+        self.prefetch = prefetch
+        self.spilled_bytes = 0
+        
+        # Entries are removed when their handle, or their array, is garbage collected
+        self._spilled: Dict[int, weakref.ref] = {}
+        self._by_array: Dict[int, weakref.ref] = {}
+        self._count = 0
+        self._lock = threading.Condition()
+        self._position = -1
+        self._thread: Optional[threading.Thread] = None
+    
+    def pack_saved(self, grad_fn: Callable, saved: Tuple[np.ndarray, ...], parents: Tuple[Tensor, ...]) -> tuple:
+        """Spill the saved arrays, except the data of leaves, which stays in memory in any case."""
+        return tuple(array if _held_by_leaves(array, parents) else self._pack(array) for array in saved)
+    
+    def _pack(self, array: np.ndarray) -> object:
+        if array.nbytes < self.threshold:
+            return array
+        
+        # An array saved by several operations is only written once
+        entry = self._by_array.get(id(array))
+        if entry is not None and entry() is not None:
+            return entry()
+        
+        index = self._count
+        self._count += 1
+        path = os.path.join(self.directory, f'{os.getpid()}-{id(self)}-{index}.bin')
+        handle = _Spilled(path, array.shape, array.dtype, index)
+        
+        mapped = np.memmap(path, dtype=array.dtype, mode='w+', shape=array.shape)
+        mapped[...] = array
+        mapped.flush()
+        del mapped
+        
+        weakref.finalize(handle, _remove, self._spilled, index, path)
+        self._spilled[index] = weakref.ref(handle)
+        if entry is None:
+            weakref.finalize(array, self._by_array.pop, id(array), None)
+        self._by_array[id(array)] = weakref.ref(handle)
+        self.spilled_bytes += array.nbytes
+        return handle
+    
+    def _unpack(self, value: object) -> np.ndarray:
+        if not isinstance(value, _Spilled):
+            return value
+        
+        if self.prefetch > 0:
+            with self._lock:
+                self._position = value.index
+                self._lock.notify_all()
+                
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._prefetch, args=(value.index - 1,), daemon=True)
+                    self._thread.start()
+            
+            data = value.data
+            if data is not None:
+                value.data = None
+                return data
+        
+        return value.map()
+    
+    def _prefetch(self, start: int):
+        """
+        Read the spilled arrays from `start` down to the first one, staying `prefetch` arrays ahead of the
+        backward pass. The thread stops if the backward pass makes no progress for a second.
+        """
+        for index in range(start, -1, -1):
+            with self._lock:
+                while index < self._position - self.prefetch:
+                    if not self._lock.wait(timeout=1.0):
+                        self._thread = None
+                        return
+            
+            entry = self._spilled.get(index)
+            handle = entry() if entry is not None else None
+            if handle is not None and handle.data is None:
+                try:
+                    handle.data = handle.read()
+                except OSError:
+                    pass
+        
+        with self._lock:
+            self._thread = None
@@ -0,0 +1,238 @@
+"""
+This module provides a multi-threaded engine for the default backward pass.
+
+The serial backward pass visits the nodes of the graph one at a time, in reverse topological order.
+NumPy releases the GIL inside ufuncs and BLAS calls, so the backward functions of independent branches
+of the graph, such as the separate heads of a multi-output model, can run at the same time. While a
+`ParallelBackward` engine is active, a node is dispatched to a thread pool as soon as every one of its
+consumers has been processed.
+
+Only independent branches run at the same time. The backward function of a single node runs on one
+worker, so the gradients of the two operands of a matrix multiplication are still computed one after the
+other, and a chain of operations gets no faster. The engine only pays off for graphs with several wide
+branches on a machine with several cores. Otherwise the dispatch makes the backward pass slower than
+the serial one.
+
+The gradient contributions of the consumers of a node are not accumulated as they arrive, but in the
+order in which the serial backward pass would have accumulated them, so the gradients are bit-identical
+to the ones of the serial engine.
+
+Example:
+    
+    >>> with ParallelBackward(workers=4):
+    ...     loss = sum(mse_loss(head(x), y) for head, y in zip(heads, targets))
+    ...     loss.backward()
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import grad
+from .tensor import (Tensor, _call_grad_fn, _GradMode, _is_fresh,
+                     _release_node)
+
+_INLINE = (grad.checkpoint_backward,)
+"""
+Backward functions that run on the calling thread, as they run a nested backward pass and change the global grad mode.
+"""
+
+Contribution = Tuple[int, int, np.ndarray, bool]
+"""
+A gradient contribution to a node: the negated topological index of the consumer, the position of the node
+among the parents of the consumer, the gradient, and whether the gradient is a fresh array that can be kept as is.
+Sorting contributions orders them as the serial backward pass accumulates them.
+"""
+
+def _process(node: Tensor, contributions: List[Contribution]) -> List[Tuple[int, Tensor, np.ndarray, bool]]:
+    """
+    Accumulate the gradient of a node from the contributions of its consumers, and compute the contributions
+    of the node to its parents.
+    
+    Returns:
+        A list of `(position, parent, gradient, owned)` tuples, one per parent that receives a gradient.
+    """
+    for _, _, contribution, owned in contributions:
+        node._accumulate_grad(contribution, owned)
+    
+    if node._grad_fn is None or node._grad is None:
+        return []
+    
+    try:
+        if node._unpack is None:
+            gradients = node._grad_fn(node, node._grad)
+        else:
+            gradients = _call_grad_fn(node, node._grad)
+        taken: List[np.ndarray] = [node._grad]
+        results = []
+        
+        for position, (parent, grad) in enumerate(zip(node._parents, gradients)):
+            if parent._requires_grad and grad is not None:
+                if type(grad) is not np.ndarray or grad.dtype != np.float32:
+                    grad = np.asarray(grad, dtype=np.float32)
+                
+                if grad.shape != parent._shape:
+                    raise ValueError(f"Gradient shape mismatch for tensor {parent._id}")
+                
+                owned = _is_fresh(grad) and not any(grad is alias for alias in taken)
+                if owned:
+                    taken.append(grad)
+                
+                results.append((position, parent, grad, owned))
+        
+        return results
+    
+    except Exception as e:
+        raise RuntimeError(f"Error in backward pass at tensor {node._id}: {str(e)}")
+
+def _process_in_worker(state: tuple, node: Tensor, contributions: List[Contribution]) -> List[Tuple[int, Tensor, np.ndarray, bool]]:
+    """
+    Run `_process` on a worker thread, with the allocator and the element-wise executor of the thread
+    that started the backward pass, as the grad mode is local to each thread. The previous state of the
+    worker is restored afterwards, so it does not keep the allocator alive once the caller is done with it.
+    """
+    previous = (_GradMode.allocator, _GradMode.elementwise)
+    _GradMode.allocator, _GradMode.elementwise = state
+    try:
+        return _process(node, contributions)
+    finally:
+        _GradMode.allocator, _GradMode.elementwise = previous
+
+class ParallelBackward:
+    """
+    Backward engine dispatching the nodes of the graph to a thread pool as soon as their gradient is complete.
+    
+    The engine is selected for the duration of a `with` block, and every default backward pass started in
+    the block runs on it. The thread pool is created when the block is entered and shut down when it exits.
+    
+    Nodes whose gradient has fewer than `min_size` elements are processed on the calling thread, as the cost
+    of dispatching them to a worker would exceed the work done.
+    
+    Note:
+        - Backward functions must not share mutable state across nodes. This holds for the operations of
+          the library; fused operations and `BufferPool` serialize the access to their scratch buffers.
+    """
+    
+    def __init__(self, workers: Optional[int] = None, min_size: int = 2**14):
+        """
+        Initialize the engine.
+        
+        Args:
+            workers: The number of worker threads. Default is the number of CPUs.
+            min_size: The number of elements from which the gradient of a node is computed on a worker thread.
+        
+        Raises:
+            ValueError: If `workers` is not positive.
+        """
+        
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("The number of workers must be positive")
+        
+        self.workers = workers
+        self.min_size = min_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._previous: List[object] = []
+    
+    def __enter__(self) -> ParallelBackward:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='clumsygrad-backward')
+        
+        self._previous.append(_GradMode.engine)
+        _GradMode.engine = self
+        return self
+    
+    def __exit__(self, *exc):
+        _GradMode.engine = self._previous.pop()
+        
+        if not self._previous:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        return False
+    
+    def run(self, topo_order: List[Optional[Tensor]], retained: Dict[int, np.ndarray], keep_graph: bool):
+        """
+        Propagate the gradient of the last tensor of `topo_order`, already seeded, to the rest of the graph.
+        
+        Args:
+            topo_order: The tensors of the graph in topological order. Unless `keep_graph` is set,
+                the entries of the released nodes are set to None.
+            retained: The gradients retained from earlier passes, set aside by `Tensor.backward`.
+            keep_graph: Whether the graph is kept for further backward passes.
+        
+        Raises:
+            RuntimeError: If a backward function fails. The nodes already dispatched are completed first.
+        """
+        
+        index_of: Dict[int, int] = {}
+        for index, node in enumerate(topo_order):
+            index_of[id(node)] = index
+        
+        # Number of consumers of each node that have not been processed yet
+        remaining = [0] * len(topo_order)
+        for node in topo_order:
+            for parent in node._parents:
+                if parent._requires_grad:
+                    remaining[index_of[id(parent)]] += 1
+        
+        state = (_GradMode.allocator, _GradMode.elementwise)
+        pending: List[Optional[List[Contribution]]] = [[] for _ in topo_order]
+        completed: queue.SimpleQueue = queue.SimpleQueue()
+        ready = [len(topo_order) - 1]
+        in_flight = 0
+        error: Optional[BaseException] = None
+        
+        def finish(index: int, results: List[Tuple[int, Tensor, np.ndarray, bool]]):
+            node = topo_order[index]
+            
+            for position, parent, gradient, owned in results:
+                pending[index_of[id(parent)]].append((-index, position, gradient, owned))
+            
+            for parent in node._parents:
+                if parent._requires_grad:
+                    parent_index = index_of[id(parent)]
+                    remaining[parent_index] -= 1
+                    if remaining[parent_index] == 0:
+                        ready.append(parent_index)
+            
+            if _release_node(node, retained, keep_graph):
+                topo_order[index] = None
+        
+        while True:
+            while ready and error is None:
+                index = ready.pop()
+                node = topo_order[index]
+                contributions = pending[index]
+                contributions.sort(key=lambda contribution: contribution[:2])
+                pending[index] = None
+                
+                if node._grad_fn in _INLINE or math.prod(node._shape) < self.min_size:
+                    try:
+                        finish(index, _process(node, contributions))
+                    except BaseException as e:
+                        error = e
+                else:
+                    future = self._executor.submit(_process_in_worker, state, node, contributions)
+                    future.add_done_callback(lambda future, index=index: completed.put((index, future)))
+                    in_flight += 1
+            
+            if in_flight == 0:
+                break
+            
+            index, future = completed.get()
+            in_flight -= 1
+            
+            if future.exception() is not None:
+                error = error or future.exception()
+            elif error is None:
+                finish(index, future.result())
+        
+        if error is not None:
+            raise error
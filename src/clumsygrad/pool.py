@@ -0,0 +1,157 @@
+"""
+This module provides a caching allocator for the arrays created by operations and backward functions.
+
+A training loop allocates the same set of arrays, with the same shapes, on every iteration: the results
+of the forward pass and the gradients of the backward pass. While a `BufferPool` is active, these arrays
+are drawn from a cache of buffers keyed by shape and dtype instead of being allocated from scratch.
+
+A buffer is back in the pool as soon as nothing references it anymore, i.e. once the tensor holding it
+and every view of it are gone. For the intermediate tensors of a graph, this happens when the graph is
+freed by the backward pass.
+
+Example:
+    
+    >>> pool = BufferPool(max_bytes=64 * 2**20)
+    >>> with pool:
+    ...     for x, y in batches:
+    ...         mse_loss(model(x), y).backward()
+    ...         optimizer.step()
+    ...         optimizer.zero_grad()
+    >>> pool.hits, pool.misses
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .tensor import _GradMode
+
+def _refcount(blocks: List[np.ndarray], index: int) -> int:
+    return sys.getrefcount(blocks[index])
+
+class BufferPool:
+    """
+    A pool of reusable buffers with a cap on the number of bytes it holds.
+    
+    The pool keeps a reference to every buffer it hands out, and a buffer is free when the pool holds
+    the only reference to it. Views always reference the array owning their memory, so a buffer is
+    never handed out again while any view into it is alive.
+    
+    When the buffers held exceed `max_bytes`, the least recently used ones are evicted. An evicted buffer
+    that is still in use is simply forgotten by the pool and freed as a regular array later.
+    
+    Attributes:
+        hits: Number of requests served with a cached buffer.
+        misses: Number of requests that needed a new allocation.
+        evictions: Number of buffers evicted to stay under `max_bytes`.
+    """
+    
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        """
+        Initialize an empty pool.
+        
+        Args:
+            max_bytes: The maximum number of bytes held by the pool, in use or not.
+        """
+        
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._nbytes = 0
+        self._blocks: Dict[Tuple[tuple, np.dtype], List[np.ndarray]] = {}
+        self._lru: OrderedDict[int, Tuple[tuple, np.dtype]] = OrderedDict()
+        self._previous: List[object] = []
+        self._lock = threading.Lock()
+        
+        # Reference count of a buffer held by the pool only, measured through the same code path
+        probe = [np.empty(0)]
+        self._free_refcount = _refcount(probe, 0)
+    
+    def __enter__(self) -> BufferPool:
+        self._previous.append(_GradMode.allocator)
+        _GradMode.allocator = self
+        return self
+    
+    def __exit__(self, *exc):
+        _GradMode.allocator = self._previous.pop()
+        return False
+    
+    @property
+    def nbytes(self) -> int:
+        """Return the number of bytes held by the pool."""
+        return self._nbytes
+    
+    def __len__(self) -> int:
+        return len(self._lru)
+    
+    def empty(self, shape: Tuple[int, ...], dtype: np.dtype = np.float32) -> np.ndarray:
+        """
+        Return an uninitialized array, reusing a free buffer of the same shape and dtype if there is one.
+        
+        Args:
+            shape: The shape of the array.
+            dtype: The data type of the array (default is float32).
+        
+        Returns:
+            An array that owns its memory and that nothing else references.
+        
+        Note:
+            - The pool can be used by several threads at once, e.g. by the workers of `ParallelBackward`.
+        """
+        
+        with self._lock:
+            key = (tuple(shape), np.dtype(dtype))
+            blocks = self._blocks.get(key)
+            
+            if blocks is None:
+                blocks = self._blocks[key] = []
+            
+            for index in range(len(blocks)):
+                if _refcount(blocks, index) <= self._free_refcount:
+                    block = blocks[index]
+                    self._lru.move_to_end(id(block))
+                    self.hits += 1
+                    return block
+            
+            block = np.empty(key[0], dtype=key[1])
+            self.misses += 1
+            
+            blocks.append(block)
+            self._lru[id(block)] = key
+            self._nbytes += block.nbytes
+            
+            while self._nbytes > self.max_bytes and self._lru:
+                self._evict()
+            
+            return block
+    
+    def _evict(self):
+        block_id, key = self._lru.popitem(last=False)
+        blocks = self._blocks[key]
+        
+        for index, block in enumerate(blocks):
+            if id(block) == block_id:
+                del blocks[index]
+                self._nbytes -= block.nbytes
+                self.evictions += 1
+                break
+        
+        if not blocks:
+            del self._blocks[key]
+    
+    def clear(self):
+        """Forget every buffer held by the pool."""
+        self._blocks.clear()
+        self._lru.clear()
+        self._nbytes = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """Return the hit/miss statistics and the memory held by the pool."""
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'buffers': len(self._lru), 'bytes': self._nbytes}
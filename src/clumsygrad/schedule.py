@@ -0,0 +1,196 @@
+"""
+This module provides memory-aware scheduling of the backward pass.
+
+The default backward pass visits the nodes in the reverse of a depth-first topological order, which is only
+one of the valid orders. The gradient of an INTERMEDIATE tensor is alive from the moment its first consumer
+is processed until the tensor itself is processed, so on graphs with many branches the order decides how
+many partial gradients are alive at the same time.
+
+`memory_aware_order` builds the reverse order greedily: among the nodes whose consumers have all been
+processed, it picks the one whose processing adds the fewest bytes of live gradients, and keeps the default
+order if the greedy one does not lower the peak. While a `MemoryAwareSchedule` is active, every default
+backward pass runs in that order.
+
+Example:
+    
+    >>> report = compare_schedules(loss)
+    >>> report['default'], report['memory_aware']
+    >>> with MemoryAwareSchedule():
+    ...     loss.backward()
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from .tensor import Tensor, TensorType, _GradMode, _run_serial
+
+def _nbytes(tensor: Tensor) -> int:
+    return 4 * math.prod(tensor._shape)
+
+def _is_freed(tensor: Tensor) -> bool:
+    return tensor._tensor_type == TensorType.INTERMEDIATE and not tensor._retain_grad
+
+def peak_gradient_memory(topo_order: Sequence[Tensor]) -> int:
+    """
+    Compute the peak number of bytes of live gradients when the backward pass visits the nodes in reverse order.
+    
+    A gradient is alive from the moment the first consumer of its tensor is processed. The gradients of
+    INTERMEDIATE tensors are freed once the tensor is processed, unless `retain_grad` was called on it,
+    and the gradients of leaves stay alive. Gradients held before the pass are not counted.
+    
+    Args:
+        topo_order: The tensors of the graph in topological order, ending with the output of the pass.
+    
+    Returns:
+        The peak number of bytes.
+    """
+    
+    root = topo_order[-1]
+    has_grad: Set[int] = {id(root)}
+    live = peak = _nbytes(root)
+    
+    for node in reversed(topo_order):
+        if id(node) not in has_grad:
+            continue
+        
+        for parent in node._parents:
+            if parent._requires_grad and id(parent) not in has_grad:
+                has_grad.add(id(parent))
+                live += _nbytes(parent)
+        
+        peak = max(peak, live)
+        
+        if _is_freed(node):
+            live -= _nbytes(node)
+    
+    return peak
+
+def memory_aware_order(topo_order: Sequence[Tensor]) -> List[Tensor]:
+    """
+    Build a topological order of the graph whose reverse keeps the peak of live gradients low.
+    
+    The reverse order is built greedily from the output: among the nodes whose consumers have all been
+    processed, the next one is the node whose processing adds the fewest bytes of live gradients,
+    i.e. the bytes of the gradients it creates for its parents minus the bytes of its own gradient if
+    it is freed. Ties go to the node that became ready last, which follows a branch to its end.
+    
+    Args:
+        topo_order: The tensors of the graph in topological order, ending with the output of the pass.
+    
+    Returns:
+        A topological order of the same tensors. It is `topo_order` itself if the greedy order does not
+        have a lower peak according to `peak_gradient_memory`.
+    """
+    
+    index_of: Dict[int, int] = {}
+    for index, node in enumerate(topo_order):
+        index_of[id(node)] = index
+    
+    # Number of consumers of each node that have not been processed yet
+    remaining = [0] * len(topo_order)
+    for node in topo_order:
+        for parent in node._parents:
+            if parent._requires_grad:
+                remaining[index_of[id(parent)]] += 1
+    
+    has_grad = [False] * len(topo_order)
+    has_grad[-1] = True
+    ready = [len(topo_order) - 1]
+    reverse_order: List[Tensor] = []
+    
+    while ready:
+        best_position = len(ready) - 1
+        best_delta: Optional[int] = None
+        
+        for position in range(len(ready) - 1, -1, -1):
+            node = topo_order[ready[position]]
+            delta = -_nbytes(node) if _is_freed(node) else 0
+            
+            created: Set[int] = set()
+            for parent in node._parents:
+                parent_index = index_of.get(id(parent))
+                if parent._requires_grad and not has_grad[parent_index] and parent_index not in created:
+                    created.add(parent_index)
+                    delta += _nbytes(parent)
+            
+            if best_delta is None or delta < best_delta:
+                best_position, best_delta = position, delta
+        
+        node = topo_order[ready.pop(best_position)]
+        reverse_order.append(node)
+        
+        for parent in node._parents:
+            if parent._requires_grad:
+                parent_index = index_of[id(parent)]
+                has_grad[parent_index] = True
+                remaining[parent_index] -= 1
+                if remaining[parent_index] == 0:
+                    ready.append(parent_index)
+    
+    order = reverse_order[::-1]
+    
+    if peak_gradient_memory(order) < peak_gradient_memory(topo_order):
+        return order
+    
+    return list(topo_order)
+
+def compare_schedules(tensor: Tensor) -> Dict[str, int]:
+    """
+    Report the peak bytes of live gradients of a backward pass from `tensor`, in the default order and in
+    the memory-aware order.
+    
+    Args:
+        tensor: The output of the backward pass.
+    
+    Returns:
+        A dictionary with the peaks in bytes under the keys 'default' and 'memory_aware'.
+    """
+    
+    topo_order = tensor._topo_cache if tensor._topo_cache is not None else tensor._build_topo()
+    
+    return {'default': peak_gradient_memory(topo_order),
+            'memory_aware': peak_gradient_memory(memory_aware_order(topo_order))}
+
+class MemoryAwareSchedule:
+    """
+    Backward engine visiting the nodes one at a time in the order built by `memory_aware_order`.
+    
+    The engine is selected for the duration of a `with` block, and every default backward pass started
+    in the block runs on it. It produces the same gradients as the default engine, up to the order in which
+    the contributions of several consumers are summed.
+    """
+    
+    def __init__(self):
+        self._previous: List[object] = []
+    
+    def __enter__(self) -> MemoryAwareSchedule:
+        self._previous.append(_GradMode.engine)
+        _GradMode.engine = self
+        return self
+    
+    def __exit__(self, *exc):
+        _GradMode.engine = self._previous.pop()
+        return False
+    
+    def run(self, topo_order: List[Optional[Tensor]], retained: Dict[int, np.ndarray], keep_graph: bool):
+        """
+        Propagate the gradient of the last tensor of `topo_order`, already seeded, to the rest of the graph.
+        
+        Args:
+            topo_order: The tensors of the graph in topological order. Unless `keep_graph` is set,
+                the entries of the released nodes are set to None.
+            retained: The gradients retained from earlier passes, set aside by `Tensor.backward`.
+            keep_graph: Whether the graph is kept for further backward passes.
+        """
+        
+        order = memory_aware_order(topo_order)
+        
+        # The nodes are released as the pass goes through `order`, which must hold the only references
+        if not keep_graph:
+            topo_order[:] = [None] * len(topo_order)
+        
+        _run_serial(order, retained, keep_graph)
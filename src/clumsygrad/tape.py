@@ -0,0 +1,220 @@
+"""
+This module contains an alternative, tape-based backward engine.
+
+While a `Tape` is active, every operation that creates an INTERMEDIATE tensor is appended to a linear
+tape held in compact NumPy arrays: an op code, the slots of its inputs and the slot of its output.
+Tensors are referred to by their slot, i.e. their position in the list of saved values.
+The backward pass is then a single reverse sweep over the tape, without a topological sort
+and without any per-node bookkeeping.
+
+Example:
+    
+    >>> x = Tensor([1.0, 2.0, 3.0], tensor_type=TensorType.PARAMETER)
+    >>> with Tape():
+    ...     y = sum(x ** 2 + 3 * x)
+    ...     y.backward()  # runs on the tape
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .tensor import (Tensor, TensorType, _call_grad_fn, _empty, _GradMode,
+                     _is_fresh)
+
+_OPS: List[Callable] = []
+"""
+Backward functions indexed by op code.
+"""
+
+_OP_CODES: Dict[Callable, int] = {}
+"""
+Op code of each backward function seen so far.
+"""
+
+_OP_CODES_LOCK = threading.Lock()
+
+def _op_code(grad_fn: Callable) -> int:
+    code = _OP_CODES.get(grad_fn)
+    
+    if code is None:
+        with _OP_CODES_LOCK:
+            code = _OP_CODES.get(grad_fn)
+            if code is None:
+                code = len(_OPS)
+                _OPS.append(grad_fn)
+                _OP_CODES[grad_fn] = code
+    
+    return code
+
+class Tape:
+    """
+    Records operations onto a linear tape and computes gradients with a reverse sweep over it.
+    
+    The tape is selected for the duration of a `with` block. Calling `backward` on a tensor
+    recorded by the active tape runs this engine instead of the default one, and produces the
+    same gradients.
+    
+    Note:
+        - The graph has to be built inside the block. INTERMEDIATE tensors created before the tape
+          was entered are treated as leaves, and gradients are not propagated past them.
+        - Unless `keep_graph=True`, a backward pass clears the whole tape.
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        """
+        Initialize an empty tape.
+        
+        Args:
+            capacity: The initial number of operations the tape can hold. It grows as needed.
+        """
+        
+        self._codes = np.empty(capacity, dtype=np.int32)
+        self._outputs = np.empty(capacity, dtype=np.int64)
+        self._input_offsets = np.zeros(capacity + 1, dtype=np.int64)
+        self._input_slots = np.empty(2 * capacity, dtype=np.int64)
+        self._num_ops = 0
+        self._values: List[Tensor] = []
+        self._previous: List[object] = []
+    
+    def __enter__(self) -> Tape:
+        self._previous.append(_GradMode.recorder)
+        _GradMode.recorder = self
+        return self
+    
+    def __exit__(self, *exc):
+        _GradMode.recorder = self._previous.pop()
+        return False
+    
+    def __len__(self) -> int:
+        return self._num_ops
+    
+    def _slot(self, tensor: Tensor) -> int:
+        slot = tensor._tape_slot
+        
+        if 0 <= slot < len(self._values) and self._values[slot] is tensor:
+            return slot
+        
+        tensor._tape_slot = len(self._values)
+        self._values.append(tensor)
+        return tensor._tape_slot
+    
+    def _grow(self):
+        capacity = 2 * len(self._codes)
+        
+        self._codes = np.resize(self._codes, capacity)
+        self._outputs = np.resize(self._outputs, capacity)
+        self._input_offsets = np.resize(self._input_offsets, capacity + 1)
+    
+    def owns(self, tensor: Tensor) -> bool:
+        """Return whether the tensor has been recorded on this tape."""
+        slot = tensor._tape_slot
+        return 0 <= slot < len(self._values) and self._values[slot] is tensor
+    
+    def record(self, node: Tensor, grad_fn: Optional[Callable], parents: tuple, extra: Optional[dict]):
+        """
+        Append the operation that created `node` to the tape.
+        Only operations creating INTERMEDIATE tensors are recorded, as no gradient flows through the others.
+        """
+        
+        if node._tensor_type != TensorType.INTERMEDIATE:
+            return
+        
+        index = self._num_ops
+        if index == len(self._codes):
+            self._grow()
+        
+        start = self._input_offsets[index]
+        end = start + len(parents)
+        if end > len(self._input_slots):
+            self._input_slots = np.resize(self._input_slots, 2 * end)
+        
+        for position, parent in enumerate(parents, start):
+            self._input_slots[position] = self._slot(parent) if parent._requires_grad else -1
+        
+        self._codes[index] = _op_code(grad_fn)
+        self._outputs[index] = self._slot(node)
+        self._input_offsets[index + 1] = end
+        self._num_ops += 1
+    
+    def clear(self):
+        """Remove all operations from the tape and release the recorded tensors."""
+        for tensor in self._values:
+            if tensor._tensor_type == TensorType.INTERMEDIATE:
+                tensor._cleanup_references()
+            tensor._tape_slot = -1
+        
+        self._values = []
+        self._num_ops = 0
+    
+    def backward(self, tensor: Tensor, gradient: np.ndarray, keep_graph: bool = False):
+        """
+        Compute the gradients of `tensor` with a reverse sweep over the tape.
+        This is called by `Tensor.backward` for tensors recorded on the active tape.
+        
+        Args:
+            tensor: The tensor to differentiate, recorded on this tape.
+            gradient: The float32 gradient of `tensor`, with the same shape as it.
+            keep_graph: If True, the tape is kept for further backward passes.
+        """
+        
+        values = self._values
+        grads: List[Optional[np.ndarray]] = [None] * len(values)
+        grads[tensor._tape_slot] = gradient
+        
+        codes = self._codes[:self._num_ops].tolist()
+        outputs = self._outputs[:self._num_ops].tolist()
+        offsets = self._input_offsets[:self._num_ops + 1].tolist()
+        input_slots = self._input_slots[:offsets[-1]].tolist()
+        
+        for index in range(self._num_ops - 1, -1, -1):
+            output = outputs[index]
+            grad = grads[output]
+            
+            if grad is None:
+                continue
+            
+            node = values[output]
+            
+            try:
+                if node._unpack is None:
+                    gradients = _OPS[codes[index]](node, grad)
+                else:
+                    gradients = _call_grad_fn(node, grad)
+                taken: List[np.ndarray] = [grad]
+                
+                for slot, input_grad in zip(input_slots[offsets[index]:offsets[index + 1]], gradients):
+                    if slot < 0 or input_grad is None:
+                        continue
+                    
+                    if type(input_grad) is not np.ndarray or input_grad.dtype != np.float32:
+                        input_grad = np.asarray(input_grad, dtype=np.float32)
+                    
+                    if input_grad.shape != values[slot]._shape:
+                        raise ValueError(f"Gradient shape mismatch for tensor {values[slot]._id}")
+                    
+                    accumulated = grads[slot]
+                    if accumulated is not None:
+                        np.add(accumulated, input_grad, out=accumulated)
+                    elif _is_fresh(input_grad) and not any(input_grad is alias for alias in taken):
+                        grads[slot] = input_grad
+                        taken.append(input_grad)
+                    else:
+                        grads[slot] = _empty(input_grad.shape)
+                        np.copyto(grads[slot], input_grad)
+                
+                if not node._retain_grad:
+                    grads[output] = None
+            
+            except Exception as e:
+                raise RuntimeError(f"Error in backward pass at tensor {node._id}: {str(e)}")
+        
+        for value, grad in zip(values, grads):
+            if grad is not None and (value._tensor_type != TensorType.INTERMEDIATE or value._retain_grad):
+                value._accumulate_grad(grad, owned=True)
+        
+        if not keep_graph:
+            self.clear()
@@ -6,9 +6,13 @@ It also contains some utility functions for managing tensors and their gradients
 
 from __future__ import annotations
 
+from contextlib import ContextDecorator
 from enum import IntEnum
 from typing import Callable, Dict, List, Optional, Set, Tuple, Union
 
+import threading
+import weakref
+
 import numpy as np
 
 
@@ -48,52 +52,334 @@ class TensorType(IntEnum):
     You are recommended not to use this type.
     """
 
+class _GradModeState(threading.local):
+    """
+    State consulted when nodes are created and when the backward pass is started.
+    
+    The state is local to each thread, with the class attributes as defaults: entering `no_grad`
+    or a `Tape` in one thread does not affect graphs built concurrently in other threads.
+    
+    `recorder`, when set, is notified of every node created by `Tensor._create_node` through
+    `recorder.record(node, grad_fn, parents, extra)`. `Tensor.backward` is delegated to
+    `recorder.backward(tensor, gradient, keep_graph)` for tensors where `recorder.owns(tensor)`.
+    
+    `allocator`, when set, provides the output arrays of operations and backward functions
+    through `allocator.empty(shape)`, which returns an uninitialized float32 array.
+    
+    `saved_hooks`, when set, is the active `saved_tensors_hooks`.
+    
+    `elementwise`, when set, evaluates the element-wise ufuncs of operations and backward functions
+    through `elementwise.apply(ufunc, args, out)`.
+    
+    `engine`, when set, runs the default backward pass through `engine.run(topo_order, retained, keep_graph)`
+    once the gradient of the output has been seeded, instead of the serial loop of `Tensor.backward`.
+    """
+    
+    enabled = True
+    inference = False
+    recorder = None
+    allocator = None
+    saved_hooks = None
+    elementwise = None
+    engine = None
+
+_GradMode = _GradModeState()
+
+class _RestoreStack(threading.local):
+    """
+    The states to restore when a context manager exits, kept per thread like `_GradMode`, so that a
+    single instance, such as a decorator, can be entered from several threads at once.
+    """
+    
+    def __init__(self):
+        self.states: List[object] = []
+
+class no_grad(ContextDecorator):
+    """
+    Context manager and decorator that disables graph construction.
+    
+    Inside the context, every operation returns a plain INPUT tensor without parents,
+    backward function or extra metadata, even when its operands are PARAMETER tensors.
+    Gradients of graphs built outside the context can still be computed.
+    
+    Examples:
+    
+        >>> w = Tensor([0.5, 0.3], tensor_type=TensorType.PARAMETER)
+        >>> with no_grad():
+        ...     y = w * 2  # INPUT tensor, no graph is recorded
+        
+        >>> @no_grad()
+        ... def evaluate(x):
+        ...     return x * w
+    """
+    
+    def __init__(self):
+        self._previous = _RestoreStack()
+    
+    def __enter__(self):
+        self._previous.states.append((_GradMode.enabled, _GradMode.inference))
+        _GradMode.enabled = False
+        return self
+    
+    def __exit__(self, *exc):
+        _GradMode.enabled, _GradMode.inference = self._previous.states.pop()
+        return False
+
+class inference_mode(no_grad):
+    """
+    A stricter version of `no_grad` intended for evaluation and serving.
+    
+    In addition to disabling graph construction, calling `Tensor.backward` inside the context
+    raises a RuntimeError, so no gradient can be accumulated into the parameters by accident.
+    """
+    
+    def __enter__(self):
+        super().__enter__()
+        _GradMode.inference = True
+        return self
+
+class saved_tensors_hooks(ContextDecorator):
+    """
+    Context manager and decorator that transforms the arrays saved for backward.
+    
+    Inside the context, every array saved by an operation for its backward function is passed to
+    `pack`, and the result is stored on the node instead. Right before the backward function of
+    the node runs, `unpack` is called on each stored value to get the arrays back.
+    
+    Examples:
+    
+        >>> def pack(array):
+        ...     return array.astype(np.float16)
+        >>> def unpack(value):
+        ...     return value.astype(np.float32)
+        >>> with saved_tensors_hooks(pack, unpack):
+        ...     y = exp(x @ w)
+    """
+    
+    def __init__(self, pack: Callable[[np.ndarray], object], unpack: Callable[[object], np.ndarray]):
+        self.pack = pack
+        self.unpack = unpack
+        self._previous = _RestoreStack()
+    
+    def __enter__(self):
+        self._previous.states.append(_GradMode.saved_hooks)
+        _GradMode.saved_hooks = self
+        return self
+    
+    def __exit__(self, *exc):
+        _GradMode.saved_hooks = self._previous.states.pop()
+        return False
+    
+    def pack_saved(self, grad_fn: Callable, saved: Tuple[np.ndarray, ...], parents: Tuple[Tensor, ...]) -> tuple:
+        """
+        Pack the arrays saved for `grad_fn` by an operation on `parents`. By default, `pack` is applied to
+        each of them. Subclasses can override this method to pack the arrays depending on the operation.
+        """
+        return tuple(self.pack(array) for array in saved)
+
+def is_grad_enabled() -> bool:
+    """Return whether operations currently build the computational graph."""
+    return _GradMode.enabled
+
+def _held_by_leaves(array: np.ndarray, parents: Tuple[Tensor, ...]) -> bool:
+    """
+    Check whether a saved array is the data of a leaf among `parents`. The graph references its leaves,
+    so storing such an array in another form, to save memory, only adds to what the graph holds.
+    """
+    return any(array is parent._data for parent in parents if parent._tensor_type != TensorType.INTERMEDIATE)
+
+def _is_fresh(array: np.ndarray) -> bool:
+    """
+    Check whether an array owns its memory and can be written to, i.e. it is not a view
+    (such as the read-only result of `np.broadcast_to`) into some other array.
+    """
+    return array.base is None and array.flags.writeable
+
+def _call_grad_fn(node: Tensor, grad: np.ndarray) -> tuple:
+    """
+    Call the backward function of a node whose saved arrays were packed by `saved_tensors_hooks`,
+    with the unpacked arrays. The packed values are kept on the node for later passes.
+    """
+    packed = node._saved
+    node._saved = tuple(node._unpack(value) for value in packed)
+    
+    try:
+        return node._grad_fn(node, grad)
+    finally:
+        node._saved = packed
+
+def _release_node(node: Tensor, retained: Dict[int, np.ndarray], keep_graph: bool) -> bool:
+    """
+    Release what a node no longer needs once its gradient has been propagated to its parents:
+    every consumer of the node has been processed, so its gradient and, unless the graph is kept,
+    its references to the parents and their data are no longer needed.
+    
+    Args:
+        node: The node that has just been processed by the backward pass.
+        retained: The gradients retained from earlier passes, set aside by `Tensor.backward`.
+        keep_graph: Whether the graph is kept for further backward passes.
+    
+    Returns:
+        True if the node was removed from the graph, and can be dropped from the topological order.
+    """
+    if node._tensor_type != TensorType.INTERMEDIATE:
+        return False
+    
+    if not node._retain_grad:
+        node._grad = None
+    elif id(node) in retained:
+        previous = retained.pop(id(node))
+        if node._grad is not None:
+            np.add(previous, node._grad, out=previous)
+        node._grad = previous
+    
+    if keep_graph:
+        return False
+    
+    node._cleanup_references()
+    return True
+
+def _run_serial(topo_order: List[Optional[Tensor]], retained: Dict[int, np.ndarray], keep_graph: bool):
+    """
+    Propagate the gradient of the last tensor of `topo_order`, already seeded, to the rest of the graph,
+    visiting the nodes one at a time in reverse order. This is the default engine of `Tensor.backward`.
+    
+    Args:
+        topo_order: The tensors of the graph in topological order. Unless `keep_graph` is set,
+            the entries of the released nodes are set to None.
+        retained: The gradients retained from earlier passes, set aside by `Tensor.backward`.
+        keep_graph: Whether the graph is kept for further backward passes.
+    """
+    for index in range(len(topo_order) - 1, -1, -1):
+        node = topo_order[index]
+        
+        if node._grad_fn is not None and node._grad is not None:
+            try:
+                if node._unpack is None:
+                    gradients = node._grad_fn(node, node._grad)
+                else:
+                    gradients = _call_grad_fn(node, node._grad)
+                taken: List[np.ndarray] = [node._grad]
+                
+                for parent, grad in zip(node._parents, gradients):
+                    if parent._requires_grad and grad is not None:
+                        if type(grad) is not np.ndarray or grad.dtype != np.float32:
+                            grad = np.asarray(grad, dtype=np.float32)
+                        
+                        owned = _is_fresh(grad) and not any(grad is alias for alias in taken)
+                        if owned:
+                            taken.append(grad)
+                        
+                        parent._accumulate_grad(grad, owned)
+            
+            except Exception as e:
+                raise RuntimeError(f"Error in backward pass at tensor {node._id}: {str(e)}")
+        
+        if _release_node(node, retained, keep_graph):
+            topo_order[index] = None
+
+def _empty(shape: Tuple[int, ...]) -> np.ndarray:
+    """
+    Return an uninitialized float32 array to write the result of an operation into,
+    drawn from the active allocator if there is one.
+    """
+    allocator = _GradMode.allocator
+    
+    if allocator is None:
+        return np.empty(shape, dtype=np.float32)
+    
+    return allocator.empty(shape)
+
+def _ufunc(ufunc: np.ufunc, *args, out: np.ndarray) -> np.ndarray:
+    """
+    Evaluate an element-wise ufunc into `out`, through the active element-wise executor if there is one.
+    """
+    executor = _GradMode.elementwise
+    
+    if executor is None or out.size < executor.threshold:
+        return ufunc(*args, out=out)
+    
+    return executor.apply(ufunc, args, out)
+
 class Tensor:
     """
     The main Tensor class, comprising the core functionality for creation and manipulation of tensors in the computational graph.
     """
     
     _id_counter = 0
+    _id_lock = threading.Lock()
     
     __slots__ = ('_data', '_shape', '_id', '_grad_fn', '_grad', '_parents',
-                 '_extra', '_tensor_type', '_requires_grad')
+                 '_extra', '_tensor_type', '_requires_grad', '_topo_cache', '_tape_slot',
+                 '_retain_grad', '_saved', '_unpack', '_tangent', '_grad_tensor', '_node', '_owner',
+                 '__weakref__')
     
     @staticmethod
     def _create_node(data: np.ndarray | list | float,
                      grad_fn: Optional[Callable], 
                      parents: Tuple[Tensor, ...],
-                     extra: Optional[dict] = None) -> Tensor:
+                     extra: Optional[dict] = None,
+                     saved: Tuple[np.ndarray, ...] = ()) -> Tensor:
         
         """
         Creates a new tensor node in the computational graph.
-        By default, this node is created as an INTERMEDIATE tensor.
+        By default, this node is created as an INTERMEDIATE tensor. Inside `no_grad` or
+        `inference_mode`, a plain INPUT tensor is returned instead and no graph is recorded.
+        
+        `data` is expected to be the freshly computed result of an operation, so a float32
+        array that owns its memory is used without being copied.
+        
+        The backward function only has access to `saved` and `extra`, in the style of `ctx.save_for_backward`.
+        An operation saves the arrays its backward function needs, and nothing else. INTERMEDIATE parents
+        are replaced by their graph nodes (see `_graph_node`), so the graph holds no other array.
         
         Args:
             data: The data for the new tensor.
             grad_fn: The gradient function to use for backpropagation.
             parents: The parent tensors that this tensor depends on.
             extra: Additional metadata for the tensor (optional).
+            saved: The arrays needed by `grad_fn`, typically inputs or the output of the operation (optional).
             
         Returns:
             A new Tensor instance representing the node in the computational graph. 
         """
-        tensor_type = TensorType.INPUT
+        if type(data) is not np.ndarray or data.dtype != np.float32 or not _is_fresh(data):
+            data = np.array(data, dtype=np.float32)
         
-        for parent in parents:
-            if parent._tensor_type == TensorType.PARAMETER or parent._tensor_type == TensorType.INTERMEDIATE:
-                tensor_type = TensorType.INTERMEDIATE
-                break
+        node = Tensor.__new__(Tensor)
         
-        node = Tensor(data=data, tensor_type=tensor_type)
-        
-        if tensor_type != TensorType.INPUT:
-            node._grad_fn = grad_fn
-            node._parents = parents
+        if not _GradMode.enabled:
+            node._setup(data, TensorType.INPUT)
+        else:
+            tensor_type = TensorType.INPUT
             
-            if extra: 
-                node._extra.update(extra)
+            for parent in parents:
+                if parent._tensor_type == TensorType.PARAMETER or parent._tensor_type == TensorType.INTERMEDIATE:
+                    tensor_type = TensorType.INTERMEDIATE
+                    break
             
-        node._requires_grad = any(parent._requires_grad for parent in parents)
+            node._setup(data, tensor_type)
+            
+            if tensor_type != TensorType.INPUT:
+                if _GradMode.recorder is None:
+                    parents = tuple(parent._graph_node() for parent in parents)
+                
+                node._grad_fn = grad_fn
+                node._parents = parents
+                node._saved = saved
+                
+                hooks = _GradMode.saved_hooks
+                if saved and hooks is not None:
+                    node._saved = hooks.pack_saved(grad_fn, saved, parents)
+                    node._unpack = hooks.unpack
+                
+                if extra: 
+                    node._extra.update(extra)
+                
+            node._requires_grad = any(parent._requires_grad for parent in parents)
+        
+        if _GradMode.recorder is not None:
+            _GradMode.recorder.record(node, grad_fn, parents, extra)
         
         return node
     
@@ -153,6 +439,113 @@ class Tensor:
                 
     def _cleanup_references(self):                    
         self._parents = ()
+        self._topo_cache = None
+        self._saved = ()
+        self._unpack = None
+        
+        owner = self._owner() if self._owner is not None else None
+        if owner is not None:
+            owner._cleanup_references()
+    
+    def _graph_node(self) -> Tensor:
+        """
+        Return the tensor standing for this one among the parents of the operations that use it.
+        
+        Backward functions only read the arrays saved by their operation, so the graph does not need
+        the data of INTERMEDIATE tensors. On first use, such a tensor gets a graph node that shares its
+        graph state but not its data, and its data is freed as soon as the caller drops it. The node refers
+        back to the tensor weakly, so that both are released together by the backward pass.
+        
+        Returns:
+            The graph node of an INTERMEDIATE tensor, and the tensor itself otherwise.
+        """
+        node = self._node
+        if node is not None:
+            return node
+        
+        if self._tensor_type != TensorType.INTERMEDIATE or self._owner is not None:
+            return self
+        
+        node = Tensor.__new__(Tensor)
+        node._data = None
+        node._shape = self._shape
+        node._id = self._id
+        node._grad_fn = self._grad_fn
+        node._grad = self._grad
+        node._parents = self._parents
+        node._extra = self._extra
+        node._tensor_type = self._tensor_type
+        node._requires_grad = self._requires_grad
+        node._topo_cache = None
+        node._tape_slot = -1
+        node._retain_grad = self._retain_grad
+        node._saved = self._saved
+        node._unpack = self._unpack
+        node._tangent = None
+        node._grad_tensor = None
+        node._node = None
+        node._owner = weakref.ref(self)
+        
+        self._grad = None
+        self._node = node
+        return node
+    
+    def _accumulate_grad(self, grad: np.ndarray, owned: bool = False):
+        """
+        Accumulate a gradient contribution into this tensor.
+        
+        Args:
+            grad: A float32 gradient with the same shape as this tensor.
+            owned: If True, `grad` is a fresh array that nothing else references, and it is
+                stored directly instead of being copied.
+                
+        Raises:
+            ValueError: If the shape of `grad` does not match the shape of the tensor.
+        """
+        if grad.shape != self._shape:
+            raise ValueError(f"Gradient shape mismatch for tensor {self._id}")
+        
+        if self._grad is None:
+            if owned:
+                self._grad = grad
+            else:
+                self._grad = _empty(self._shape)
+                np.copyto(self._grad, grad)
+        else:
+            _ufunc(np.add, self._grad, grad, out=self._grad)
+    
+    def _build_topo(self) -> List[Tensor]:
+        """
+        Build the topological order of the graph rooted at this tensor.
+        
+        The graph is walked with an explicit stack instead of recursion, so the depth of the
+        graph is not limited by the Python recursion limit. Only tensors that require gradients
+        are included, and every tensor appears after all of its parents.
+        
+        Returns:
+            A list of tensors in topological order, ending with this tensor.
+        """
+        topo_order: List[Tensor] = []
+        visited: Set[int] = set()
+        stack: List[Tuple[Tensor, bool]] = [(self, False)]
+        
+        while stack:
+            node, expanded = stack.pop()
+            
+            if expanded:
+                topo_order.append(node)
+                continue
+            
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+            
+            stack.append((node, True))
+            for parent in reversed(node._parents):
+                if parent._requires_grad and id(parent) not in visited:
+                    stack.append((parent, False))
+        
+        return topo_order
     
     def __init__(self, 
                  data: np.ndarray | list | float,
@@ -172,7 +565,10 @@ class Tensor:
             - By default, data type is set to float32.
         """
         
-        self._data = np.array(data, dtype=np.float32)
+        self._setup(np.array(data, dtype=np.float32), tensor_type)
+    
+    def _setup(self, data: np.ndarray, tensor_type: TensorType):
+        self._data = data
         self._shape = self._data.shape
         self._grad_fn = None
         self._grad = None
@@ -184,9 +580,19 @@ class Tensor:
             self._requires_grad = False
         
         self._parents: Tuple[Tensor, ...] = ()
-        
-        self._id = Tensor._id_counter
-        Tensor._id_counter += 1
+        self._topo_cache: Optional[List[Tensor]] = None
+        self._tape_slot = -1
+        self._retain_grad = False
+        self._saved: Tuple[np.ndarray, ...] = ()
+        self._unpack: Optional[Callable] = None
+        self._tangent: Optional[np.ndarray] = None
+        self._grad_tensor: Optional[Tensor] = None
+        self._node: Optional[Tensor] = None
+        self._owner: Optional[weakref.ref] = None
+        
+        with Tensor._id_lock:
+            self._id = Tensor._id_counter
+            Tensor._id_counter += 1
         
         self._extra = {}
     
@@ -210,18 +616,47 @@ class Tensor:
     @property
     def grad(self) -> Optional[np.ndarray]:
         """Return the gradient of the tensor."""
+        if self._grad is None and self._node is not None:
+            return self._node._grad
         return self._grad
     
     @grad.setter
     def grad(self, value: np.ndarray):
-        """Set the gradient of the tensor."""
+        """Set the gradient of the tensor. The gradient tensor from a `create_graph` pass is discarded."""
         self._grad = value
+        self._grad_tensor = None
+        if self._node is not None:
+            self._node._grad = value
+    
+    @property
+    def grad_tensor(self) -> Optional[Tensor]:
+        """
+        Return the gradient of the tensor as a differentiable tensor, accumulated by backward passes
+        with `create_graph=True`, or None if there was no such pass since the gradient was last set.
+        """
+        return self._grad_tensor
     
     @property
     def requires_grad(self) -> bool:
         """Return whether this tensor requires gradients."""
         return self._requires_grad
     
+    def retain_grad(self) -> Tensor:
+        """
+        Keep the gradient of this tensor after the backward pass.
+        
+        The gradients of INTERMEDIATE tensors are freed as soon as they have been propagated to their
+        parents, so only INPUT and PARAMETER tensors hold a gradient once the backward pass is completed.
+        Calling this method on an INTERMEDIATE tensor makes it keep its gradient as well.
+        
+        Returns:
+            The tensor itself.
+        """
+        self._retain_grad = True
+        if self._node is not None:
+            self._node._retain_grad = True
+        return self
+    
     def T(self) -> Tensor:
         """
         Returns the transpose of the tensor.
@@ -232,6 +667,10 @@ class Tensor:
         
         if self._grad_fn == transpose_backward:
             new_tensor = self._parents[0]
+            if new_tensor._owner is not None:
+                new_tensor = new_tensor._owner()
+        
+        if new_tensor is not None:
             self._cleanup_references()
         else:
             new_tensor = Tensor._create_node(
@@ -248,7 +687,8 @@ class Tensor:
         
         if isinstance(other, Tensor):
             if Tensor._can_broadcast(self._shape, other._shape):
-                result_data = self._data + other._data
+                shape = self._shape if self._shape == other._shape else Tensor._broadcast_shapes(self._shape, other._shape)
+                result_data = _ufunc(np.add, self._data, other._data, out=_empty(shape))
                 
                 if self._shape == other._shape:
                     grad_fn = add_backward
@@ -270,7 +710,7 @@ class Tensor:
                 raise ValueError(f"Cannot broadcast shapes {self._shape} and {other._shape}")
         else:
             new_tensor = Tensor._create_node(
-                data=self._data + other,
+                data=_ufunc(np.add, self._data, other, out=_empty(self._shape)),
                 grad_fn=add_scalar_backward,
                 parents=(self,),
                 extra={'scalar_value': float(other)}
@@ -287,7 +727,8 @@ class Tensor:
         
         if isinstance(other, Tensor):
             if Tensor._can_broadcast(self._shape, other._shape):
-                result_data = self._data - other._data
+                shape = self._shape if self._shape == other._shape else Tensor._broadcast_shapes(self._shape, other._shape)
+                result_data = _ufunc(np.subtract, self._data, other._data, out=_empty(shape))
 
                 if self._shape == other._shape:
                     grad_fn = sub_backward
@@ -309,7 +750,7 @@ class Tensor:
                 raise ValueError(f"Cannot broadcast shapes {self._shape} and {other._shape}")
         else:
             new_tensor = Tensor._create_node(
-                data=self._data - other,
+                data=_ufunc(np.subtract, self._data, other, out=_empty(self._shape)),
                 grad_fn=sub_scalar_backward,
                 parents=(self,),
                 extra={'scalar_value': float(other)}
@@ -323,7 +764,8 @@ class Tensor:
         
         if isinstance(other, Tensor):
             if Tensor._can_broadcast(self._shape, other._shape):
-                result_data = self._data * other._data
+                shape = self._shape if self._shape == other._shape else Tensor._broadcast_shapes(self._shape, other._shape)
+                result_data = _ufunc(np.multiply, self._data, other._data, out=_empty(shape))
                 
                 if self._shape == other._shape:
                     grad_fn = mul_backward
@@ -339,13 +781,14 @@ class Tensor:
                     data=result_data,
                     grad_fn=grad_fn,
                     parents=(self, other),
-                    extra=extra
+                    extra=extra,
+                    saved=(self._data, other._data)
                 )
             else:
                 raise ValueError(f"Cannot broadcast shapes {self._shape} and {other._shape}")
         else:
             new_tensor = Tensor._create_node(
-                data=self._data * other,
+                data=_ufunc(np.multiply, self._data, other, out=_empty(self._shape)),
                 grad_fn=mul_scalar_backward,
                 parents=(self,),
                 extra={'scalar_value': float(other)}
@@ -368,10 +811,13 @@ class Tensor:
         
         from .grad import matmul_backward
         
+        shape = np.broadcast_shapes(self._shape[:-2], other._shape[:-2]) + (self._shape[-2], other._shape[-1])
+        
         new_tensor = Tensor._create_node(
-            data=self._data @ other._data,
+            data=np.matmul(self._data, other._data, out=_empty(shape)),
             grad_fn=matmul_backward,
             parents=(self, other),
+            saved=(self._data, other._data)
         )
         return new_tensor
     
@@ -379,10 +825,11 @@ class Tensor:
         from .grad import power_backward
         
         new_tensor = Tensor._create_node(
-            data=self._data ** power,
+            data=_ufunc(np.power, self._data, power, out=_empty(self._shape)),
             grad_fn=power_backward,
             parents=(self,),
-            extra={'power': float(power)}
+            extra={'power': float(power)},
+            saved=(self._data,)
         )
         return new_tensor
     
@@ -390,7 +837,7 @@ class Tensor:
         from .grad import negate_backward
         
         new_tensor = Tensor._create_node(
-            data=-self._data,
+            data=_ufunc(np.negative, self._data, out=_empty(self._shape)),
             grad_fn=negate_backward,
             parents=(self,),
         )
@@ -423,17 +870,26 @@ class Tensor:
         )
         return new_tensor
     
-    def backward(self, gradient: Optional[np.ndarray | float] = None, keep_graph: bool = False):
+    def backward(self, gradient: Optional[np.ndarray | float] = None, keep_graph: bool = False, create_graph: bool = False):
         """
         backward pass to compute gradients. Once the backward pass is completed, the graph is freed from memory unless `keep_graph` is set to True.
         Only the current tensor and all INPUT/PARAMETER tensors will be retained in memory.
         
+        Each part of the graph is released as soon as the pass is done with it: the gradient of an INTERMEDIATE
+        tensor is freed once it has been propagated to its parents, unless `retain_grad` was called on it.
+        
         Args:
             gradient: Optional gradient to start the backward pass. If None, it assumes a scalar output and uses ones.
             keep_graph: If True, keeps the computational graph for further backward passes.
+                The topological order of the graph is cached on this tensor and reused by later calls.
+            create_graph: If True, the gradients are computed with differentiable tensor operations, so they
+                can be differentiated again. Leaves receive their gradient both as an array in `grad` and as
+                a tensor in `grad_tensor`. The graph is kept, as the gradients depend on it. Fused and
+                checkpointed operations are not supported.
             
         Raises:
-            RuntimeError: If the tensor does not require gradients or if the gradient is not compatible.
+            RuntimeError: If the tensor does not require gradients, if the gradient is not compatible
+                or if called inside `inference_mode`.
             
         Note:
             - Setting `keep_graph=True` inside a training loop can lead to memory leaks.
@@ -444,6 +900,9 @@ class Tensor:
             >>> y.backward()
         """
         
+        if _GradMode.inference:
+            raise RuntimeError("backward cannot be called inside inference_mode")
+        
         if not self._requires_grad:
             raise RuntimeError("Tensor does not require gradients")
         
@@ -451,59 +910,49 @@ class Tensor:
             raise RuntimeError("No backward graph exists for this tensor")
         
         if gradient is None:
-                if self._data.size != 1:
-                    raise RuntimeError("Gradient can only be implicitly created for scalar outputs")
-                gradient = np.ones_like(self._data, dtype=np.float32)
+            if self._data.size != 1:
+                raise RuntimeError("Gradient can only be implicitly created for scalar outputs")
+            gradient = np.ones_like(self._data, dtype=np.float32)
         else:
             gradient = np.array(gradient, dtype=np.float32)
             if gradient.shape != self._shape:
                 raise ValueError(f"Gradient shape {gradient.shape} does not match tensor shape {self._shape}")
             
-        if self._grad is None:
-            self._grad = gradient.copy()
-        else:
-            self._grad += gradient
+        recorder = _GradMode.recorder
+        if recorder is not None and recorder.owns(self) and not create_graph:
+            recorder.backward(self, gradient, keep_graph)
+            return
         
-        topo_order: List[Tensor] = []
-        visited: Set[int] = set()
-        
-        def build_topo(node: Tensor):
-            if node._id in visited or not node._requires_grad:
-                return
-            visited.add(node._id)
-            
-            for parent in node._parents:
-                build_topo(parent)
-                
-            topo_order.append(node)
-        
-        build_topo(self)
-        
-        for node in reversed(topo_order):
-            if node._grad_fn is not None and node._grad is not None:
-                try:
-                    gradients = node._grad_fn(node, node._grad)
-                    
-                    for parent, grad in zip(node._parents, gradients):
-                        if parent._requires_grad and grad is not None:
-                            grad = np.array(grad, dtype=np.float32)
-                            
-                            if grad.shape != parent._shape:
-                                raise ValueError(f"Gradient shape mismatch for tensor {parent._id}")
-                            
-                            if parent._grad is None:
-                                parent._grad = grad.copy()
-                            else:
-                                parent._grad += grad
-                                
-                except Exception as e:
-                    raise RuntimeError(f"Error in backward pass at tensor {node._id}: {str(e)}")
-               
-        if not keep_graph:    
-            for node in topo_order:
-                if node._tensor_type == TensorType.INTERMEDIATE:
-                    node._cleanup_references()
+        if self._topo_cache is not None:
+            topo_order = self._topo_cache
+        else:
+            topo_order = self._build_topo()
             
+        if keep_graph or create_graph:
+            self._topo_cache = topo_order
+        
+        if create_graph:
+            from .hessian import _run_create_graph
+            _run_create_graph(topo_order, gradient)
+            return
+        
+        # Gradients retained by intermediates from an earlier pass are set aside, so only
+        # the gradients of this pass are propagated, and added back once propagated
+        retained: Dict[int, np.ndarray] = {}
+        for node in topo_order:
+            if node._grad is not None and node._tensor_type == TensorType.INTERMEDIATE:
+                if node._retain_grad:
+                    retained[id(node)] = node._grad
+                node._grad = None
+        
+        self._accumulate_grad(gradient, owned=True)
+        
+        engine = _GradMode.engine
+        if engine is not None:
+            engine.run(topo_order, retained, keep_graph)
+        else:
+            _run_serial(topo_order, retained, keep_graph)
+
 class TensorUtils:
     @staticmethod
     def get_parameters(tensor: Tensor) -> List[Tensor]:
@@ -523,9 +972,9 @@ class TensorUtils:
         
         while stack:
             current = stack.pop()
-            if current._id in visited:
+            if id(current) in visited:
                 continue
-            visited.add(current._id)
+            visited.add(id(current))
             
             if current._tensor_type == TensorType.PARAMETER:
                 parameters.append(current)
@@ -554,9 +1003,9 @@ class TensorUtils:
         
         while stack:
             current = stack.pop()
-            if current._id in visited:
+            if id(current) in visited:
                 continue
-            visited.add(current._id)
+            visited.add(id(current))
             
             counts[current._tensor_type] += 1
             
@@ -0,0 +1,298 @@
+"""
+This module provides the vectorization of single-example functions over a batch axis.
+
+`vmap` lifts a function written for a single example onto a batch of examples stacked along an axis.
+The function is traced once on the first example, which records its operations, and the recorded
+operations are then replayed on the whole batch with batched kernels, keyed by backward function,
+which keep the batch axis in front and shift the axes of reductions, reshapes and transposes past it.
+
+`per_example_gradients` replays the backward pass the same way: the gradients of the replayed graph
+keep their batch axis, so the gradient of each PARAMETER tensor is obtained for every example of the
+batch from a single vectorized forward and backward pass, instead of one backward pass per example.
+
+As with `StaticGraph`, the operations performed by the function must not depend on the values of the
+example, since they are recorded once.
+
+Example:
+    
+    >>> def loss(x, y):
+    ...     return mse_loss(tanh(x @ w1) @ w2, y)
+    >>> losses, (grads_w1, grads_w2) = per_example_gradients(loss, [w1, w2])(x_batch, y_batch)
+    >>> grads_w1.shape == (len(x_batch),) + w1.shape
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import grad
+from .jacobian import _sweep
+from .tensor import Tensor, _GradMode
+
+def _axes(axis, ndim: int, offset: int):
+    """Shift the axis argument of a reduction on examples of `ndim` dimensions past `offset` batch axes."""
+    if axis is None:
+        return tuple(range(offset, offset + ndim))
+    if isinstance(axis, int):
+        return axis + offset if axis >= 0 else axis
+    return tuple(ax + offset if ax >= 0 else ax for ax in axis)
+
+def _reduce(reduction):
+    def kernel(arrays, node, extra, offset):
+        return reduction(arrays[0], axis=_axes(extra.get('axis'), len(extra['input_shape']), offset),
+                         keepdims=extra.get('keepdims', False))
+    return kernel
+
+def _softmax(arrays, node, extra, offset):
+    axis = _axes(extra.get('axis', -1), len(node._shape), offset)
+    out = np.exp(arrays[0] - np.max(arrays[0], axis=axis, keepdims=True))
+    return out / np.sum(out, axis=axis, keepdims=True)
+
+def _loss(fn):
+    def kernel(arrays, node, extra, offset):
+        difference = arrays[0] - arrays[1]
+        return np.mean(fn(difference), axis=tuple(range(offset, difference.ndim)))
+    return kernel
+
+def _transpose(arrays, node, extra, offset):
+    array = arrays[0]
+    return np.transpose(array, tuple(range(offset)) + tuple(range(array.ndim - 1, offset - 1, -1)))
+
+_FORWARD: Dict[Callable, Callable] = {
+    grad.transpose_backward: _transpose,
+    grad.add_backward: lambda arrays, node, extra, offset: np.add(arrays[0], arrays[1]),
+    grad.add_broadcast_backward: lambda arrays, node, extra, offset: np.add(arrays[0], arrays[1]),
+    grad.add_scalar_backward: lambda arrays, node, extra, offset: np.add(arrays[0], extra['scalar_value']),
+    grad.sub_backward: lambda arrays, node, extra, offset: np.subtract(arrays[0], arrays[1]),
+    grad.sub_broadcast_backward: lambda arrays, node, extra, offset: np.subtract(arrays[0], arrays[1]),
+    grad.sub_scalar_backward: lambda arrays, node, extra, offset: np.subtract(arrays[0], extra['scalar_value']),
+    grad.mul_backward: lambda arrays, node, extra, offset: np.multiply(arrays[0], arrays[1]),
+    grad.mul_broadcast_backward: lambda arrays, node, extra, offset: np.multiply(arrays[0], arrays[1]),
+    grad.mul_scalar_backward: lambda arrays, node, extra, offset: np.multiply(arrays[0], extra['scalar_value']),
+    grad.matmul_backward: lambda arrays, node, extra, offset: np.matmul(arrays[0], arrays[1]),
+    grad.power_backward: lambda arrays, node, extra, offset: np.power(arrays[0], extra['power']),
+    grad.negate_backward: lambda arrays, node, extra, offset: np.negative(arrays[0]),
+    grad.abs_backward: lambda arrays, node, extra, offset: np.abs(arrays[0]),
+    grad.reshape_backward: lambda arrays, node, extra, offset: arrays[0].reshape(arrays[0].shape[:offset] + node._shape),
+    grad.sum_backward: _reduce(np.sum),
+    grad.mean_backward: _reduce(np.mean),
+    grad.exp_backward: lambda arrays, node, extra, offset: np.exp(arrays[0]),
+    grad.log_backward: lambda arrays, node, extra, offset: np.log(arrays[0]),
+    grad.sqrt_backward: lambda arrays, node, extra, offset: np.sqrt(arrays[0]),
+    grad.sin_backward: lambda arrays, node, extra, offset: np.sin(arrays[0]),
+    grad.cos_backward: lambda arrays, node, extra, offset: np.cos(arrays[0]),
+    grad.tan_backward: lambda arrays, node, extra, offset: np.tan(arrays[0]),
+    grad.relu_backward: lambda arrays, node, extra, offset: np.maximum(0, arrays[0]),
+    grad.sigmoid_backward: lambda arrays, node, extra, offset: 1 / (1 + np.exp(-arrays[0])),
+    grad.tanh_backward: lambda arrays, node, extra, offset: np.tanh(arrays[0]),
+    grad.softmax_backward: _softmax,
+    grad.mse_backward: _loss(np.square),
+    grad.mae_backward: _loss(np.abs),
+}
+"""
+Batched forward kernels of the operations, keyed by their backward function.
+
+Each kernel takes the input arrays, the node recorded for a single example, the extra metadata of the
+operation and the number of leading batch axes of the inputs (zero or one), and returns the output array.
+Batched inputs of element-wise operations are aligned on the trailing axes of the example beforehand.
+"""
+
+class _Trace:
+    """
+    Recorder of the operations performed on a single example.
+    
+    For each operation, the arrays it saves for backward are matched with its inputs and its output,
+    so that the same arrays can be saved from the batched values when the operation is replayed.
+    """
+    
+    def __init__(self):
+        self.ops: List[tuple] = []
+        self._previous: List[tuple] = []
+    
+    def __enter__(self) -> _Trace:
+        # The graph is built even inside `no_grad`, and saved arrays are kept unpacked, as they are matched by identity
+        self._previous.append((_GradMode.enabled, _GradMode.recorder, _GradMode.saved_hooks))
+        _GradMode.enabled, _GradMode.recorder, _GradMode.saved_hooks = True, self, None
+        return self
+    
+    def __exit__(self, *exc):
+        _GradMode.enabled, _GradMode.recorder, _GradMode.saved_hooks = self._previous.pop()
+        return False
+    
+    def owns(self, tensor: Tensor) -> bool:
+        return False
+    
+    def record(self, node: Tensor, grad_fn: Optional[Callable], parents: tuple, extra: Optional[dict]):
+        """Record the operation that created `node`."""
+        if grad_fn not in _FORWARD:
+            raise ValueError(f"Operation {getattr(grad_fn, '__name__', grad_fn)} is not supported by vmap")
+        
+        sources = []
+        for array in node._saved:
+            if array is node._data:
+                sources.append(-1)
+                continue
+            
+            source = next((index for index, parent in enumerate(parents) if parent._data is array), None)
+            if source is None:
+                raise ValueError(f"Operation {grad_fn.__name__} saves an array that vmap cannot replay")
+            sources.append(source)
+        
+        self.ops.append((node, grad_fn, parents, extra or {}, tuple(sources)))
+
+def _align(array: np.ndarray, batched: bool, ndim: int, target: int) -> np.ndarray:
+    """Insert axes after the batch axis of a batched example of `ndim` dimensions, up to `target` dimensions."""
+    if not batched or ndim >= target:
+        return array
+    return array.reshape(array.shape[:1] + (1,) * (target - ndim) + array.shape[1:])
+
+def _replay(ops: List[tuple], values: Dict[int, Tuple[np.ndarray, bool]]):
+    """
+    Run the recorded operations on the batched values of their inputs.
+    
+    Args:
+        ops: The operations recorded by a `_Trace`.
+        values: The value of each leaf, keyed by the identity of its tensor, with whether it has a batch axis.
+            The values of the recorded nodes are added to it. The saved arrays of the nodes are replaced with
+            the corresponding batched arrays.
+    """
+    for node, grad_fn, parents, extra, sources in ops:
+        arrays, flags = [], []
+        for parent in parents:
+            entry = values.get(id(parent))
+            if entry is None:
+                entry = values[id(parent)] = (parent._data, False)
+            arrays.append(entry[0])
+            flags.append(entry[1])
+        
+        batched = any(flags)
+        if batched and len(parents) > 1:
+            target = max(len(parent._shape) for parent in parents)
+            arrays = [_align(array, flag, len(parent._shape), target) for array, flag, parent in zip(arrays, flags, parents)]
+        
+        out = np.asarray(_FORWARD[grad_fn](arrays, node, extra, 1 if batched else 0), dtype=np.float32)
+        values[id(node)] = (out, batched)
+        
+        node._saved = tuple(out if source < 0 else arrays[source] for source in sources)
+        node._unpack = None
+
+def _trace_and_replay(f: Callable, args: Sequence[object], in_axes: Union[int, None, Sequence[Optional[int]]]) -> Tuple[object, int, Dict[int, Tuple[np.ndarray, bool]]]:
+    """
+    Trace `f` on the first example of the batched arguments, and replay it on the whole batch.
+    
+    Returns:
+        A tuple `(outputs, size, values)`: the outputs of the trace, the batch size and the batched values.
+    """
+    if in_axes is None or isinstance(in_axes, int):
+        in_axes = [in_axes] * len(args)
+    if len(in_axes) != len(args):
+        raise ValueError(f"Got {len(args)} arguments but {len(in_axes)} in_axes")
+    
+    size = None
+    examples, values = [], {}
+    for arg, axis in zip(args, in_axes):
+        if axis is None:
+            examples.append(arg if isinstance(arg, Tensor) else Tensor(arg))
+            continue
+        
+        array = np.moveaxis(np.asarray(arg._data if isinstance(arg, Tensor) else arg, dtype=np.float32), axis, 0)
+        if size is not None and array.shape[0] != size:
+            raise ValueError(f"Batched arguments have different sizes: {size} and {array.shape[0]}")
+        size = array.shape[0]
+        
+        example = Tensor(array[0])
+        values[id(example)] = (np.ascontiguousarray(array), True)
+        examples.append(example)
+    
+    if size is None:
+        raise ValueError("At least one argument must be batched")
+    
+    trace = _Trace()
+    with trace:
+        outputs = f(*examples)
+    
+    _replay(trace.ops, values)
+    return outputs, size, values
+
+def _batched_value(tensor: Tensor, size: int, values: Dict[int, Tuple[np.ndarray, bool]]) -> np.ndarray:
+    array, batched = values.get(id(tensor), (tensor._data, False))
+    if batched:
+        return array
+    return np.ascontiguousarray(np.broadcast_to(array, (size,) + tensor._shape))
+
+def vmap(f: Callable[..., Union[Tensor, Sequence[Tensor]]],
+         in_axes: Union[int, None, Sequence[Optional[int]]] = 0) -> Callable[..., Union[Tensor, Tuple[Tensor, ...]]]:
+    """
+    Vectorize a function written for a single example over a batch axis of its arguments.
+    
+    Args:
+        f: The function to vectorize. It takes tensors for a single example and returns a tensor or a
+            sequence of tensors. Tensors it captures from an enclosing scope are shared by all the examples.
+        in_axes: The batch axis of each argument, or None for arguments shared by all the examples.
+            A single value applies to every argument.
+    
+    Returns:
+        A function taking the batched arguments, as tensors or arrays, and returning the outputs of `f` for
+        every example, stacked along a leading batch axis, as INPUT tensors without a graph.
+    
+    Raises:
+        ValueError: When called, if no argument is batched, if the batch sizes differ, or if `f` performs an
+            operation that is not supported by vmap, such as a fused or checkpointed one.
+    """
+    
+    def batched(*args) -> Union[Tensor, Tuple[Tensor, ...]]:
+        outputs, size, values = _trace_and_replay(f, args, in_axes)
+        
+        if isinstance(outputs, Tensor):
+            return Tensor(_batched_value(outputs, size, values))
+        return tuple(Tensor(_batched_value(output, size, values)) for output in outputs)
+    
+    return batched
+
+def per_example_gradients(f: Callable[..., Tensor],
+                          parameters: Sequence[Tensor],
+                          in_axes: Union[int, None, Sequence[Optional[int]]] = 0) -> Callable[..., Tuple[Tensor, Tuple[np.ndarray, ...]]]:
+    """
+    Transform a single-example loss into a function computing the gradients of `parameters` for every example
+    of a batch, with one vectorized forward pass and one vectorized backward pass.
+    
+    Args:
+        f: The loss of a single example. It takes tensors for a single example and returns a tensor with a
+            single element.
+        parameters: The PARAMETER tensors to compute the gradients of, captured by `f` or passed to it with
+            an `in_axes` of None.
+        in_axes: The batch axis of each argument, or None for arguments shared by all the examples.
+    
+    Returns:
+        A function taking the batched arguments and returning a tuple `(losses, gradients)`: the loss of
+        every example, as an INPUT tensor of shape `(batch,) + loss.shape`, and for each parameter an array
+        of shape `(batch,) + parameter.shape` with its gradient for every example. The `grad` of the
+        parameters is left unchanged.
+    
+    Raises:
+        ValueError: When called, for the same reasons as `vmap`, or if `f` does not return a single element.
+        RuntimeError: If a backward function fails.
+    """
+    
+    def batched(*args) -> Tuple[Tensor, Tuple[np.ndarray, ...]]:
+        output, size, values = _trace_and_replay(f, args, in_axes)
+        
+        if not isinstance(output, Tensor) or output._data.size != 1:
+            raise ValueError("per_example_gradients requires a function returning a single element")
+        
+        losses = Tensor(_batched_value(output, size, values))
+        gradients = [np.zeros((size,) + parameter._shape, dtype=np.float32) for parameter in parameters]
+        
+        if output._requires_grad:
+            leaves = _sweep(output._build_topo(), np.ones((size,) + output._shape, dtype=np.float32))
+            
+            for index, parameter in enumerate(parameters):
+                batch = leaves.get(id(parameter))
+                if batch is not None:
+                    gradients[index] = np.ascontiguousarray(batch, dtype=np.float32)
+        
+        return losses, tuple(gradients)
+    
+    return batched
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu, sigmoid, softmax, tanh
+from src.clumsygrad.loss import mae_loss, mse_loss
+from src.clumsygrad.math import abs, cos, exp, log, mean, sin, sqrt, sum
+from src.clumsygrad.tensor import Tensor, TensorType
+
+class Model:
+    """
+    A small model mixing most operations, shared by the tests of static graphs and of the modules built on them.
+    
+    It maps inputs of 4 features to targets of 2 features, through a first layer of 6 units,
+    `hidden_layers` further layers of 6 units, and an output layer.
+    With `all_operations`, the loss also goes through the trigonometric, square root, absolute value
+    and power operations.
+    """
+    
+    def __init__(self, hidden_layers: int = 0, all_operations: bool = False):
+        self.hidden_layers = hidden_layers
+        self.all_operations = all_operations
+    
+    def make_parameters(self, rng):
+        return ([Tensor(rng.standard_normal((4, 6)), tensor_type=TensorType.PARAMETER),
+                 Tensor(rng.standard_normal((6,)), tensor_type=TensorType.PARAMETER)] +
+                [Tensor(rng.standard_normal((6, 6)), tensor_type=TensorType.PARAMETER) for _ in range(self.hidden_layers)] +
+                [Tensor(rng.standard_normal((6, 2)), tensor_type=TensorType.PARAMETER)])
+    
+    def __call__(self, x, y, params):
+        w1, b1, *hidden_weights, w2 = params
+        hidden = tanh(relu((x * 0.5) @ w1 + b1)) + sigmoid(x @ w1)
+        if self.all_operations:
+            hidden = hidden - sin(x @ w1) * cos(x @ w1)
+        for w in hidden_weights:
+            hidden = relu(hidden @ w) - hidden * 0.1
+        
+        out = softmax(hidden @ w2, axis=-1)
+        loss = mse_loss(out, y) + mae_loss(out.T().T(), y) + mean(log(exp(hidden) + 1), axis=0).reshape((1, 6)) @ sum(w2, axis=1, keepdims=True)
+        if self.all_operations:
+            loss = loss + sum(sqrt(abs(-w2) + 1) ** 2.0) - 1.0
+        return loss
+
+@pytest.fixture
+def model_options():
+    """Options of the shared model. Test modules override this fixture to cover more operations."""
+    return {}
+
+@pytest.fixture
+def model(model_options):
+    return Model(**model_options)
@@ -0,0 +1,159 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import softmax, tanh
+from src.clumsygrad.batching import AutoBatcher
+from src.clumsygrad.fusion import fuse
+from src.clumsygrad.loss import mse_loss
+from src.clumsygrad.math import mean, sum
+from src.clumsygrad.tensor import Tensor, TensorType, inference_mode
+
+def regression(w, b, x, y):
+    return mse_loss(tanh(x @ w + b), y)
+
+def classification(w, x):
+    return mean(softmax(x @ w) * x.T())
+
+def make_models(count, rng, features=3):
+    return [(Tensor(rng.standard_normal((features, 1)), tensor_type=TensorType.PARAMETER),
+             Tensor(rng.standard_normal((1, 1)), tensor_type=TensorType.PARAMETER),
+             Tensor(rng.standard_normal((5, features))),
+             Tensor(rng.standard_normal((5, 1))))
+            for _ in range(count)]
+
+def sequential(f, calls):
+    """Run each call with its own graph and backward pass, returning the losses and the gradients of the arguments."""
+    losses, grads = [], []
+    for args in calls:
+        copies = [Tensor(arg.data, tensor_type=arg._tensor_type) for arg in args]
+        loss = f(*copies)
+        loss.backward()
+        losses.append(loss.data)
+        grads.append([copy.grad for copy in copies])
+    return losses, grads
+
+class TestAutoBatcher:
+    """Test batched calls against one graph and one backward pass per call."""
+    
+    def test_matches_sequential(self):
+        rng = np.random.default_rng(0)
+        models = make_models(20, rng)
+        expected_losses, expected_grads = sequential(regression, models)
+        
+        batcher = AutoBatcher()
+        for model in models:
+            batcher.add(regression, *model)
+        losses = batcher.run()
+        
+        assert len(batcher) == 0
+        for loss, expected in zip(losses, expected_losses):
+            assert loss._tensor_type == TensorType.INPUT
+            np.testing.assert_allclose(loss.data, expected, rtol=1e-5)
+        for model, grads in zip(models, expected_grads):
+            for arg, expected in zip(model, grads):
+                if arg._tensor_type == TensorType.PARAMETER:
+                    np.testing.assert_allclose(arg.grad, expected, rtol=1e-4, atol=1e-6)
+                else:
+                    assert arg.grad is None
+    
+    def test_groups_by_function_and_shape(self):
+        rng = np.random.default_rng(1)
+        models = make_models(4, rng) + make_models(3, rng, features=6)
+        classifiers = [(Tensor(rng.standard_normal((4, 4)), tensor_type=TensorType.PARAMETER), Tensor(rng.standard_normal((4, 4))))
+                       for _ in range(3)]
+        
+        batcher = AutoBatcher()
+        positions = []
+        for model, classifier in zip(models, classifiers + classifiers + [classifiers[0]]):
+            positions.append(batcher.add(regression, *model))
+            positions.append(batcher.add(classification, *classifier))
+        losses = batcher.run()
+        
+        assert positions == list(range(14))
+        for index, model in enumerate(models):
+            expected, _ = sequential(regression, [model])
+            np.testing.assert_allclose(losses[2 * index].data, expected[0], rtol=1e-5)
+        
+        # The first classifier is added three times, so its gradient accumulates three contributions
+        _, (expected,) = sequential(classification, [classifiers[0]])
+        np.testing.assert_allclose(classifiers[0][0].grad, 3 * expected[0], rtol=1e-4, atol=1e-6)
+    
+    def test_shared_arguments_and_captured_parameters(self):
+        rng = np.random.default_rng(2)
+        shared = Tensor(rng.standard_normal((3, 1)), tensor_type=TensorType.PARAMETER)
+        scale = Tensor([[1.5]], tensor_type=TensorType.PARAMETER)
+        f = lambda w, x, y: mse_loss((x @ w) * scale, y)
+        calls = [(shared, rng.standard_normal((5, 3)), rng.standard_normal((5, 1))) for _ in range(6)]
+        
+        batcher = AutoBatcher()
+        for w, x, y in calls:
+            batcher.add(f, w, x, y)
+        batcher.run()
+        
+        expected_w, expected_scale = np.zeros((3, 1)), np.zeros((1, 1))
+        for w, x, y in calls:
+            w_copy = Tensor(w.data, tensor_type=TensorType.PARAMETER)
+            scale_copy = Tensor(scale.data, tensor_type=TensorType.PARAMETER)
+            mse_loss((Tensor(x) @ w_copy) * scale_copy, Tensor(y)).backward()
+            expected_w += w_copy.grad
+            expected_scale += scale_copy.grad
+        
+        np.testing.assert_allclose(shared.grad, expected_w, rtol=1e-4)
+        np.testing.assert_allclose(scale.grad, expected_scale, rtol=1e-4)
+    
+    def test_single_call(self):
+        rng = np.random.default_rng(3)
+        model = make_models(1, rng)[0]
+        _, (expected,) = sequential(regression, [model])
+        
+        batcher = AutoBatcher()
+        batcher.add(regression, *model)
+        batcher.run()
+        
+        np.testing.assert_allclose(model[0].grad, expected[0], rtol=1e-5)
+        np.testing.assert_allclose(model[1].grad, expected[1], rtol=1e-5)
+    
+    def test_forward_only(self):
+        rng = np.random.default_rng(4)
+        models = make_models(3, rng)
+        
+        batcher = AutoBatcher()
+        for w, b, x, _ in models:
+            batcher.add(lambda w, b, x: tanh(x @ w + b), w, b, x)
+        outputs = batcher.run(backward=False)
+        
+        for output, (w, b, x, _) in zip(outputs, models):
+            np.testing.assert_allclose(output.data, np.tanh(x.data @ w.data + b.data), rtol=1e-5)
+            assert w.grad is None
+    
+    def test_non_scalar_output_requires_no_backward(self):
+        batcher = AutoBatcher()
+        batcher.add(lambda w: w * 2.0, Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER))
+        
+        with pytest.raises(ValueError, match="scalar"):
+            batcher.run()
+    
+    def test_intermediate_argument(self):
+        w = Tensor([1.0], tensor_type=TensorType.PARAMETER)
+        
+        with pytest.raises(ValueError, match="INTERMEDIATE"):
+            AutoBatcher().add(lambda x: sum(x), w * 2.0)
+    
+    def test_unsupported_operation(self):
+        batcher = AutoBatcher()
+        batcher.add(fuse(lambda a: tanh(a) * a), Tensor([1.0, 2.0]))
+        
+        with pytest.raises(ValueError, match="not supported"):
+            batcher.run(backward=False)
+    
+    def test_inference_mode(self):
+        batcher = AutoBatcher()
+        batcher.add(lambda x: sum(x), Tensor([1.0], tensor_type=TensorType.PARAMETER))
+        
+        with inference_mode(), pytest.raises(RuntimeError):
+            batcher.run()
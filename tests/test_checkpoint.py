@@ -0,0 +1,97 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu, tanh
+from src.clumsygrad.checkpoint import checkpoint, checkpoint_sequential
+from src.clumsygrad.grad import checkpoint_backward
+from src.clumsygrad.math import mean, sum
+from src.clumsygrad.tensor import Tensor, TensorType, no_grad
+
+def make_layers(rng, depth, width):
+    weights = [Tensor(rng.standard_normal((width, width)) * 0.5, tensor_type=TensorType.PARAMETER)
+               for _ in range(depth)]
+    layers = [lambda x, w=w: tanh(x @ w) + x * 0.5 for w in weights]
+    return weights, layers
+
+class TestCheckpoint:
+    """Test recomputing checkpointed segments during the backward pass."""
+    
+    def test_matches_regular_backward(self):
+        rng = np.random.default_rng(0)
+        x = Tensor(rng.standard_normal((3, 4)), tensor_type=TensorType.PARAMETER)
+        w = Tensor(rng.standard_normal((4, 4)), tensor_type=TensorType.PARAMETER)
+        segment = lambda x: relu(x @ w) * x - x
+        
+        mean(segment(x) ** 2).backward()
+        expected_x, expected_w = x.grad, w.grad
+        x.grad = w.grad = None
+        
+        out = checkpoint(segment, x)
+        assert out._grad_fn is checkpoint_backward
+        assert out._parents == (x,)
+        
+        mean(out ** 2).backward()
+        np.testing.assert_allclose(x.grad, expected_x, rtol=1e-6)
+        np.testing.assert_allclose(w.grad, expected_w, rtol=1e-6)
+    
+    def test_segment_is_recomputed(self):
+        calls = []
+        
+        def segment(x, y):
+            calls.append(x.requires_grad)
+            return x * y
+        
+        x = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        y = Tensor([3.0, 4.0])
+        sum(checkpoint(segment, x, y)).backward()
+        
+        assert calls == [True, True]
+        np.testing.assert_allclose(x.grad, [3.0, 4.0])
+        assert y.grad is None
+    
+    def test_input_without_gradient(self):
+        w = Tensor([2.0, 3.0], tensor_type=TensorType.PARAMETER)
+        out = checkpoint(lambda x: x * w, Tensor([1.0, 5.0]))
+        
+        assert out.requires_grad
+        sum(out).backward()
+        np.testing.assert_allclose(w.grad, [1.0, 5.0])
+    
+    def test_inside_no_grad(self):
+        w = Tensor([2.0], tensor_type=TensorType.PARAMETER)
+        
+        with no_grad():
+            out = checkpoint(lambda x: x * w, w)
+        
+        assert out._tensor_type == TensorType.INPUT
+        assert not out.requires_grad
+    
+    @pytest.mark.parametrize("segments", [None, 1, 2, 3, 7])
+    def test_sequential_matches_regular_backward(self, segments):
+        rng = np.random.default_rng(1)
+        weights, layers = make_layers(rng, 7, 5)
+        x = Tensor(rng.standard_normal((2, 5)))
+        
+        out = x
+        for layer in layers:
+            out = layer(out)
+        mean(out).backward()
+        expected = [w.grad for w in weights]
+        for w in weights:
+            w.grad = None
+        
+        result = checkpoint_sequential(layers, x, segments)
+        np.testing.assert_allclose(result.data, out.data, rtol=1e-6)
+        
+        mean(result).backward()
+        for w, grad in zip(weights, expected):
+            np.testing.assert_allclose(w.grad, grad, rtol=1e-5, atol=1e-7)
+    
+    def test_sequential_invalid_segments(self):
+        with pytest.raises(ValueError):
+            checkpoint_sequential([relu], Tensor([1.0]), 0)
@@ -0,0 +1,143 @@
+import inspect
+import os
+import sys
+import traceback
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu, tanh
+from src.clumsygrad.codegen import generate
+from src.clumsygrad.graph import StaticGraph
+from src.clumsygrad.math import sum
+from src.clumsygrad.tensor import Tensor, TensorType
+
+@pytest.fixture
+def model_options():
+    return {'all_operations': True}
+
+class TestGenerate:
+    """Test generated functions against static graphs and eager execution."""
+    
+    def test_matches_eager(self, model):
+        rng = np.random.default_rng(0)
+        params = model.make_parameters(rng)
+        
+        graph = StaticGraph()
+        x, y = graph.placeholder((8, 4)), graph.placeholder((8, 2))
+        with graph:
+            loss = model(x, y, params)
+        step = generate(graph, loss, [x, y])
+        
+        for _ in range(3):
+            x_data, y_data = rng.standard_normal((8, 4)), rng.standard_normal((8, 2))
+            
+            value = step(x_data, y_data).copy()
+            generated_grads = [param.grad for param in params]
+            for param in params:
+                param.grad = None
+            
+            expected = model(Tensor(x_data), Tensor(y_data), params)
+            expected.backward()
+            
+            np.testing.assert_allclose(value, expected.data, rtol=1e-6)
+            for generated_grad, param in zip(generated_grads, params):
+                np.testing.assert_allclose(generated_grad, param.grad, rtol=1e-5, atol=1e-6)
+                param.grad = None
+            
+            # Parameters are updated in place between steps, as the optimizers do
+            for param in params:
+                param._data -= 0.01
+    
+    def test_matches_static_graph(self, model):
+        rng = np.random.default_rng(1)
+        params = model.make_parameters(rng)
+        
+        graph = StaticGraph()
+        x, y = graph.placeholder((8, 4)), graph.placeholder((8, 2))
+        with graph:
+            loss = model(x, y, params)
+        step = generate(graph, loss, [x, y])
+        x_data, y_data = rng.standard_normal((8, 4)), rng.standard_normal((8, 2))
+        
+        generated = step(x_data, y_data).copy()
+        generated_grads = [param.grad.copy() for param in params]
+        for param in params:
+            param.grad = None
+        
+        np.testing.assert_allclose(graph.run({x: x_data, y: y_data}, loss), generated, rtol=1e-6)
+        for generated_grad, param in zip(generated_grads, params):
+            np.testing.assert_allclose(generated_grad, param.grad, rtol=1e-6, atol=1e-7)
+    
+    def test_source_is_inspectable(self):
+        w = Tensor([[1.0], [2.0]], tensor_type=TensorType.PARAMETER)
+        
+        graph = StaticGraph()
+        x = graph.placeholder((3, 2))
+        with graph:
+            loss = sum(relu(x @ w))
+        step = generate(graph, loss, [x], name='train_step')
+        
+        assert step.fn.__name__ == 'train_step'
+        assert "np.matmul(" in step.source and "out=" in step.source
+        assert "matmul_backward(" in step.source and "relu_backward(" in step.source
+        assert inspect.getsource(step.fn) == step.source
+    
+    def test_tracebacks_show_generated_lines(self):
+        w = Tensor([[1.0], [2.0]], tensor_type=TensorType.PARAMETER)
+        
+        graph = StaticGraph()
+        x = graph.placeholder((3, 2))
+        with graph:
+            loss = sum(x @ w)
+        step = generate(graph, loss, [x])
+        
+        with pytest.raises(ValueError) as info:
+            step(np.ones((4, 2)))
+        
+        assert "np.copyto(" in ''.join(traceback.format_tb(info.tb))
+    
+    def test_shared_gradients_are_accumulated(self):
+        w = Tensor([[1.0], [2.0]], tensor_type=TensorType.PARAMETER)
+        
+        graph = StaticGraph()
+        x = graph.placeholder((3, 2))
+        with graph:
+            hidden = x @ w
+            loss = sum(hidden * hidden + x @ w)
+        step = generate(graph, loss, [x])
+        
+        step(np.ones((3, 2)))
+        
+        assert "np.add(d" in step.source
+        np.testing.assert_allclose(w.grad, [[21.0], [21.0]])
+    
+    def test_forward_only(self):
+        w = Tensor([[1.0], [2.0]], tensor_type=TensorType.PARAMETER)
+        
+        graph = StaticGraph()
+        x = graph.placeholder((3, 2))
+        with graph:
+            out = tanh(x @ w)
+        predict = generate(graph, out, [x], backward=False)
+        
+        np.testing.assert_allclose(predict(np.ones((3, 2))), np.tanh(np.full((3, 1), 3.0)), rtol=1e-6)
+        assert "backward" not in predict.source
+        assert w.grad is None
+    
+    def test_invalid_arguments(self):
+        w = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        
+        graph = StaticGraph()
+        x = graph.placeholder((2,))
+        with graph:
+            out = x * w
+        
+        with pytest.raises(ValueError):
+            generate(graph, out, [Tensor([1.0, 2.0])])
+        with pytest.raises(ValueError):
+            generate(graph, w * 2.0, [x])
+        with pytest.raises(RuntimeError):
+            generate(graph, out, [x])
@@ -0,0 +1,138 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import src.clumsygrad as clumsygrad
+from src.clumsygrad.activation import tanh
+from src.clumsygrad.compiler import compile
+from src.clumsygrad.fusion import fuse
+from src.clumsygrad.math import sum
+from src.clumsygrad.tensor import Tensor, TensorType, inference_mode, no_grad
+
+class TestCompile:
+    """Test compiled functions against eager execution."""
+    
+    def test_matches_eager(self, model):
+        rng = np.random.default_rng(0)
+        params = model.make_parameters(rng)
+        step = compile(lambda x, y: model(x, y, params))
+        
+        for _ in range(3):
+            x, y = rng.standard_normal((8, 4)), rng.standard_normal((8, 2))
+            
+            loss = step(x, y)
+            compiled_grads = [param.grad for param in params]
+            for param in params:
+                param.grad = None
+            
+            expected = model(Tensor(x), Tensor(y), params)
+            expected.backward()
+            
+            assert loss._tensor_type == TensorType.INPUT
+            np.testing.assert_allclose(loss.data, expected.data, rtol=1e-6)
+            for compiled_grad, param in zip(compiled_grads, params):
+                np.testing.assert_allclose(compiled_grad, param.grad, rtol=1e-5, atol=1e-6)
+                param.grad = None
+        
+        assert step.traces == 1
+    
+    def test_parameter_updates_are_seen(self):
+        w = Tensor([[1.0], [2.0]], tensor_type=TensorType.PARAMETER)
+        step = compile(lambda x: sum(x @ w))
+        x = np.ones((3, 2))
+        
+        assert step(x).data == pytest.approx(9.0)
+        w._data -= 1.0
+        assert step(x).data == pytest.approx(3.0)
+        np.testing.assert_array_equal(w.grad, [[6.0], [6.0]])
+    
+    def test_retraces_on_new_shapes(self):
+        w = Tensor(np.ones((3, 1)), tensor_type=TensorType.PARAMETER)
+        step = compile(lambda x: sum(x @ w))
+        
+        step(np.ones((2, 3)))
+        step(np.ones((5, 3)))
+        step(Tensor(np.ones((2, 3))))
+        
+        assert step.traces == 2
+        assert step.variants == 2
+        np.testing.assert_array_equal(w.grad, [[9.0], [9.0], [9.0]])
+    
+    def test_guards_on_parameters_and_constants(self, model):
+        rng = np.random.default_rng(1)
+        first, second = model.make_parameters(rng), model.make_parameters(rng)
+        step = compile(lambda x, y, w1, b1, w2, scale: model(x, y, (w1, b1, w2)) * scale)
+        x, y = rng.standard_normal((8, 4)), rng.standard_normal((8, 2))
+        
+        step(x, y, *first, 1.0)
+        step(x, y, *second, 1.0)
+        value = step(x, y, *first, 2.0)
+        
+        assert step.traces == 3
+        np.testing.assert_allclose(value.data, 2 * model(Tensor(x), Tensor(y), first).data, rtol=1e-6)
+        assert all(param.grad is not None for param in first + second)
+    
+    def test_bounded_cache(self):
+        w = Tensor(np.ones((2, 1)), tensor_type=TensorType.PARAMETER)
+        step = compile(lambda x: sum(x @ w), max_variants=2)
+        
+        for rows in (1, 2, 3, 1):
+            step(np.ones((rows, 2)))
+        
+        assert step.variants == 2
+        assert step.traces == 4
+        
+        step(np.ones((3, 2)))
+        assert step.traces == 4
+        
+        step.clear()
+        assert step.variants == 0
+    
+    def test_forward_only(self):
+        w = Tensor(np.ones((2, 2)), tensor_type=TensorType.PARAMETER)
+        predict = compile(backward=False)(lambda x: tanh(x @ w))
+        
+        out = predict(np.ones((3, 2)))
+        
+        np.testing.assert_allclose(out.data, np.tanh(np.full((3, 2), 2.0)), rtol=1e-6)
+        assert w.grad is None
+    
+    def test_no_backward_inside_no_grad(self):
+        w = Tensor(np.ones((2, 1)), tensor_type=TensorType.PARAMETER)
+        step = compile(lambda x: sum(x @ w))
+        
+        with no_grad():
+            step(np.ones((3, 2)))
+        with inference_mode():
+            step(np.ones((3, 2)))
+        assert w.grad is None
+        
+        step(np.ones((3, 2)))
+        np.testing.assert_array_equal(w.grad, [[3.0], [3.0]])
+    
+    def test_outputs_are_not_overwritten(self):
+        w = Tensor(np.ones((2, 1)), tensor_type=TensorType.PARAMETER)
+        step = compile(lambda x: sum(x @ w))
+        
+        first = step(np.ones((3, 2)))
+        step(np.zeros((3, 2)))
+        
+        assert first.data == pytest.approx(6.0)
+    
+    def test_invalid_arguments(self):
+        w = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        
+        with pytest.raises(ValueError, match="INTERMEDIATE"):
+            compile(lambda x: sum(x))(w * 2.0)
+        with pytest.raises(ValueError, match="not supported"):
+            compile(fuse(lambda a: tanh(a) * a))(np.ones(2))
+        with pytest.raises(ValueError):
+            compile(lambda x: sum(x), max_variants=0)
+    
+    def test_package_attribute_does_not_shadow_builtin(self):
+        assert clumsygrad.compile is compile
+        assert "compile" not in clumsygrad.__all__
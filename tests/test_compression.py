@@ -0,0 +1,123 @@
+import contextlib
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu, sigmoid, tanh
+from src.clumsygrad.compression import Compression
+from src.clumsygrad.loss import mse_loss
+from src.clumsygrad.math import mean
+from src.clumsygrad.tensor import Tensor, TensorType
+
+def gradients(model, compression=None, depth=6, width=32):
+    rng = np.random.default_rng(0)
+    params = [Tensor(rng.standard_normal((width, width)) / np.sqrt(width), tensor_type=TensorType.PARAMETER)
+              for _ in range(depth)]
+    x = Tensor(rng.standard_normal((64, width)))
+    y = Tensor(rng.standard_normal((64, width)))
+    
+    if compression is None:
+        loss = mse_loss(model(x, params), y)
+    else:
+        with compression:
+            loss = mse_loss(model(x, params), y)
+    
+    loss.backward()
+    return [param.grad for param in params]
+
+def relu_mlp(x, params):
+    for w in params:
+        x = relu(x @ w)
+    return x
+
+def scaled_relu_mlp(x, params):
+    for w in params:
+        x = relu(x @ w) * 2.0
+    return x
+
+def smooth_mlp(x, params):
+    for index, w in enumerate(params):
+        x = tanh(x @ w) if index % 2 else sigmoid(x @ w)
+    return x
+
+def relative_error(actual, expected):
+    return np.linalg.norm(actual - expected) / np.linalg.norm(expected)
+
+class TestCompression:
+    """Test storing saved arrays in compressed form."""
+    
+    def test_relu_masks_are_exact(self):
+        compression = Compression()
+        expected = gradients(scaled_relu_mlp)
+        actual = gradients(scaled_relu_mlp, compression)
+        
+        for grad, expected_grad in zip(actual, expected):
+            np.testing.assert_array_equal(grad, expected_grad)
+        assert compression.saved_bytes > 0
+        assert compression.stored_bytes * 32 == compression.saved_bytes
+    
+    def test_masks_of_arrays_saved_at_full_precision_are_dropped(self):
+        compression = Compression()
+        expected = gradients(relu_mlp)
+        actual = gradients(relu_mlp, compression)
+        
+        for grad, expected_grad in zip(actual, expected):
+            np.testing.assert_array_equal(grad, expected_grad)
+        assert compression.saved_bytes == compression.stored_bytes == 0
+    
+    @pytest.mark.parametrize("model, options, ratio", [(relu_mlp, {}, 0.9), (relu_mlp, {'half_matmul': True}, 0.5),
+                                                       (scaled_relu_mlp, {}, 0.5), (smooth_mlp, {}, 0.95)])
+    def test_memory_held_by_the_graph(self, model, options, ratio):
+        rng = np.random.default_rng(0)
+        params = [Tensor(rng.standard_normal((256, 256)) / 16, tensor_type=TensorType.PARAMETER) for _ in range(6)]
+        x = Tensor(rng.standard_normal((256, 256)))
+        
+        def held(compression):
+            tracemalloc.start()
+            try:
+                with compression:
+                    loss = mean(model(x, params))
+                return tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+                loss.backward()
+        
+        assert held(Compression(**options)) <= ratio * held(contextlib.nullcontext()) + 4096
+    
+    def test_half_activations_error_is_bounded(self):
+        compression = Compression()
+        expected = gradients(smooth_mlp)
+        actual = gradients(smooth_mlp, compression)
+        
+        for grad, expected_grad in zip(actual, expected):
+            assert relative_error(grad, expected_grad) < 1e-2
+        assert compression.stored_bytes * 2 == compression.saved_bytes
+    
+    @pytest.mark.parametrize("model", [relu_mlp, smooth_mlp])
+    def test_half_matmul_error_is_bounded(self, model):
+        expected = gradients(model)
+        actual = gradients(model, Compression(half_matmul=True))
+        
+        for grad, expected_grad in zip(actual, expected):
+            assert relative_error(grad, expected_grad) < 1e-2
+    
+    def test_disabled_rules_keep_full_precision(self):
+        compression = Compression(relu_masks=False, half_activations=False)
+        
+        for grad, expected_grad in zip(gradients(smooth_mlp, compression), gradients(smooth_mlp)):
+            np.testing.assert_array_equal(grad, expected_grad)
+        assert compression.saved_bytes == 0
+    
+    def test_mask_of_odd_size(self):
+        x = Tensor(np.array([[-1.0, 2.0, 3.0], [4.0, -5.0, 0.0], [7.0, 8.0, -9.0]]), tensor_type=TensorType.PARAMETER)
+        
+        with Compression():
+            y = relu(x)
+        
+        mean(y).backward()
+        np.testing.assert_allclose(x.grad, (x.data > 0) / 9.0)
@@ -0,0 +1,68 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu, sigmoid, softmax, tanh
+from src.clumsygrad.elementwise import ChunkedElementwise
+from src.clumsygrad.math import abs, cos, exp, log, mean, sin, sqrt, sum, tan
+from src.clumsygrad.tensor import Tensor, TensorType
+
+def expression(x, b):
+    y = tanh(x) * exp(-x) + sigmoid(x) - relu(x - b) * 2 + abs(x) ** 1.5
+    z = sin(y) + cos(y) * tan(y * 0.1) + log(sqrt(abs(y) + 1))
+    return mean(softmax(z) * z) + sum(z * b)
+
+def evaluate(x, b):
+    x.grad = b.grad = None
+    loss = expression(x, b)
+    loss.backward()
+    return loss.data.copy(), x.grad.copy(), b.grad.copy()
+
+class TestChunkedElementwise:
+    """Test splitting element-wise operations into chunks evaluated on a thread pool."""
+    
+    @pytest.mark.parametrize("shape, bias_shape", [((37, 53), (53,)), ((64, 8), (64, 1)), ((1000,), (1000,)), ((3, 5, 7), (1, 5, 7))])
+    def test_matches_single_call(self, shape, bias_shape):
+        rng = np.random.default_rng(0)
+        x = Tensor(rng.standard_normal(shape), tensor_type=TensorType.PARAMETER)
+        b = Tensor(rng.standard_normal(bias_shape), tensor_type=TensorType.PARAMETER)
+        expected = evaluate(x, b)
+        
+        with ChunkedElementwise(threads=4, threshold=0):
+            actual = evaluate(x, b)
+        
+        for value, expected_value in zip(actual, expected):
+            np.testing.assert_array_equal(value, expected_value)
+    
+    def test_non_contiguous_arguments(self):
+        rng = np.random.default_rng(1)
+        data = rng.standard_normal((40, 30)).astype(np.float32)
+        out = np.empty((30, 40), dtype=np.float32)
+        
+        executor = ChunkedElementwise(threads=3, threshold=0)
+        with executor:
+            executor.apply(np.add, (data.T, data[0, :, None] * 2), out)
+        
+        np.testing.assert_array_equal(out, data.T + data[0, :, None] * 2)
+    
+    def test_threshold(self):
+        calls = []
+        
+        class Recording(ChunkedElementwise):
+            def apply(self, ufunc, args, out):
+                calls.append(ufunc)
+                return super().apply(ufunc, args, out)
+        
+        with Recording(threads=2, threshold=100):
+            exp(Tensor(np.ones(99)))
+            assert calls == []
+            exp(Tensor(np.ones(100)))
+            assert calls == [np.exp]
+    
+    def test_invalid_threads(self):
+        with pytest.raises(ValueError):
+            ChunkedElementwise(threads=0)
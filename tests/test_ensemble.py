@@ -0,0 +1,103 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import sigmoid, tanh
+from src.clumsygrad.ensemble import Ensemble
+from src.clumsygrad.math import sum
+from src.clumsygrad.optimizer import SGD, Adam
+from src.clumsygrad.tensor import Tensor, TensorType
+
+def member_forward(params, x, activation=tanh):
+    """Run one member as a separate model, with its own parameter tensors."""
+    for index in range(0, len(params), 2):
+        x = x @ params[index] + params[index + 1]
+        if index < len(params) - 2:
+            x = activation(x)
+    return x
+
+def separate_members(ensemble):
+    return [[Tensor(array, tensor_type=TensorType.PARAMETER) for array in ensemble.member(index)]
+            for index in range(ensemble.members)]
+
+class TestEnsemble:
+    """Test stacked ensembles against separately trained members."""
+    
+    def test_shapes(self):
+        ensemble = Ensemble(members=5, layer_sizes=[3, 8, 8, 2], seed=0)
+        
+        assert [param.shape for param in ensemble.parameters] == [(5, 3, 8), (5, 1, 8), (5, 8, 8), (5, 1, 8), (5, 8, 2), (5, 1, 2)]
+        assert all(param._tensor_type == TensorType.PARAMETER for param in ensemble.parameters)
+        assert ensemble(Tensor(np.ones((7, 3)))).shape == (5, 7, 2)
+        assert ensemble(Tensor(np.ones((5, 7, 3)))).shape == (5, 7, 2)
+    
+    def test_forward_matches_members(self):
+        rng = np.random.default_rng(1)
+        ensemble = Ensemble(members=4, layer_sizes=[3, 6, 1], activation=tanh, output_activation=sigmoid, seed=1)
+        x = rng.standard_normal((4, 10, 3))
+        
+        out = ensemble(x)
+        
+        for index, params in enumerate(separate_members(ensemble)):
+            expected = sigmoid(member_forward(params, Tensor(x[index])))
+            np.testing.assert_allclose(out.data[index], expected.data, rtol=1e-5)
+    
+    @pytest.mark.parametrize("shared_input", [True, False])
+    def test_gradients_match_members(self, shared_input):
+        rng = np.random.default_rng(2)
+        ensemble = Ensemble(members=3, layer_sizes=[4, 5, 5, 2], activation=tanh, seed=2)
+        x = rng.standard_normal((6, 4) if shared_input else (3, 6, 4))
+        y = rng.standard_normal((3, 6, 2))
+        
+        sum((ensemble(x) - Tensor(y)) ** 2).backward()
+        
+        for index, params in enumerate(separate_members(ensemble)):
+            member_x = x if shared_input else x[index]
+            sum((member_forward(params, Tensor(member_x)) - Tensor(y[index])) ** 2).backward()
+            for stacked, param in zip(ensemble.parameters, params):
+                np.testing.assert_allclose(stacked.grad[index], param.grad, rtol=1e-4, atol=1e-6)
+    
+    @pytest.mark.parametrize("optimizer", [SGD, Adam])
+    def test_training_matches_members(self, optimizer):
+        rng = np.random.default_rng(3)
+        ensemble = Ensemble(members=3, layer_sizes=[2, 8, 1], activation=tanh, seed=3)
+        members = separate_members(ensemble)
+        x, y = rng.standard_normal((16, 2)), rng.standard_normal((16, 1))
+        
+        stacked_optimizer = optimizer(ensemble.parameters, lr=0.01)
+        member_optimizers = [optimizer(params, lr=0.01) for params in members]
+        
+        for _ in range(5):
+            stacked_optimizer.zero_grad()
+            sum((ensemble(x) - Tensor(y)) ** 2).backward()
+            stacked_optimizer.step()
+            
+            for params, member_optimizer in zip(members, member_optimizers):
+                member_optimizer.zero_grad()
+                sum((member_forward(params, Tensor(x)) - Tensor(y)) ** 2).backward()
+                member_optimizer.step()
+        
+        for index, params in enumerate(members):
+            for array, param in zip(ensemble.member(index), params):
+                np.testing.assert_allclose(array, param.data, rtol=1e-4, atol=1e-6)
+    
+    def test_seed(self):
+        first = Ensemble(members=2, layer_sizes=[2, 3], seed=7)
+        second = Ensemble(members=2, layer_sizes=[2, 3], seed=7)
+        
+        np.testing.assert_array_equal(first.weights[0].data, second.weights[0].data)
+        assert not np.array_equal(first.weights[0].data[0], first.weights[0].data[1])
+    
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            Ensemble(members=0, layer_sizes=[2, 3])
+        with pytest.raises(ValueError):
+            Ensemble(members=2, layer_sizes=[2])
+        with pytest.raises(ValueError):
+            Ensemble(members=2, layer_sizes=[2, 3])(Tensor(np.ones((3, 4, 2))))
+        with pytest.raises(IndexError):
+            Ensemble(members=2, layer_sizes=[2, 3]).member(2)
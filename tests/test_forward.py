@@ -0,0 +1,130 @@
+import gc
+import os
+import sys
+import weakref
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu, sigmoid, softmax, tanh
+from src.clumsygrad.forward import jvp
+from src.clumsygrad.fusion import fuse
+from src.clumsygrad.loss import mae_loss, mse_loss
+from src.clumsygrad.math import abs, cos, exp, log, mean, sin, sqrt, sum, tan
+from src.clumsygrad.tensor import Tensor, TensorType
+
+FUNCTIONS = [
+    ("add", lambda x, y: x + y),
+    ("add_broadcast", lambda x, y: x + mean(y, axis=0)),
+    ("add_scalar", lambda x, y: x + 2.0),
+    ("sub", lambda x, y: x - y),
+    ("sub_broadcast", lambda x, y: x - mean(y, axis=0)),
+    ("sub_scalar", lambda x, y: x - 2.0),
+    ("mul", lambda x, y: x * y),
+    ("mul_broadcast", lambda x, y: x * sum(y, axis=1, keepdims=True)),
+    ("mul_scalar", lambda x, y: x * 3.0),
+    ("matmul", lambda x, y: x @ y.T()),
+    ("power", lambda x, y: abs(x) ** 1.5),
+    ("negate", lambda x, y: -x),
+    ("reshape", lambda x, y: x.reshape((4, 3))),
+    ("sum", lambda x, y: sum(x * y, axis=0)),
+    ("mean", lambda x, y: mean(x * y, axis=1, keepdims=True)),
+    ("exp", lambda x, y: exp(x)),
+    ("log", lambda x, y: log(abs(x) + 1)),
+    ("sqrt", lambda x, y: sqrt(abs(x) + 1)),
+    ("sin", lambda x, y: sin(x)),
+    ("cos", lambda x, y: cos(x)),
+    ("tan", lambda x, y: tan(x * 0.3)),
+    ("relu", lambda x, y: relu(x)),
+    ("sigmoid", lambda x, y: sigmoid(x)),
+    ("tanh", lambda x, y: tanh(x)),
+    ("softmax", lambda x, y: softmax(x * y, axis=0)),
+    ("mae", lambda x, y: mae_loss(x, y)),
+]
+
+def reverse_mode(f, primals, cotangent):
+    params = [Tensor(primal, tensor_type=TensorType.PARAMETER) for primal in primals]
+    f(*params).backward(cotangent)
+    return [param.grad if param.grad is not None else np.zeros(param.shape, dtype=np.float32) for param in params]
+
+class TestJvp:
+    """Test forward-mode differentiation against reverse mode."""
+    
+    @pytest.mark.parametrize("name, f", FUNCTIONS)
+    def test_matches_reverse_mode(self, name, f):
+        rng = np.random.default_rng(0)
+        primals = [rng.standard_normal((3, 4)).astype(np.float32) + 0.1 for _ in range(2)]
+        tangents = [rng.standard_normal((3, 4)).astype(np.float32) for _ in range(2)]
+        
+        out, tangent = jvp(f, primals, tangents)
+        cotangent = rng.standard_normal(out.shape).astype(np.float32)
+        
+        # <u, J v> == <J^T u, v>
+        expected = np.sum([np.sum(g * t) for g, t in zip(reverse_mode(f, primals, cotangent), tangents)])
+        assert tangent.shape == out.shape
+        np.testing.assert_allclose(np.sum(cotangent * tangent), expected, rtol=1e-4, atol=1e-5)
+    
+    def test_mse_loss(self):
+        # The tangent is the derivative of the mean computed by `mse_loss`, while `mse_backward`
+        # returns the gradient of the squared error of each element, so it is checked directly
+        rng = np.random.default_rng(1)
+        pred, target, tangent = (rng.standard_normal((3, 4)).astype(np.float32) for _ in range(3))
+        
+        out, out_tangent = jvp(lambda p, t: mse_loss(p, t), (pred, target), (tangent, np.zeros((3, 4))))
+        
+        np.testing.assert_allclose(out_tangent, np.mean(2 * (pred - target) * tangent), rtol=1e-5)
+    
+    def test_finite_differences(self):
+        x = np.array([0.3, -0.7, 1.2], dtype=np.float32)
+        v = np.array([1.0, 0.5, -2.0], dtype=np.float32)
+        f = lambda x: sum(tanh(x) * exp(x * 0.5)) + sin(x)
+        
+        out, tangent = jvp(f, (x,), (v,))
+        eps = 1e-3
+        plus = f(Tensor(x + eps * v)).data
+        minus = f(Tensor(x - eps * v)).data
+        
+        np.testing.assert_allclose(tangent, (plus - minus) / (2 * eps), rtol=1e-2, atol=1e-3)
+        np.testing.assert_allclose(out.data, f(Tensor(x)).data, rtol=1e-6)
+    
+    def test_constants_and_multiple_outputs(self):
+        w = Tensor(np.full((2, 2), 2.0), tensor_type=TensorType.PARAMETER)
+        x = np.array([[1.0, 2.0]], dtype=np.float32)
+        
+        (a, b, c), (ta, tb, tc) = jvp(lambda x: (x @ w, x * 3.0, w * 1.0), (x,), (np.ones((1, 2)),))
+        
+        np.testing.assert_array_equal(ta, np.array([[4.0, 4.0]]))
+        np.testing.assert_array_equal(tb, np.array([[3.0, 3.0]]))
+        np.testing.assert_array_equal(tc, np.zeros((2, 2)))
+        assert w.grad is None and a._parents == () and a._tangent is None
+    
+    def test_no_graph_is_built(self):
+        x = np.ones(100, dtype=np.float32)
+        references = []
+        
+        def deep(x):
+            for _ in range(50):
+                x = tanh(x) * 0.9 + 0.1
+                references.append(weakref.ref(x._tangent))
+            return x
+        
+        out, tangent = jvp(deep, (x,), (np.ones(100),))
+        gc.collect()
+        
+        assert out._parents == ()
+        assert sum_alive(references) == 1
+    
+    def test_errors(self):
+        with pytest.raises(ValueError, match="primals"):
+            jvp(lambda x: x, (np.ones(2),), ())
+        with pytest.raises(ValueError, match="shape"):
+            jvp(lambda x: x, (np.ones(2),), (np.ones(3),))
+        
+        fused = fuse(lambda x: exp(x) * 2.0)
+        with pytest.raises(ValueError, match="forward mode"):
+            jvp(fused, (np.ones(2),), (np.ones(2),))
+
+def sum_alive(references):
+    return len([reference for reference in references if reference() is not None])
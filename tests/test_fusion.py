@@ -0,0 +1,130 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu, sigmoid, softmax, tanh
+from src.clumsygrad.fusion import _RULES, fuse
+from src.clumsygrad.grad import fused_backward, mul_backward
+from src.clumsygrad.math import abs, cos, exp, log, sin, sqrt, sum, tan
+from src.clumsygrad.tensor import Tensor, TensorType
+
+def readme_expression(x):
+    return exp(x**2 + 3*x + 2)
+
+def activations(x, y):
+    return tanh(relu(x * y - 0.5)) + sigmoid(-x) * abs(y)
+
+def trigonometry(x):
+    return log(sqrt(x * x + 1.0)) + sin(x) - cos(x) * 2 + tan(x * 0.1)
+
+def gradients(fn, *arrays):
+    tensors = [Tensor(array, tensor_type=TensorType.PARAMETER) for array in arrays]
+    result = fn(*tensors)
+    sum(result * result).backward()
+    return result, [tensor.grad for tensor in tensors]
+
+class TestFusion:
+    """Test fusing chains of element-wise operations into a single node."""
+    
+    @pytest.mark.parametrize("fn", [readme_expression, activations, trigonometry])
+    def test_matches_unfused(self, fn):
+        rng = np.random.default_rng(0)
+        arrays = [rng.uniform(-1, 1, (5, 3)) for _ in range(fn.__code__.co_argcount)]
+        
+        expected, expected_grads = gradients(fn, *arrays)
+        result, grads = gradients(fuse(fn), *arrays)
+        
+        assert result._grad_fn is fused_backward
+        np.testing.assert_allclose(result.data, expected.data, rtol=1e-5, atol=1e-6)
+        for grad, expected_grad in zip(grads, expected_grads):
+            np.testing.assert_allclose(grad, expected_grad, rtol=1e-4, atol=1e-5)
+    
+    def test_input_reused_by_several_operations(self):
+        fused = fuse(lambda x: x * x * x + x)
+        x = Tensor([1.0, 2.0, -3.0], tensor_type=TensorType.PARAMETER)
+        fused(x).backward(np.ones(3))
+        np.testing.assert_allclose(x.grad, 3 * np.array([1.0, 4.0, 9.0]) + 1)
+    
+    def test_captured_tensors_receive_gradients(self):
+        w = Tensor([2.0, 3.0], tensor_type=TensorType.PARAMETER)
+        fused = fuse(lambda x: x * w + w)
+        
+        x = Tensor([1.0, 4.0], tensor_type=TensorType.PARAMETER)
+        result = fused(x)
+        assert result._parents == (x, w)
+        
+        result.backward(np.ones(2))
+        np.testing.assert_allclose(x.grad, [2.0, 3.0])
+        np.testing.assert_allclose(w.grad, [2.0, 5.0])
+    
+    def test_program_is_cached_per_shape(self):
+        calls = []
+        
+        def fn(x):
+            calls.append(x.shape)
+            return exp(x) * 2
+        
+        fused = fuse(fn)
+        for shape in [(3,), (3,), (2, 2), (3,)]:
+            fused(Tensor(np.ones(shape)))
+        
+        assert calls == [(3,), (2, 2)]
+    
+    def test_inputs_not_requiring_grad(self):
+        fused = fuse(lambda x, y: x * y)
+        x = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        y = Tensor([3.0, 4.0])
+        fused(x, y).backward(np.ones(2))
+        
+        np.testing.assert_allclose(x.grad, [3.0, 4.0])
+        assert y.grad is None
+    
+    def test_output_before_the_last_operation(self):
+        def fn(x):
+            y = exp(x)
+            z = y * 2
+            return y
+        
+        x = Tensor([0.0, 1.0], tensor_type=TensorType.PARAMETER)
+        result = fuse(fn)(x)
+        np.testing.assert_allclose(result.data, np.exp([0.0, 1.0]), rtol=1e-6)
+        
+        result.backward(np.ones(2))
+        np.testing.assert_allclose(x.grad, np.exp([0.0, 1.0]), rtol=1e-6)
+    
+    def test_captured_tensors_are_bound_at_trace_time(self):
+        w = Tensor([2.0, 3.0], tensor_type=TensorType.PARAMETER)
+        fused = fuse(lambda x: x * w)
+        x = Tensor([1.0, 1.0])
+        np.testing.assert_array_equal(fused(x).data, [2.0, 3.0])
+        
+        w.data[...] = [4.0, 5.0]
+        np.testing.assert_array_equal(fused(x).data, [4.0, 5.0])
+        
+        w = Tensor([6.0, 7.0], tensor_type=TensorType.PARAMETER)
+        np.testing.assert_array_equal(fused(x).data, [4.0, 5.0])
+    
+    def test_mul_rule_writes_into_scratch_buffers(self):
+        x, y, g = (np.array(values, dtype=np.float32) for values in ([1, 2], [3, 4], [0.5, 2]))
+        tmp, spare = np.empty(2, dtype=np.float32), np.empty(2, dtype=np.float32)
+        (left, _), (right, _) = _RULES[mul_backward](g, [x, y], x * y, {}, tmp, spare)
+        
+        assert left is tmp and right is spare
+        np.testing.assert_array_equal(left, g * y)
+        np.testing.assert_array_equal(right, g * x)
+    
+    def test_unsupported_operations(self):
+        x = Tensor(np.ones((2, 3)))
+        
+        with pytest.raises(ValueError, match="cannot be fused"):
+            fuse(lambda x: softmax(x * 2))(x)
+        with pytest.raises(ValueError, match="cannot be fused"):
+            fuse(lambda x: x.T() * 2)(Tensor(np.ones((3, 3))))
+        with pytest.raises(ValueError, match="shapes"):
+            fuse(lambda x, b: x + b * 2)(x, Tensor(np.ones(3)))
+        with pytest.raises(ValueError, match="must return"):
+            fuse(lambda x: x)(x)
@@ -6,6 +6,7 @@ import numpy as np
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import src.clumsygrad.grad as grad_module
+from src.clumsygrad.activation import sigmoid
 from src.clumsygrad.math import abs, cos, exp, log, mean, sin, sqrt, sum, tan
 from src.clumsygrad.tensor import Tensor, TensorType
 
@@ -408,4 +409,18 @@ class TestMathOpGradFunctions:
 
         grad_x_tuple = grad_module.tan_backward(child_tensor, incoming_grad)
         expected_grad_x = incoming_grad * (1 / np.cos(x_data)**2)
-        np.testing.assert_array_almost_equal(grad_x_tuple[0], expected_grad_x)
\ No newline at end of file
+        np.testing.assert_array_almost_equal(grad_x_tuple[0], expected_grad_x)
+
+class TestActivationGradFunctions:
+    """Tests for backward functions of activation functions."""
+
+    def test_sigmoid_backward(self):
+        x_data = np.array([-2., 0., 3.])
+        x = Tensor(x_data, tensor_type=TensorType.PARAMETER)
+        child_tensor = sigmoid(x) # Forward pass
+        incoming_grad = np.array([0.1, 0.2, 0.3])
+
+        grad_x_tuple = grad_module.sigmoid_backward(child_tensor, incoming_grad)
+        sigmoid_x = 1 / (1 + np.exp(-x_data)) # The saved output is used as is, not passed through sigmoid again
+        expected_grad_x = incoming_grad * sigmoid_x * (1 - sigmoid_x)
+        np.testing.assert_array_almost_equal(grad_x_tuple[0], expected_grad_x)
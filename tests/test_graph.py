@@ -0,0 +1,100 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.graph import StaticGraph
+from src.clumsygrad.math import exp, sum
+from src.clumsygrad.tensor import Tensor, TensorType
+
+class TestStaticGraph:
+    """Test building a graph once and running it repeatedly."""
+    
+    def test_run_matches_eager(self, model):
+        rng = np.random.default_rng(0)
+        params = model.make_parameters(rng)
+        
+        graph = StaticGraph()
+        x = graph.placeholder((8, 4))
+        y = graph.placeholder((8, 2))
+        with graph:
+            loss = model(x, y, params)
+        
+        for _ in range(3):
+            x_data = rng.standard_normal((8, 4))
+            y_data = rng.standard_normal((8, 2))
+            
+            value = graph.run({x: x_data, y: y_data}, loss).copy()
+            static_grads = [param.grad for param in params]
+            
+            for param in params:
+                param.grad = None
+            
+            eager_loss = model(Tensor(x_data), Tensor(y_data), params)
+            eager_loss.backward()
+            
+            np.testing.assert_allclose(value, eager_loss.data, rtol=1e-6)
+            for static_grad, param in zip(static_grads, params):
+                np.testing.assert_allclose(static_grad, param.grad, rtol=1e-5, atol=1e-6)
+                param.grad = None
+    
+    def test_buffers_are_reused(self):
+        w = Tensor([[1.0], [2.0]], tensor_type=TensorType.PARAMETER)
+        
+        graph = StaticGraph()
+        x = graph.placeholder((3, 2))
+        with graph:
+            hidden = x @ w
+            loss = sum(hidden * hidden)
+        
+        first = graph.run({x: np.ones((3, 2))}, loss)
+        data = hidden.data
+        second = graph.run({x: np.zeros((3, 2))}, loss)
+        
+        assert first is second
+        assert hidden.data is data
+        np.testing.assert_array_equal(second, 0)
+    
+    def test_only_parameter_gradients_are_written(self):
+        w = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        
+        graph = StaticGraph()
+        x = graph.placeholder((2,))
+        with graph:
+            hidden = x * w
+            loss = sum(hidden)
+        
+        graph.run({x: [3.0, 4.0]}, loss)
+        np.testing.assert_array_equal(w.grad, np.array([3, 4], dtype=np.float32))
+        assert hidden.grad is None
+        assert loss.grad is None
+        
+        # Gradients accumulate like with Tensor.backward
+        graph.run({x: [1.0, 1.0]}, loss)
+        np.testing.assert_array_equal(w.grad, np.array([4, 5], dtype=np.float32))
+    
+    def test_forward_only(self):
+        graph = StaticGraph()
+        x = graph.placeholder((2,))
+        with graph:
+            y = exp(x * 2)
+        
+        np.testing.assert_allclose(graph.forward(y, {x: [0.0, 1.0]}), np.exp([0.0, 2.0]), rtol=1e-6)
+    
+    def test_invalid_feed(self):
+        graph = StaticGraph()
+        x = graph.placeholder((2,))
+        with graph:
+            y = x * 2
+        
+        with pytest.raises(ValueError, match="placeholders"):
+            graph.forward(y, {Tensor([1.0, 2.0]): [1.0, 2.0]})
+        
+        with pytest.raises(ValueError, match="shape"):
+            graph.forward(y, {x: [1.0, 2.0, 3.0]})
+        
+        with pytest.raises(ValueError, match="not been recorded"):
+            graph.forward(x * 3)
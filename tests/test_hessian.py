@@ -0,0 +1,184 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu, sigmoid, softmax, tanh
+from src.clumsygrad.fusion import fuse
+from src.clumsygrad.hessian import hvp
+from src.clumsygrad.loss import mae_loss, mse_loss
+from src.clumsygrad.math import abs, cos, exp, log, mean, sin, sqrt, sum, tan
+from src.clumsygrad.tensor import Tensor, TensorType
+
+FUNCTIONS = [
+    ("add", lambda x, y: sum((x + y) ** 2)),
+    ("add_broadcast", lambda x, y: sum((x + mean(y, axis=0)) ** 2)),
+    ("sub_broadcast", lambda x, y: sum((x - sum(y, axis=1, keepdims=True)) ** 3)),
+    ("mul", lambda x, y: sum(x * y * x)),
+    ("mul_broadcast", lambda x, y: sum(x * mean(y * y, axis=0, keepdims=True))),
+    ("mul_scalar", lambda x, y: sum((x * 3.0 - 2.0) ** 2)),
+    ("matmul", lambda x, y: sum(tanh(x @ y.T()) ** 2)),
+    ("transpose", lambda x, y: sum((x.T() @ y) * (y.T() @ x))),
+    ("reshape", lambda x, y: sum((x.reshape((4, 3)) @ y) ** 2)),
+    ("negate", lambda x, y: sum(-(x * y) * x)),
+    ("abs", lambda x, y: sum(abs(x) * y * x)),
+    ("exp", lambda x, y: mean(exp(x * y))),
+    ("log", lambda x, y: sum(log(x * x + 1))),
+    ("sqrt", lambda x, y: sum(sqrt(x * x + y * y + 1))),
+    ("sin_cos", lambda x, y: sum(sin(x) * cos(y))),
+    ("tan", lambda x, y: sum(tan(x * 0.3))),
+    ("relu", lambda x, y: sum(relu(x) * x)),
+    ("sigmoid", lambda x, y: sum(sigmoid(x * y))),
+    ("softmax", lambda x, y: sum(softmax(x, axis=0) * y)),
+    ("mse", lambda x, y: mse_loss(tanh(x), y)),
+    ("mae", lambda x, y: mae_loss(x * x, y)),
+]
+
+def gradient(f, primals):
+    params = [Tensor(primal, tensor_type=TensorType.PARAMETER) for primal in primals]
+    f(*params).backward()
+    return [param.grad.astype(np.float64) if param.grad is not None else np.zeros(param.shape) for param in params]
+
+class TestCreateGraph:
+    """Test backward passes with create_graph=True."""
+    
+    @pytest.mark.parametrize("name, f", FUNCTIONS)
+    def test_gradients_match_default_backward(self, name, f):
+        rng = np.random.default_rng(0)
+        primals = [rng.standard_normal((3, 4)).astype(np.float32) for _ in range(2)]
+        
+        expected = gradient(f, primals)
+        params = [Tensor(primal, tensor_type=TensorType.PARAMETER) for primal in primals]
+        f(*params).backward(create_graph=True)
+        
+        for param, grad in zip(params, expected):
+            if param.grad is None:
+                assert param.grad_tensor is None and not grad.any()
+                continue
+            
+            np.testing.assert_allclose(param.grad, grad, rtol=1e-5, atol=1e-6)
+            np.testing.assert_allclose(param.grad_tensor.data, grad, rtol=1e-5, atol=1e-6)
+    
+    def test_second_derivative(self):
+        x = Tensor([1.0, -2.0, 3.0], tensor_type=TensorType.PARAMETER)
+        sum(x ** 3).backward(create_graph=True)
+        
+        first = x.grad_tensor
+        np.testing.assert_allclose(x.grad, [3.0, 12.0, 27.0])
+        assert first.requires_grad
+        
+        x.grad = None
+        sum(first).backward()
+        np.testing.assert_allclose(x.grad, [6.0, -12.0, 18.0])
+    
+    def test_third_derivative(self):
+        x = Tensor([0.5, 1.5], tensor_type=TensorType.PARAMETER)
+        sum(x ** 4).backward(create_graph=True)
+        
+        first = x.grad_tensor
+        x.grad = None
+        sum(first).backward(create_graph=True)
+        second = x.grad_tensor
+        
+        x.grad = None
+        sum(second).backward()
+        np.testing.assert_allclose(x.grad, 24 * np.array([0.5, 1.5]), rtol=1e-6)
+    
+    def test_accumulates(self):
+        x = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        sum(x * x).backward(create_graph=True)
+        sum(x * x * 2.0).backward(create_graph=True)
+        
+        np.testing.assert_allclose(x.grad, [6.0, 12.0])
+        np.testing.assert_allclose(x.grad_tensor.data, [6.0, 12.0])
+    
+    def test_setting_grad_discards_grad_tensor(self):
+        x = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        sum(x * x).backward(create_graph=True)
+        x.grad = None
+        
+        assert x.grad_tensor is None
+    
+    def test_constant_gradient_has_no_graph(self):
+        x = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        sum(x * 3.0).backward(create_graph=True)
+        
+        assert not x.grad_tensor.requires_grad
+    
+    def test_unsupported_operation(self):
+        x = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        fused = fuse(lambda t: tanh(t) * 2.0)
+        
+        with pytest.raises(RuntimeError, match="create_graph"):
+            sum(fused(x)).backward(create_graph=True)
+
+class TestHvp:
+    """Test Hessian-vector products against finite differences of the gradient."""
+    
+    @pytest.mark.parametrize("name, f", FUNCTIONS)
+    def test_matches_finite_differences(self, name, f):
+        rng = np.random.default_rng(1)
+        primals = [rng.standard_normal((3, 4)).astype(np.float32) for _ in range(2)]
+        tangents = [rng.standard_normal((3, 4)).astype(np.float32) for _ in range(2)]
+        
+        value, products = hvp(f, primals, tangents)
+        
+        eps = 1e-2
+        plus = gradient(f, [primal + eps * tangent for primal, tangent in zip(primals, tangents)])
+        minus = gradient(f, [primal - eps * tangent for primal, tangent in zip(primals, tangents)])
+        
+        np.testing.assert_allclose(value.data, f(*[Tensor(primal) for primal in primals]).data, rtol=1e-6)
+        for product, high, low in zip(products, plus, minus):
+            np.testing.assert_allclose(product, (high - low) / (2 * eps), rtol=2e-2, atol=2e-2)
+    
+    @pytest.mark.parametrize("shapes", [((3, 2, 5), (3, 5, 4)), ((3, 2, 5), (5, 4)),
+                                        ((2, 5), (3, 5, 4)), ((1, 2, 5), (3, 5, 4))])
+    def test_batched_matmul(self, shapes):
+        rng = np.random.default_rng(3)
+        primals = [rng.standard_normal(shape).astype(np.float32) for shape in shapes]
+        tangents = [rng.standard_normal(shape).astype(np.float32) for shape in shapes]
+        f = lambda x, w: sum(tanh(x @ w) ** 2)
+        
+        _, products = hvp(f, primals, tangents)
+        
+        eps = 1e-2
+        plus = gradient(f, [primal + eps * tangent for primal, tangent in zip(primals, tangents)])
+        minus = gradient(f, [primal - eps * tangent for primal, tangent in zip(primals, tangents)])
+        
+        for product, high, low, shape in zip(products, plus, minus, shapes):
+            assert product.shape == shape
+            np.testing.assert_allclose(product, (high - low) / (2 * eps), rtol=2e-2, atol=2e-2)
+    
+    def test_quadratic(self):
+        rng = np.random.default_rng(2)
+        a = rng.standard_normal((6, 4)).astype(np.float32)
+        x0 = rng.standard_normal((4, 1)).astype(np.float32)
+        v = rng.standard_normal((4, 1)).astype(np.float32)
+        
+        _, (product,) = hvp(lambda x: sum((Tensor(a) @ x) ** 2), (x0,), (v,))
+        
+        np.testing.assert_allclose(product, 2 * a.T @ a @ v, rtol=1e-5, atol=1e-5)
+    
+    def test_linear_function(self):
+        _, (product,) = hvp(lambda x: sum(x * 2.0), ([1.0, 2.0],), ([1.0, 1.0],))
+        np.testing.assert_array_equal(product, [0.0, 0.0])
+    
+    def test_captured_parameters_are_unchanged(self):
+        w = Tensor([[0.5], [-1.0]], tensor_type=TensorType.PARAMETER)
+        w.grad = np.ones((2, 1), dtype=np.float32)
+        
+        hvp(lambda x: sum(tanh(x @ w) ** 2), ([[1.0, 2.0]],), ([[1.0, 0.0]],))
+        
+        np.testing.assert_array_equal(w.grad, np.ones((2, 1)))
+        assert w.grad_tensor is None
+    
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            hvp(lambda x: sum(x), ([1.0],), ())
+        with pytest.raises(ValueError):
+            hvp(lambda x: sum(x), ([1.0, 2.0],), ([1.0],))
+        with pytest.raises(ValueError):
+            hvp(lambda x: x * x, ([1.0, 2.0],), ([1.0, 1.0],))
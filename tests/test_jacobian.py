@@ -0,0 +1,122 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu, sigmoid, softmax, tanh
+from src.clumsygrad.checkpoint import checkpoint
+from src.clumsygrad.fusion import fuse
+from src.clumsygrad.jacobian import jacobian
+from src.clumsygrad.loss import mae_loss, mse_loss
+from src.clumsygrad.math import abs, cos, exp, log, mean, sin, sqrt, sum, tan
+from src.clumsygrad.tensor import Tensor, TensorType
+
+FUNCTIONS = [
+    ("add", lambda x, y: x + y),
+    ("add_broadcast", lambda x, y: x + mean(y, axis=0)),
+    ("add_scalar", lambda x, y: x + 2.0),
+    ("sub", lambda x, y: x - y),
+    ("sub_broadcast", lambda x, y: sum(y, axis=1, keepdims=True) - x),
+    ("mul", lambda x, y: x * y),
+    ("mul_broadcast", lambda x, y: x * sum(y, axis=1, keepdims=True)),
+    ("mul_scalar", lambda x, y: x * 3.0),
+    ("matmul", lambda x, y: x @ y.T()),
+    ("transpose", lambda x, y: x.T() * 2.0),
+    ("power", lambda x, y: abs(x) ** 1.5),
+    ("negate", lambda x, y: -x),
+    ("reshape", lambda x, y: x.reshape((4, 3)) * 2.0),
+    ("sum", lambda x, y: sum(x * y, axis=0)),
+    ("sum_all", lambda x, y: sum(x * y)),
+    ("mean", lambda x, y: mean(x * y, axis=1, keepdims=True)),
+    ("mean_negative_axis", lambda x, y: mean(x * y, axis=-1)),
+    ("exp", lambda x, y: exp(x)),
+    ("log", lambda x, y: log(abs(x) + 1)),
+    ("sqrt", lambda x, y: sqrt(abs(x) + 1)),
+    ("sin", lambda x, y: sin(x)),
+    ("cos", lambda x, y: cos(x)),
+    ("tan", lambda x, y: tan(x * 0.3)),
+    ("relu", lambda x, y: relu(x)),
+    ("sigmoid", lambda x, y: sigmoid(x)),
+    ("tanh", lambda x, y: tanh(x)),
+    ("softmax", lambda x, y: softmax(x * y, axis=0)),
+    ("softmax_last_axis", lambda x, y: softmax(x * y)),
+    ("mse", lambda x, y: mse_loss(x, y)),
+    ("mae", lambda x, y: mae_loss(x, y)),
+    ("fused", lambda x, y: fuse(lambda a, b: tanh(a) * b)(x, y)),
+]
+
+def reference_jacobian(f, primals):
+    """Build the Jacobian row by row, with one backward pass per output element."""
+    shape = f(*[Tensor(primal) for primal in primals]).shape
+    rows = [np.zeros((int(np.prod(shape)),) + primal.shape, dtype=np.float32) for primal in primals]
+    
+    for index in range(int(np.prod(shape))):
+        params = [Tensor(primal, tensor_type=TensorType.PARAMETER) for primal in primals]
+        cotangent = np.zeros(shape, dtype=np.float32)
+        cotangent.flat[index] = 1
+        f(*params).backward(cotangent)
+        
+        for row, param in zip(rows, params):
+            if param.grad is not None:
+                row[index] = param.grad
+    
+    return [row.reshape(shape + primal.shape) for row, primal in zip(rows, primals)]
+
+class TestJacobian:
+    """Test batched Jacobians against one backward pass per output element."""
+    
+    @pytest.mark.parametrize("name, f", FUNCTIONS)
+    def test_matches_backward_per_output(self, name, f):
+        rng = np.random.default_rng(0)
+        primals = [rng.standard_normal((3, 4)).astype(np.float32) + 0.1 for _ in range(2)]
+        
+        value, jacobians = jacobian(f, primals)
+        
+        np.testing.assert_allclose(value.data, f(*[Tensor(primal) for primal in primals]).data)
+        for result, expected in zip(jacobians, reference_jacobian(f, primals)):
+            assert result.shape == value.shape + (3, 4)
+            np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-6)
+    
+    @pytest.mark.parametrize("chunk_size", [1, 5, 12, 100])
+    def test_chunks(self, chunk_size):
+        rng = np.random.default_rng(1)
+        w = Tensor(rng.standard_normal((4, 3)))
+        x = rng.standard_normal((3, 4)).astype(np.float32)
+        f = lambda x: tanh(x @ w)
+        
+        _, (full,) = jacobian(f, (x,))
+        _, (chunked,) = jacobian(f, (x,), chunk_size=chunk_size)
+        
+        np.testing.assert_array_equal(chunked, full)
+    
+    def test_linear_map(self):
+        rng = np.random.default_rng(2)
+        a = rng.standard_normal((5, 3)).astype(np.float32)
+        
+        _, (result,) = jacobian(lambda x: Tensor(a) @ x, (np.ones((3, 1)),))
+        
+        np.testing.assert_allclose(result[:, 0, :, 0], a)
+    
+    def test_constant_output(self):
+        value, (result,) = jacobian(lambda x: Tensor([1.0, 2.0]), ([1.0, 2.0, 3.0],))
+        
+        assert result.shape == (2, 3)
+        np.testing.assert_array_equal(result, 0)
+    
+    def test_captured_parameters_are_unchanged(self):
+        w = Tensor([[0.5], [-1.0]], tensor_type=TensorType.PARAMETER)
+        
+        jacobian(lambda x: tanh(x @ w), ([[1.0, 2.0], [3.0, 4.0]],))
+        
+        assert w.grad is None
+    
+    def test_checkpoint_is_not_supported(self):
+        with pytest.raises(RuntimeError, match="Checkpointed"):
+            jacobian(lambda x: checkpoint(lambda t: tanh(t), x), ([1.0, 2.0],))
+    
+    def test_invalid_chunk_size(self):
+        with pytest.raises(ValueError):
+            jacobian(lambda x: x * 2.0, ([1.0],), chunk_size=0)
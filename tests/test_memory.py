@@ -0,0 +1,112 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu
+from src.clumsygrad.codegen import generate
+from src.clumsygrad.compression import Compression
+from src.clumsygrad.graph import StaticGraph
+from src.clumsygrad.math import sum
+from src.clumsygrad.memory import plan_memory
+from src.clumsygrad.tensor import Tensor, TensorType
+
+@pytest.fixture
+def model_options():
+    return {'hidden_layers': 1}
+
+def build(model, rng, batch=8):
+    params = model.make_parameters(rng)
+    graph = StaticGraph()
+    x, y = graph.placeholder((batch, 4)), graph.placeholder((batch, 2))
+    with graph:
+        loss = model(x, y, params)
+    return params, graph, x, y, loss
+
+class TestPlanMemory:
+    """Test planned graphs against eager execution."""
+    
+    def test_matches_eager(self, model):
+        rng = np.random.default_rng(0)
+        params, graph, x, y, loss = build(model, rng)
+        
+        plan = plan_memory(graph, loss)
+        
+        for _ in range(3):
+            x_data, y_data = rng.standard_normal((8, 4)), rng.standard_normal((8, 2))
+            
+            value = graph.run({x: x_data, y: y_data}, loss).copy()
+            planned_grads = [param.grad for param in params]
+            for param in params:
+                param.grad = None
+            
+            expected = model(Tensor(x_data), Tensor(y_data), params)
+            expected.backward()
+            
+            np.testing.assert_allclose(value, expected.data, rtol=1e-6)
+            for planned_grad, param in zip(planned_grads, params):
+                np.testing.assert_allclose(planned_grad, param.grad, rtol=1e-5, atol=1e-6)
+                param.grad = None
+        
+        assert np.shares_memory(loss.data, plan.arena)
+    
+    def test_reuses_memory(self, model):
+        rng = np.random.default_rng(1)
+        _, graph, _, _, loss = build(model, rng, batch=64)
+        
+        plan = plan_memory(graph, loss)
+        stats = plan.stats()
+        
+        assert stats['slots'] < stats['arrays']
+        assert plan.planned_bytes < plan.naive_bytes / 2
+        assert plan.planned_bytes == plan.arena.nbytes
+        assert "slots" in repr(plan)
+    
+    def test_slots_of_overlapping_arrays_are_disjoint(self, model):
+        rng = np.random.default_rng(2)
+        _, graph, _, _, loss = build(model, rng)
+        
+        plan = plan_memory(graph, loss)
+        
+        starts = sorted(offset for offset, _ in plan.slots)
+        assert len(set(starts)) == len(starts)
+        for (offset, size), (next_offset, _) in zip(plan.slots, plan.slots[1:]):
+            assert offset + size <= next_offset
+            assert offset % 16 == 0
+    
+    def test_generate_after_planning(self, model):
+        rng = np.random.default_rng(3)
+        params, graph, x, y, loss = build(model, rng)
+        x_data, y_data = rng.standard_normal((8, 4)), rng.standard_normal((8, 2))
+        
+        expected = graph.run({x: x_data, y: y_data}, loss).copy()
+        expected_grads = [param.grad.copy() for param in params]
+        for param in params:
+            param.grad = None
+        
+        plan_memory(graph, loss)
+        value = generate(graph, loss, [x, y])(x_data, y_data)
+        
+        np.testing.assert_allclose(value, expected, rtol=1e-6)
+        for expected_grad, param in zip(expected_grads, params):
+            np.testing.assert_allclose(param.grad, expected_grad, rtol=1e-6, atol=1e-7)
+    
+    def test_packed_saved_arrays(self):
+        w = Tensor(np.ones((2, 2)), tensor_type=TensorType.PARAMETER)
+        
+        graph = StaticGraph()
+        x = graph.placeholder((3, 2))
+        with graph, Compression():
+            loss = sum(relu(x @ w))
+        
+        with pytest.raises(ValueError, match="packed"):
+            plan_memory(graph, loss)
+    
+    def test_output_not_recorded(self):
+        graph = StaticGraph()
+        
+        with pytest.raises(ValueError):
+            plan_memory(graph, Tensor([1.0], tensor_type=TensorType.PARAMETER) * 2.0)
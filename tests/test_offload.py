@@ -0,0 +1,150 @@
+import contextlib
+import gc
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu, sigmoid, tanh
+from src.clumsygrad.loss import mse_loss
+from src.clumsygrad.math import exp, mean
+from src.clumsygrad.offload import Offload
+from src.clumsygrad.tensor import Tensor, TensorType
+
+def make_parameters():
+    rng = np.random.default_rng(0)
+    return [Tensor(rng.standard_normal((16, 32)) * 0.3, tensor_type=TensorType.PARAMETER),
+            Tensor(rng.standard_normal((32, 32)) * 0.3, tensor_type=TensorType.PARAMETER),
+            Tensor(rng.standard_normal((32, 4)) * 0.3, tensor_type=TensorType.PARAMETER)]
+
+def forward(params):
+    rng = np.random.default_rng(1)
+    x = Tensor(rng.standard_normal((64, 16)))
+    y = Tensor(rng.standard_normal((64, 4)))
+    w1, w2, w3 = params
+    
+    hidden = relu(x @ w1)
+    hidden = tanh(hidden @ w2) * sigmoid(hidden @ w2) + exp(hidden * -0.5)
+    return mse_loss(hidden @ w3, y) + mean(hidden * hidden)
+
+def gradients(offload=None, keep_graph=False):
+    params = make_parameters()
+    
+    if offload is None:
+        loss = forward(params)
+    else:
+        with offload:
+            loss = forward(params)
+    
+    loss.backward(keep_graph=keep_graph)
+    return loss, [param.grad for param in params]
+
+class TestOffload:
+    """Test spilling saved arrays to memory-mapped scratch files."""
+    
+    @pytest.mark.parametrize("prefetch", [0, 1, 3])
+    def test_gradients_match(self, tmp_path, prefetch):
+        offload = Offload(str(tmp_path), threshold=1024, prefetch=prefetch)
+        _, expected = gradients()
+        _, actual = gradients(offload)
+        
+        assert offload.spilled_bytes > 0
+        for grad, expected_grad in zip(actual, expected):
+            np.testing.assert_array_equal(grad, expected_grad)
+    
+    def test_scratch_files_live_with_the_graph(self, tmp_path):
+        params = make_parameters()
+        
+        with Offload(str(tmp_path), threshold=1024):
+            loss = forward(params)
+        
+        files = len(os.listdir(tmp_path))
+        assert files > 0
+        
+        loss.backward()
+        gc.collect()
+        assert os.listdir(tmp_path) == []
+    
+    def test_bookkeeping_is_pruned_with_the_graph(self, tmp_path):
+        offload = Offload(str(tmp_path), threshold=1024)
+        params = make_parameters()
+        
+        for _ in range(3):
+            with offload:
+                loss = forward(params)
+            loss.backward()
+            del loss
+            gc.collect()
+        
+        assert offload.spilled_bytes > 0
+        assert offload._spilled == {}
+        assert set(offload._by_array) <= {id(param.data) for param in params}
+    
+    def test_small_arrays_stay_in_memory(self, tmp_path):
+        offload = Offload(str(tmp_path), threshold=1024)
+        x = Tensor(np.ones(8), tensor_type=TensorType.PARAMETER)
+        
+        with offload:
+            y = exp(x)
+        
+        assert y._saved[0] is y.data
+        assert offload.spilled_bytes == 0
+    
+    def test_array_saved_twice_is_written_once(self, tmp_path):
+        offload = Offload(str(tmp_path), threshold=16)
+        x = Tensor(np.ones((4, 4)), tensor_type=TensorType.PARAMETER)
+        
+        with offload:
+            h = x + 1.0
+            y = h * h
+        
+        assert y._saved[0] is y._saved[1]
+        assert offload.spilled_bytes == h.data.nbytes
+    
+    def test_data_of_leaves_is_not_spilled(self, tmp_path):
+        offload = Offload(str(tmp_path), threshold=16)
+        x = Tensor(np.ones((4, 4)))
+        w = Tensor(np.ones((4, 4)), tensor_type=TensorType.PARAMETER)
+        
+        with offload:
+            y = x @ w
+        
+        assert y._saved[0] is x.data and y._saved[1] is w.data
+        assert offload.spilled_bytes == 0
+    
+    def test_spilled_arrays_leave_memory(self, tmp_path):
+        rng = np.random.default_rng(0)
+        weights = [Tensor(rng.standard_normal((256, 256)) / 16, tensor_type=TensorType.PARAMETER) for _ in range(4)]
+        x = Tensor(rng.standard_normal((256, 256)))
+        size = 256 * 256 * 4
+        
+        def held(offload):
+            tracemalloc.start()
+            try:
+                with offload:
+                    out = x
+                    for w in weights:
+                        out = relu(out @ w)
+                    loss = mean(out)
+                del out
+                return tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+                loss.backward()
+        
+        # The outputs of the four relu, also saved by the following products
+        assert held(contextlib.nullcontext()) >= 4 * size
+        assert held(Offload(str(tmp_path), threshold=1024)) < size / 4
+    
+    def test_keep_graph(self, tmp_path):
+        offload = Offload(str(tmp_path), threshold=1024, prefetch=2)
+        _, expected = gradients()
+        loss, actual = gradients(offload, keep_graph=True)
+        
+        loss.backward()
+        for grad, expected_grad in zip(actual, expected):
+            np.testing.assert_allclose(grad, 2 * expected_grad, rtol=1e-6)
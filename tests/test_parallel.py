@@ -0,0 +1,148 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu, sigmoid, tanh
+from src.clumsygrad.checkpoint import checkpoint
+from src.clumsygrad.fusion import fuse
+from src.clumsygrad.loss import mse_loss
+from src.clumsygrad.math import exp, mean, sum
+from src.clumsygrad.parallel import ParallelBackward
+from src.clumsygrad.pool import BufferPool
+from src.clumsygrad.tensor import Tensor, TensorType, _GradMode
+
+def make_heads(rng, heads=6, width=24):
+    x = Tensor(rng.standard_normal((32, width)), tensor_type=TensorType.PARAMETER)
+    params = [(Tensor(rng.standard_normal((width, width)) * 0.3, tensor_type=TensorType.PARAMETER),
+               Tensor(rng.standard_normal((width, 1)) * 0.3, tensor_type=TensorType.PARAMETER))
+              for _ in range(heads)]
+    return x, params
+
+@fuse
+def gate(x):
+    return sigmoid(x) * x + exp(x * 0.1)
+
+def wide_loss(x, params):
+    loss = None
+    for index, (w, v) in enumerate(params):
+        h = tanh(x @ w) if index % 2 else gate(relu(x @ w))
+        head = mean((h @ v) ** 2) + sum(h * x) * 0.01
+        loss = head if loss is None else loss + head
+    return loss
+
+def gradients(tensors):
+    return [tensor.grad.copy() for tensor in tensors]
+
+class TestParallelBackward:
+    """Test the multi-threaded backward engine against the serial one."""
+    
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_bit_identical_to_serial(self, workers):
+        x, params = make_heads(np.random.default_rng(0))
+        leaves = [x] + [p for pair in params for p in pair]
+        
+        wide_loss(x, params).backward()
+        expected = gradients(leaves)
+        for leaf in leaves:
+            leaf.grad = None
+        
+        with ParallelBackward(workers=workers, min_size=0):
+            wide_loss(x, params).backward()
+        
+        for grad, expected_grad in zip(gradients(leaves), expected):
+            np.testing.assert_array_equal(grad, expected_grad)
+    
+    def test_accumulates_across_passes(self):
+        x, params = make_heads(np.random.default_rng(1), heads=3)
+        leaves = [x] + [p for pair in params for p in pair]
+        
+        for _ in range(2):
+            wide_loss(x, params).backward()
+        expected = gradients(leaves)
+        for leaf in leaves:
+            leaf.grad = None
+        
+        with ParallelBackward(workers=3, min_size=0):
+            for _ in range(2):
+                wide_loss(x, params).backward()
+        
+        for grad, expected_grad in zip(gradients(leaves), expected):
+            np.testing.assert_array_equal(grad, expected_grad)
+    
+    def test_keep_graph_and_retain_grad(self):
+        x, params = make_heads(np.random.default_rng(2), heads=2)
+        h = relu(x @ params[0][0]).retain_grad()
+        loss = mean(h) + mean(tanh(x @ params[1][0]))
+        
+        loss.backward(keep_graph=True)
+        expected_x, expected_h = x.grad.copy(), h.grad.copy()
+        x.grad = None
+        
+        with ParallelBackward(workers=2, min_size=0):
+            loss.backward()
+        
+        np.testing.assert_array_equal(x.grad, expected_x)
+        np.testing.assert_array_equal(h.grad, 2 * expected_h)
+        assert loss._parents == ()
+    
+    def test_checkpoint_and_pool(self):
+        rng = np.random.default_rng(3)
+        x = Tensor(rng.standard_normal((8, 16)), tensor_type=TensorType.PARAMETER)
+        w = Tensor(rng.standard_normal((16, 16)) * 0.3, tensor_type=TensorType.PARAMETER)
+        
+        def loss_fn():
+            return mean(checkpoint(lambda t: tanh(t @ w), x)) + mean(sigmoid(x @ w))
+        
+        loss_fn().backward()
+        expected_x, expected_w = x.grad.copy(), w.grad.copy()
+        x.grad = w.grad = None
+        
+        with BufferPool(), ParallelBackward(workers=4, min_size=0):
+            loss_fn().backward()
+        
+        np.testing.assert_array_equal(x.grad, expected_x)
+        np.testing.assert_array_equal(w.grad, expected_w)
+    
+    def test_workers_restore_their_state(self):
+        x, params = make_heads(np.random.default_rng(5))
+        engine = ParallelBackward(workers=2, min_size=0)
+        
+        with engine:
+            with BufferPool():
+                wide_loss(x, params).backward()
+            
+            states = [engine._executor.submit(lambda: (_GradMode.allocator, _GradMode.elementwise)).result()
+                      for _ in range(4)]
+        
+        assert states == [(None, None)] * 4
+    
+    def test_errors_are_raised(self):
+        x = Tensor(np.ones((4, 4)), tensor_type=TensorType.PARAMETER)
+        y = x * 2
+        y._grad_fn = lambda tensor, grad: (np.ones((3, 3)),)
+        
+        with ParallelBackward(workers=2, min_size=0):
+            with pytest.raises(RuntimeError, match="Error in backward pass"):
+                mean(y + x).backward()
+    
+    def test_invalid_workers(self):
+        with pytest.raises(ValueError):
+            ParallelBackward(workers=0)
+    
+    def test_mse_loss(self):
+        rng = np.random.default_rng(4)
+        w = Tensor(rng.standard_normal((10, 3)), tensor_type=TensorType.PARAMETER)
+        x, y = Tensor(rng.standard_normal((5, 10))), Tensor(rng.standard_normal((5, 3)))
+        
+        mse_loss(x @ w, y).backward()
+        expected = w.grad.copy()
+        w.grad = None
+        
+        with ParallelBackward(workers=2):
+            mse_loss(x @ w, y).backward()
+        
+        np.testing.assert_array_equal(w.grad, expected)
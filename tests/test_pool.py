@@ -0,0 +1,108 @@
+import gc
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu, sigmoid, softmax, tanh
+from src.clumsygrad.loss import mse_loss
+from src.clumsygrad.math import exp, mean, sin
+from src.clumsygrad.optimizer import SGD
+from src.clumsygrad.pool import BufferPool
+from src.clumsygrad.tensor import Tensor, TensorType, _GradMode
+
+def train(steps, pool=None):
+    rng = np.random.default_rng(0)
+    w1 = Tensor(rng.standard_normal((4, 8)) * 0.5, tensor_type=TensorType.PARAMETER)
+    w2 = Tensor(rng.standard_normal((8, 2)) * 0.5, tensor_type=TensorType.PARAMETER)
+    optimizer = SGD([w1, w2], lr=0.01)
+    x = Tensor(rng.standard_normal((16, 4)))
+    y = Tensor(rng.standard_normal((16, 2)))
+    
+    def step():
+        hidden = tanh(relu(x @ w1)) + sigmoid(sin(x @ w1) * 2.0)
+        loss = mse_loss(softmax(hidden @ w2) + exp(-(hidden @ w2)), y) + mean(hidden ** 2)
+        loss.backward()
+        optimizer.step()
+        optimizer.zero_grad()
+    
+    for _ in range(steps):
+        if pool is None:
+            step()
+        else:
+            with pool:
+                step()
+    
+    return w1.data, w2.data
+
+class TestBufferPool:
+    """Test the caching allocator for operation outputs and gradients."""
+    
+    def test_training_matches_default_allocator(self):
+        pool = BufferPool()
+        expected = train(5)
+        result = train(5, pool)
+        
+        for array, expected_array in zip(result, expected):
+            np.testing.assert_array_equal(array, expected_array)
+        assert pool.hits > pool.misses
+    
+    def test_buffers_return_once_graph_is_freed(self):
+        pool = BufferPool()
+        train(1, pool)
+        misses = pool.misses
+        
+        train(3, pool)
+        assert pool.misses == misses
+    
+    def test_buffer_in_use_is_not_reused(self):
+        pool = BufferPool()
+        
+        with pool:
+            x = Tensor(np.ones((3, 3)))
+            y = x * 2
+            view = (x + 1).data[1:]
+            z = x * 3
+        
+        assert pool.misses == 3
+        np.testing.assert_array_equal(y.data, 2)
+        np.testing.assert_array_equal(view, 2)
+        np.testing.assert_array_equal(z.data, 3)
+        
+        del y
+        with pool:
+            w = x * 4
+        
+        assert pool.hits == 1
+        np.testing.assert_array_equal(view, 2)
+        np.testing.assert_array_equal(w.data, 4)
+    
+    def test_lru_eviction(self):
+        pool = BufferPool(max_bytes=2 * 4 * 10)
+        
+        for shape in [(10,), (5, 2), (10,), (2, 5)]:
+            pool.empty(shape)
+        
+        assert pool.stats() == {'hits': 1, 'misses': 3, 'evictions': 1, 'buffers': 2, 'bytes': 80}
+        
+        pool.empty((5, 2))
+        assert pool.misses == 4
+    
+    def test_keyed_by_dtype(self):
+        pool = BufferPool()
+        assert pool.empty((4,)).dtype == np.float32
+        assert pool.empty((4,), dtype=np.float64).dtype == np.float64
+        assert pool.misses == 2
+    
+    def test_context_restores_previous_allocator(self):
+        outer, inner = BufferPool(), BufferPool()
+        
+        with outer:
+            with inner:
+                assert _GradMode.allocator is inner
+            assert _GradMode.allocator is outer
+        
+        assert _GradMode.allocator is None
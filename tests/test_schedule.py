@@ -0,0 +1,90 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu, tanh
+from src.clumsygrad.math import exp, mean, sum
+from src.clumsygrad.schedule import (MemoryAwareSchedule, compare_schedules,
+                                     memory_aware_order, peak_gradient_memory)
+from src.clumsygrad.tensor import Tensor, TensorType
+
+def make_params(rng, branches, size):
+    return [[Tensor(rng.standard_normal(shape) * 0.1, tensor_type=TensorType.PARAMETER)
+             for shape in [(size, 1), (1, size), (size, 1), (1, size)]] for _ in range(branches)]
+
+def model(params):
+    loss = None
+    for a, b, c, d in params:
+        # The large gradient of the first factor is alive while the default order goes through the second one
+        branch = sum(tanh(a @ b) * sum(exp(c @ d) * 3))
+        loss = branch if loss is None else loss + branch
+    return loss
+
+def leaves(params):
+    return [p for branch in params for p in branch]
+
+class TestSchedule:
+    """Test the memory-aware order of the backward pass."""
+    
+    def test_peak_gradient_memory(self):
+        x = Tensor(np.ones(10), tensor_type=TensorType.PARAMETER)
+        y = exp(x * 2)
+        loss = sum(y)
+        
+        # At most two gradients of 10 elements are alive: y and x * 2, then x * 2 and x
+        assert peak_gradient_memory(loss._build_topo()) == 80
+    
+    def test_lowers_the_peak(self):
+        params = make_params(np.random.default_rng(0), branches=3, size=50)
+        report = compare_schedules(model(params))
+        
+        assert report['memory_aware'] < report['default']
+        assert report['memory_aware'] <= 2 * 50 * 50 * 4 + 3 * 4 * 50 * 4 + 1000
+    
+    def test_order_is_topological(self):
+        params = make_params(np.random.default_rng(1), branches=4, size=8)
+        order = memory_aware_order(model(params)._build_topo())
+        
+        position = {id(node): index for index, node in enumerate(order)}
+        assert len(position) == len(order)
+        for node in order:
+            for parent in node._parents:
+                if parent._requires_grad:
+                    assert position[id(parent)] < position[id(node)]
+    
+    def test_keeps_default_order_when_not_better(self):
+        x = Tensor(np.ones(4), tensor_type=TensorType.PARAMETER)
+        topo_order = mean(relu(x * 2))._build_topo()
+        
+        assert memory_aware_order(topo_order) == topo_order
+    
+    def test_same_gradients(self):
+        params = make_params(np.random.default_rng(2), branches=3, size=20)
+        
+        model(params).backward()
+        expected = [p.grad.copy() for p in leaves(params)]
+        for p in leaves(params):
+            p.grad = None
+        
+        with MemoryAwareSchedule():
+            loss = model(params)
+            loss.backward()
+        
+        for p, grad in zip(leaves(params), expected):
+            np.testing.assert_allclose(p.grad, grad, rtol=1e-6)
+        assert loss._parents == ()
+    
+    def test_keep_graph(self):
+        params = make_params(np.random.default_rng(3), branches=2, size=6)
+        loss = model(params)
+        
+        with MemoryAwareSchedule():
+            loss.backward(keep_graph=True)
+            first = [p.grad.copy() for p in leaves(params)]
+            loss.backward()
+        
+        for p, grad in zip(leaves(params), first):
+            np.testing.assert_allclose(p.grad, 2 * grad, rtol=1e-6)
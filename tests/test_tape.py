@@ -0,0 +1,152 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu, sigmoid, softmax, tanh
+from src.clumsygrad.loss import mae_loss, mse_loss
+from src.clumsygrad.math import abs, cos, exp, log, mean, sin, sqrt, sum, tan
+from src.clumsygrad.tape import Tape
+from src.clumsygrad.tensor import Tensor, TensorType
+
+def expression1(x):
+    return (x**2 + sin(x))*exp(cos(x))
+
+def expression2(x):
+    return log(x**3 + tan(x)) * cos(exp(x))
+
+def expression3(x):
+    return (exp(2 * x) + sin(3 * x)) * (log(x) + cos(x**2))**-1
+
+def expression4(x):
+    return (cos(4 * x) + log(x**2 + 1))**3
+
+def expression5(x):
+    return x * tan(x**0.5) - exp(sin(5 * x))
+
+def gradients(fn, *values, use_tape):
+    params = [Tensor(value, tensor_type=TensorType.PARAMETER) for value in values]
+    
+    if use_tape:
+        with Tape():
+            out = fn(*params)
+            out.backward()
+    else:
+        out = fn(*params)
+        out.backward()
+    
+    return [param.grad for param in params]
+
+class TestTapeGradients:
+    """The tape engine must produce the same gradients as Tensor.backward."""
+    
+    testing_values = [0.617, 0.591, 0.505, 0.956, 0.047, 0.128, 0.144, 0.452, 0.513, 0.749]
+    
+    @pytest.mark.parametrize("fn", [expression1, expression2, expression3, expression4, expression5])
+    def test_complex_expressions(self, fn):
+        for value in self.testing_values:
+            expected = gradients(fn, value, use_tape=False)
+            actual = gradients(fn, value, use_tape=True)
+            np.testing.assert_array_equal(actual[0], expected[0])
+    
+    def test_mlp_with_broadcasting(self):
+        rng = np.random.default_rng(0)
+        x = Tensor(rng.standard_normal((8, 4)))
+        y = Tensor(rng.standard_normal((8, 2)))
+        values = [rng.standard_normal((4, 5)), rng.standard_normal((5,)),
+                  rng.standard_normal((5, 2)), rng.standard_normal((1, 2))]
+        
+        def mlp(w1, b1, w2, b2):
+            hidden = sigmoid(tanh(relu(x @ w1 + b1)) * b1)
+            out = softmax(hidden @ w2 - b2, axis=0)
+            return mse_loss(out, y) + mae_loss(out.T().T(), y) + mean(abs(sqrt(hidden * hidden + 1)).reshape((40,)))
+        
+        expected = gradients(mlp, *values, use_tape=False)
+        actual = gradients(mlp, *values, use_tape=True)
+        
+        for actual_grad, expected_grad in zip(actual, expected):
+            np.testing.assert_array_equal(actual_grad, expected_grad)
+    
+    def test_custom_gradient(self):
+        a = Tensor([[1, 2], [3, 4]], tensor_type=TensorType.PARAMETER)
+        
+        with Tape():
+            b = a * 2
+            b.backward(np.ones((2, 2)))
+        
+        np.testing.assert_array_equal(a.grad, np.full((2, 2), 2, dtype=np.float32))
+
+class TestTapeRecording:
+    """Test the contents and lifetime of the tape."""
+    
+    def test_records_only_intermediate_ops(self):
+        x = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        c = Tensor([3.0, 4.0])
+        
+        with Tape() as tape:
+            d = c * 2       # INPUT tensor, not recorded
+            m = x * d
+            y = m + 1
+            z = sum(y)
+        
+        assert len(tape) == 3
+        assert tape.owns(z)
+        assert not tape.owns(d)
+        
+        # The INPUT operand does not require gradients and has no slot
+        assert tape._input_slots[0] == tape._slot(x)
+        assert tape._input_slots[1] == -1
+        np.testing.assert_array_equal(tape._outputs[:3], [m._tape_slot, y._tape_slot, z._tape_slot])
+    
+    def test_tape_grows(self):
+        x = Tensor([1.0], tensor_type=TensorType.PARAMETER)
+        
+        with Tape(capacity=2) as tape:
+            y = x
+            for _ in range(100):
+                y = y * 1.0 + x
+            assert len(tape) == 200
+            y.backward()
+        
+        np.testing.assert_array_equal(x.grad, np.array([101], dtype=np.float32))
+        assert len(tape) == 0
+    
+    def test_keep_graph(self):
+        x = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        
+        with Tape() as tape:
+            y = sum(x * 3)
+            y.backward(keep_graph=True)
+            assert len(tape) == 2
+            x.grad = None
+            y.backward()
+        
+        np.testing.assert_array_equal(x.grad, np.array([3, 3], dtype=np.float32))
+        assert len(tape) == 0
+        assert y._parents == ()
+    
+    def test_retain_grad(self):
+        x = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        
+        with Tape():
+            y = (x * 3).retain_grad()
+            z = y * 2
+            sum(z * z).backward()
+        
+        np.testing.assert_array_equal(y.grad, 8 * y.data)
+        assert z.grad is None
+    
+    def test_default_engine_outside_tape(self):
+        x = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        
+        with Tape() as tape:
+            y = sum(x * 3)
+        
+        assert not tape.owns(Tensor(1.0))
+        y.backward()
+        
+        np.testing.assert_array_equal(x.grad, np.array([3, 3], dtype=np.float32))
+        assert len(tape) == 2
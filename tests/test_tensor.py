@@ -1,6 +1,9 @@
 import gc
 import os
 import sys
+import threading
+import tracemalloc
+import weakref
 import psutil
 
 import numpy as np
@@ -8,9 +11,14 @@ import pytest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.clumsygrad.math import cos, exp, log, sin, sum, tan
-from src.clumsygrad.tensor import Tensor, TensorType, TensorUtils
-from src.clumsygrad.loss import mse_loss
+from src.clumsygrad.activation import relu, softmax, tanh
+from src.clumsygrad.math import cos, exp, log, mean, sin, sum, tan
+from src.clumsygrad.tensor import (Tensor, TensorType, TensorUtils,
+                                   inference_mode, is_grad_enabled, no_grad,
+                                   saved_tensors_hooks)
+from src.clumsygrad import tensor as tensor_module
+from src.clumsygrad.loss import mae_loss, mse_loss
+from src.clumsygrad.optimizer import SGD
 
 class TestTensorCreation:
     """Test tensor creation and basic properties."""
@@ -144,6 +152,19 @@ class TestMatrixOperations:
         with pytest.raises(ValueError, match="Matrix multiplication requires at least 2D tensors"):
             a @ b
     
+    def test_stacked_matrix_multiplication_backward(self):
+        rng = np.random.default_rng(0)
+        a = Tensor(rng.standard_normal((5, 3)), tensor_type=TensorType.PARAMETER)
+        b = Tensor(rng.standard_normal((4, 3, 2)), tensor_type=TensorType.PARAMETER)
+        c = a @ b
+        assert c.shape == (4, 5, 2)
+        
+        sum(c * c).backward()
+        
+        grad = 2 * c.data
+        np.testing.assert_allclose(a.grad, np.sum(grad @ np.swapaxes(b.data, -1, -2), axis=0), rtol=1e-5)
+        np.testing.assert_allclose(b.grad, np.swapaxes(a.data, -1, -2) @ grad, rtol=1e-5)
+    
     def test_transpose(self):
         a = Tensor([[1, 2, 3], [4, 5, 6]], tensor_type=TensorType.PARAMETER)
         b = a.T()
@@ -277,6 +298,297 @@ class TestBackpropagation:
         
         expected_grad = np.array([[2, 2], [2, 2]], dtype=np.float32)
         np.testing.assert_array_equal(a.grad, expected_grad)
+    
+    def test_backward_aliased_gradients_are_copied(self):
+        a = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        b = Tensor([3.0, 4.0], tensor_type=TensorType.PARAMETER)
+        c = sum(a + b)
+        
+        c.backward()
+        
+        # add_backward returns the same array for both parents and sum_backward a read-only view
+        assert a.grad is not b.grad
+        assert a.grad.flags.writeable
+        a.grad += 1
+        np.testing.assert_array_equal(b.grad, np.array([1, 1], dtype=np.float32))
+    
+    def test_backward_fan_in_accumulation(self):
+        a = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        b = sum(a * a + a * 3 + a)
+        
+        b.backward()
+        
+        np.testing.assert_array_almost_equal(a.grad, 2 * a.data + 4)
+    
+    def test_backward_deep_graph(self):
+        depth = 5 * sys.getrecursionlimit()
+        a = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        b = a
+        for _ in range(depth):
+            b = b + 1
+        c = sum(b)
+        
+        c.backward()
+        
+        np.testing.assert_array_equal(a.grad, np.array([1, 1], dtype=np.float32))
+    
+    def test_backward_keep_graph_caches_topo_order(self):
+        a = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        b = sum(a * 3)
+        
+        b.backward(keep_graph=True)
+        cached = b._topo_cache
+        assert cached is not None
+        assert cached[-1] is b
+        
+        b.backward(keep_graph=True)
+        assert b._topo_cache is cached
+        
+        b.backward()
+        assert b._topo_cache is None
+    
+    def test_backward_frees_intermediate_grads(self):
+        a = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        b = a * 2
+        c = sum(b)
+        
+        c.backward()
+        
+        assert b.grad is None
+        assert c.grad is None
+        np.testing.assert_array_equal(a.grad, np.array([2, 2], dtype=np.float32))
+    
+    def test_backward_retain_grad(self):
+        a = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        b = (a * 2).retain_grad()
+        c = sum(b * b).retain_grad()
+        
+        c.backward(keep_graph=True)
+        np.testing.assert_array_equal(b.grad, 2 * b.data)
+        np.testing.assert_array_equal(c.grad, np.array(1, dtype=np.float32))
+        np.testing.assert_array_equal(a.grad, 4 * b.data)
+        
+        # A second pass over the kept graph propagates only its own gradients
+        c.backward()
+        np.testing.assert_array_equal(b.grad, 4 * b.data)
+        np.testing.assert_array_equal(a.grad, 8 * b.data)
+    
+    def test_backward_releases_graph_eagerly(self):
+        a = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        b = exp(a * 2)
+        c = sum(b)
+        data = weakref.ref(b.data)
+        del b
+        
+        assert data() is not None
+        c.backward()
+        assert data() is None
+
+class TestSavedTensors:
+    """Test that operations keep only the arrays needed by their backward function."""
+    
+    def test_operations_save_only_what_backward_needs(self):
+        x = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        y = Tensor([3.0, 4.0], tensor_type=TensorType.PARAMETER)
+        
+        assert (x + y)._saved == ()
+        assert (x * 2)._saved == ()
+        
+        product = x * y
+        assert product._saved[0] is x.data and product._saved[1] is y.data
+        
+        exponential = exp(x)
+        assert exponential._saved[0] is exponential.data
+    
+    def test_backward_functions_save_minimal_arrays(self):
+        x = Tensor(np.ones((2, 3)))
+        w = Tensor(np.ones((3, 3)), tensor_type=TensorType.PARAMETER)
+        out = exp(x @ w + 1.0)
+        loss = sum(out)
+        
+        shifted = out._parents[0]
+        product = shifted._parents[0]
+        assert len(out._saved) == 1 and out._saved[0] is out.data
+        assert shifted._saved == ()
+        assert len(product._saved) == 2
+        assert product._saved[0] is x.data and product._saved[1] is w.data
+        assert loss._saved == ()
+        
+        loss.backward()
+        np.testing.assert_allclose(w.grad, np.full((3, 3), 2 * np.exp(4.0)), rtol=1e-6)
+    
+    def test_activations_save_their_output_only(self):
+        w = Tensor(np.eye(3), tensor_type=TensorType.PARAMETER)
+        activated = relu(Tensor(np.ones((2, 3))) @ w)
+        scaled = activated * 2.0
+        
+        assert len(activated._saved) == 1 and activated._saved[0] is activated.data
+        assert scaled._saved == ()
+    
+    def test_intermediates_keep_their_data_after_children_are_collected(self):
+        x = Tensor(np.ones((2, 3)))
+        w = Tensor(np.ones((3, 3)), tensor_type=TensorType.PARAMETER)
+        pred = relu(x @ w)
+        scaled = pred * 2.0
+        del scaled
+        z = w * 1.0
+        
+        np.testing.assert_array_equal(pred.data, np.full((2, 3), 3.0, dtype=np.float32))
+        np.testing.assert_array_equal((pred + 1.0).data, np.full((2, 3), 4.0, dtype=np.float32))
+        assert z.data is not None
+    
+    def test_referenced_intermediates_keep_their_data(self):
+        x = Tensor([1.0, -2.0], tensor_type=TensorType.PARAMETER)
+        hidden = x * 3
+        out = relu(hidden) + hidden
+        sum(out).backward()
+        
+        np.testing.assert_array_equal(hidden.data, np.array([3, -6], dtype=np.float32))
+        np.testing.assert_array_equal(x.grad, np.array([6, 3], dtype=np.float32))
+    
+    def test_saved_tensors_hooks(self):
+        packed = []
+        
+        def pack(array):
+            packed.append(array.shape)
+            return array.astype(np.float64)
+        
+        def unpack(value):
+            return value.astype(np.float32)
+        
+        x = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        with saved_tensors_hooks(pack, unpack):
+            y = exp(x) * x
+        
+        assert packed == [(2,), (2,), (2,)]
+        assert y._saved[0].dtype == np.float64
+        
+        sum(y).backward()
+        np.testing.assert_allclose(x.grad, np.exp(x.data) * (x.data + 1), rtol=1e-6)
+    
+    def test_double_transpose_of_used_tensor(self):
+        a = Tensor([[1.0, 2.0], [3.0, 4.0]], tensor_type=TensorType.PARAMETER)
+        t = (a * 2).T()
+        t * 1.0
+        
+        u = t.T()
+        np.testing.assert_array_equal(u.data, 2 * a.data)
+        
+        sum(u).backward()
+        np.testing.assert_array_equal(a.grad, np.full((2, 2), 2, dtype=np.float32))
+    
+    def test_graph_holds_only_the_saved_arrays(self):
+        rng = np.random.default_rng(0)
+        weights = [Tensor(rng.standard_normal((256, 256)) / 16, tensor_type=TensorType.PARAMETER) for _ in range(4)]
+        x = Tensor(rng.standard_normal((256, 256)))
+        size = 256 * 256 * 4
+        
+        tracemalloc.start()
+        try:
+            out = x
+            for w in weights:
+                out = tanh(out @ w + 1.0) * 0.5
+            loss = sum(out)
+            del out
+            held = tracemalloc.get_traced_memory()[0]
+            
+            tracemalloc.reset_peak()
+            loss.backward()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        
+        # The inputs of the last three products and the outputs of the four tanh
+        assert 7 * size <= held < 7.5 * size
+        # The saved arrays, the gradients of the weights and the gradients in flight
+        assert peak < 11 * size
+    
+    def test_saved_arrays_are_freed_by_backward(self):
+        w = Tensor(np.ones((3, 3)), tensor_type=TensorType.PARAMETER)
+        pred = relu(Tensor(np.ones((2, 3))) @ w)
+        loss = mse_loss(pred, Tensor(np.zeros((2, 3))))
+        data = weakref.ref(pred.data)
+        del pred
+        
+        assert data() is not None and len(loss._saved) == 2
+        loss.backward()
+        assert data() is None and loss._saved == ()
+        np.testing.assert_allclose(w.grad, np.full((3, 3), 12.0))
+    
+    def test_retain_grad_on_a_used_intermediate(self):
+        x = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        hidden = x * 3
+        out = sum(hidden * hidden)
+        hidden.retain_grad()
+        
+        out.backward()
+        np.testing.assert_array_equal(hidden.grad, 2 * hidden.data)
+        assert hidden._parents == ()
+
+class TestGradMode:
+    """Test disabling graph construction with no_grad and inference_mode."""
+    
+    def test_no_grad_builds_no_graph(self):
+        w = Tensor([[1.0, -2.0], [3.0, 4.0]], tensor_type=TensorType.PARAMETER)
+        target = Tensor([[0.0, 1.0]])
+        
+        with no_grad():
+            assert not is_grad_enabled()
+            outputs = [w + 1, w * w, w @ w, w.T(), w.reshape((4,)), -w, w ** 2,
+                       exp(w), mean(w, axis=0), relu(w), softmax(w),
+                       mse_loss(sum(w, axis=0, keepdims=True), target)]
+        
+        assert is_grad_enabled()
+        for output in outputs:
+            assert output._tensor_type == TensorType.INPUT
+            assert not output.requires_grad
+            assert output._grad_fn is None
+            assert output._parents == ()
+            assert output._extra == {}
+        
+        np.testing.assert_array_equal(outputs[2].data, w.data @ w.data)
+    
+    def test_no_grad_decorator_and_nesting(self):
+        w = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        
+        @no_grad()
+        def evaluate(x):
+            with no_grad():
+                pass
+            return x * 2
+        
+        assert evaluate(w)._tensor_type == TensorType.INPUT
+        assert is_grad_enabled()
+        assert (w * 2)._tensor_type == TensorType.INTERMEDIATE
+    
+    def test_no_grad_restores_state_on_error(self):
+        with pytest.raises(ValueError):
+            with no_grad():
+                raise ValueError("error")
+        
+        assert is_grad_enabled()
+    
+    def test_backward_of_outer_graph_inside_no_grad(self):
+        w = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        y = sum(w * 3)
+        
+        with no_grad():
+            y.backward()
+        
+        np.testing.assert_array_equal(w.grad, np.array([3, 3], dtype=np.float32))
+    
+    def test_inference_mode_forbids_backward(self):
+        w = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+        y = sum(w * 3)
+        
+        with inference_mode():
+            z = w * 3
+            with pytest.raises(RuntimeError, match="inference_mode"):
+                y.backward()
+        
+        assert z._tensor_type == TensorType.INPUT
+        y.backward()
+        np.testing.assert_array_equal(w.grad, np.array([3, 3], dtype=np.float32))
 
 class TestTensorUtils:
     """Test TensorUtils functionality."""
@@ -401,9 +713,137 @@ class TestErrorHandling:
         expected_grad = first_grad + np.array([3.0], dtype=np.float32)
         np.testing.assert_array_equal(a.grad, expected_grad)
 
+class TestThreadSafety:
+    """Test building graphs and running backward passes concurrently in several threads."""
+    
+    @staticmethod
+    def run_threads(target, count):
+        barrier = threading.Barrier(count)
+        results = [None] * count
+        errors = []
+        
+        def run(index):
+            try:
+                barrier.wait()
+                results[index] = target(index)
+            except Exception as e:
+                errors.append(e)
+        
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        
+        assert errors == []
+        return results
+    
+    @staticmethod
+    def train(seed, steps=30):
+        rng = np.random.default_rng(seed)
+        w1 = Tensor(rng.standard_normal((6, 8)) * 0.5, tensor_type=TensorType.PARAMETER)
+        w2 = Tensor(rng.standard_normal((8, 1)) * 0.5, tensor_type=TensorType.PARAMETER)
+        x = Tensor(rng.standard_normal((16, 6)))
+        y = Tensor(rng.standard_normal((16, 1)))
+        optimizer = SGD([w1, w2], lr=0.002)
+        
+        for _ in range(steps):
+            h = relu(x @ w1)
+            h = exp(h * -0.5) * h + h
+            loss = mse_loss(h @ w2, y)
+            loss.backward()
+            optimizer.step()
+            optimizer.zero_grad()
+        
+        return w1.data.copy(), w2.data.copy()
+    
+    def test_unique_ids(self):
+        ids = self.run_threads(lambda index: [Tensor([1.0])._id for _ in range(2000)], 8)
+        
+        all_ids = [tensor_id for thread_ids in ids for tensor_id in thread_ids]
+        assert len(set(all_ids)) == len(all_ids)
+    
+    def test_training_separate_models(self):
+        expected = [self.train(seed) for seed in range(8)]
+        results = self.run_threads(self.train, 8)
+        
+        for (w1, w2), (expected_w1, expected_w2) in zip(results, expected):
+            np.testing.assert_array_equal(w1, expected_w1)
+            np.testing.assert_array_equal(w2, expected_w2)
+    
+    def test_grad_mode_is_local_to_each_thread(self):
+        entered = threading.Event()
+        done = threading.Event()
+        
+        def evaluate():
+            with no_grad():
+                entered.set()
+                done.wait(timeout=5)
+        
+        thread = threading.Thread(target=evaluate)
+        thread.start()
+        entered.wait(timeout=5)
+        
+        try:
+            w = Tensor([1.0, 2.0], tensor_type=TensorType.PARAMETER)
+            assert is_grad_enabled()
+            assert (w * 2)._tensor_type == TensorType.INTERMEDIATE
+        finally:
+            done.set()
+            thread.join()
+    
+    def test_shared_decorators_restore_the_state_of_each_thread(self):
+        hooks = saved_tensors_hooks(lambda array: array, lambda value: value)
+        inside = threading.Barrier(8)
+        
+        # Every thread is inside the decorated functions at once, and leaves them in any order
+        @no_grad()
+        def evaluate():
+            inside.wait(timeout=10)
+            return is_grad_enabled()
+        
+        @hooks
+        def active_hooks():
+            inside.wait(timeout=10)
+            return tensor_module._GradMode.saved_hooks
+        
+        def run(index):
+            outer = saved_tensors_hooks(lambda array: array, lambda value: value)
+            for _ in range(50):
+                if index % 2:
+                    assert not evaluate() and is_grad_enabled()
+                    assert active_hooks() is hooks and tensor_module._GradMode.saved_hooks is None
+                else:
+                    with no_grad(), outer:
+                        assert not evaluate() and not is_grad_enabled()
+                        assert active_hooks() is hooks and tensor_module._GradMode.saved_hooks is outer
+        
+        self.run_threads(run, 8)
+    
+    def test_shared_parameters_in_inference(self):
+        rng = np.random.default_rng(0)
+        w = Tensor(rng.standard_normal((5, 5)), tensor_type=TensorType.PARAMETER)
+        inputs = [rng.standard_normal((3, 5)).astype(np.float32) for _ in range(8)]
+        
+        def serve(index):
+            outputs = []
+            for _ in range(50):
+                with inference_mode():
+                    outputs.append(softmax(relu(Tensor(inputs[index]) @ w)).data)
+            return outputs
+        
+        for index, outputs in enumerate(self.run_threads(serve, 8)):
+            for output in outputs:
+                np.testing.assert_array_equal(output, outputs[0])
+
 class TestMemoryManagement:
     """Test memory management to prevent leaks."""
-
+    
     def test_memory_leak_training_loop(self):
         """Check for memory leaks during a simple training loop."""
         
@@ -0,0 +1,181 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.clumsygrad.activation import relu, sigmoid, softmax, tanh
+from src.clumsygrad.fusion import fuse
+from src.clumsygrad.loss import mae_loss, mse_loss
+from src.clumsygrad.math import abs, cos, exp, log, mean, sin, sqrt, sum, tan
+from src.clumsygrad.tensor import Tensor, TensorType, no_grad
+from src.clumsygrad.vmap import per_example_gradients, vmap
+
+rng = np.random.default_rng(0)
+W = Tensor(rng.standard_normal((4, 5)), tensor_type=TensorType.PARAMETER)
+B = Tensor(rng.standard_normal((1, 5)), tensor_type=TensorType.PARAMETER)
+S = Tensor(rng.standard_normal((3, 4)), tensor_type=TensorType.PARAMETER)
+
+FUNCTIONS = [
+    ("add", lambda x, y: x + y),
+    ("add_broadcast", lambda x, y: x + mean(y, axis=0)),
+    ("add_scalar", lambda x, y: x + 2.0),
+    ("sub_broadcast", lambda x, y: sum(y, axis=1, keepdims=True) - x),
+    ("mul", lambda x, y: x * y * S),
+    ("mul_broadcast", lambda x, y: x * sum(y, axis=1, keepdims=True)),
+    ("mul_scalar", lambda x, y: x * 3.0),
+    ("matmul", lambda x, y: tanh(x @ W + B)),
+    ("matmul_left", lambda x, y: S.T() @ x),
+    ("transpose", lambda x, y: x.T() @ y),
+    ("power", lambda x, y: abs(x) ** 1.5),
+    ("negate", lambda x, y: -x * S),
+    ("reshape", lambda x, y: x.reshape((2, 6)) * 2.0),
+    ("sum", lambda x, y: sum(x * y, axis=0)),
+    ("sum_all", lambda x, y: sum(x * S)),
+    ("mean", lambda x, y: mean(x * y, axis=1, keepdims=True)),
+    ("mean_negative_axis", lambda x, y: mean(x * S, axis=-1)),
+    ("exp", lambda x, y: exp(x)),
+    ("log", lambda x, y: log(abs(x) + 1)),
+    ("sqrt", lambda x, y: sqrt(abs(x) + 1)),
+    ("sin_cos", lambda x, y: sin(x) * cos(S)),
+    ("tan", lambda x, y: tan(x * 0.3)),
+    ("relu", lambda x, y: relu(x + S)),
+    ("sigmoid", lambda x, y: sigmoid(x)),
+    ("softmax", lambda x, y: softmax(x * y, axis=0)),
+    ("softmax_last_axis", lambda x, y: softmax(x @ W)),
+    ("mse", lambda x, y: mse_loss(x, y)),
+    ("mae", lambda x, y: mae_loss(x + S, y)),
+]
+
+def per_example(f, xs, ys):
+    return [f(Tensor(x), Tensor(y)) for x, y in zip(xs, ys)]
+
+class TestVmap:
+    """Test vectorized functions against a loop over the examples."""
+    
+    @pytest.mark.parametrize("name, f", FUNCTIONS)
+    def test_matches_loop(self, name, f):
+        xs = rng.standard_normal((6, 3, 4)).astype(np.float32)
+        ys = rng.standard_normal((6, 3, 4)).astype(np.float32)
+        
+        result = vmap(f)(xs, ys)
+        expected = np.stack([output.data for output in per_example(f, xs, ys)])
+        
+        np.testing.assert_allclose(result.data, expected, rtol=1e-5, atol=1e-6)
+    
+    def test_in_axes(self):
+        xs = rng.standard_normal((3, 6, 4)).astype(np.float32)
+        y = rng.standard_normal((3, 4)).astype(np.float32)
+        f = lambda x, y: x * y + S
+        
+        result = vmap(f, in_axes=(1, None))(xs, y)
+        expected = np.stack([f(Tensor(xs[:, index]), Tensor(y)).data for index in range(6)])
+        
+        np.testing.assert_allclose(result.data, expected, rtol=1e-6)
+    
+    def test_multiple_outputs(self):
+        xs = rng.standard_normal((5, 3, 4)).astype(np.float32)
+        
+        total, scaled = vmap(lambda x: (sum(x), x * 2.0))(xs)
+        
+        np.testing.assert_allclose(total.data, xs.sum(axis=(1, 2)), rtol=1e-5)
+        np.testing.assert_allclose(scaled.data, xs * 2)
+    
+    def test_output_independent_of_the_batch(self):
+        result = vmap(lambda x: S * 2.0)(np.zeros((4, 2)))
+        
+        assert result.shape == (4, 3, 4)
+        np.testing.assert_allclose(result.data[2], S.data * 2)
+    
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            vmap(lambda x, y: x + y)(np.zeros((4, 2)), np.zeros((5, 2)))
+        with pytest.raises(ValueError):
+            vmap(lambda x: x, in_axes=None)(np.zeros((4, 2)))
+        with pytest.raises(ValueError):
+            vmap(lambda x, y: x, in_axes=(0,))(np.zeros((4, 2)), np.zeros((4, 2)))
+    
+    def test_unsupported_operation(self):
+        fused = fuse(lambda t: tanh(t) * 2.0)
+        
+        with pytest.raises(ValueError, match="not supported by vmap"):
+            vmap(lambda x: fused(x * S))(np.zeros((4, 3, 4)))
+
+class TestPerExampleGradients:
+    """Test per-example gradients against one backward pass per example."""
+    
+    @staticmethod
+    def loss(x, y):
+        hidden = tanh(x.reshape((1, 4)) @ W + B)
+        return mse_loss(softmax(hidden), y) + mean(hidden * hidden) * 0.1 + sum(S * S) * 0.01
+    
+    def test_matches_loop(self):
+        xs = rng.standard_normal((7, 4)).astype(np.float32)
+        ys = rng.standard_normal((7, 1, 5)).astype(np.float32)
+        parameters = [W, B, S]
+        
+        losses, gradients = per_example_gradients(self.loss, parameters)(xs, ys)
+        
+        for index in range(7):
+            for parameter in parameters:
+                parameter.grad = None
+            
+            loss = self.loss(Tensor(xs[index]), Tensor(ys[index]))
+            loss.backward()
+            
+            np.testing.assert_allclose(losses.data[index], loss.data, rtol=1e-6)
+            for parameter, gradient in zip(parameters, gradients):
+                assert gradient.shape == (7,) + parameter.shape
+                np.testing.assert_allclose(gradient[index], parameter.grad, rtol=1e-5, atol=1e-6)
+        
+        for parameter in parameters:
+            parameter.grad = None
+    
+    @pytest.mark.parametrize("name, f", FUNCTIONS)
+    def test_sum_matches_batch_gradient(self, name, f):
+        xs = rng.standard_normal((6, 3, 4)).astype(np.float32)
+        ys = rng.standard_normal((6, 3, 4)).astype(np.float32)
+        loss = lambda x, y: sum(f(x, y))
+        
+        _, gradients = per_example_gradients(loss, [W, B, S])(xs, ys)
+        
+        for parameter, gradient in zip((W, B, S), gradients):
+            expected = np.zeros(parameter.shape, dtype=np.float32)
+            for output in per_example(loss, xs, ys):
+                parameter.grad = None
+                if output.requires_grad:
+                    output.backward()
+                if parameter.grad is not None:
+                    expected += parameter.grad
+            
+            np.testing.assert_allclose(gradient.sum(axis=0), expected, rtol=1e-4, atol=1e-5)
+            parameter.grad = None
+    
+    def test_shared_parameter_argument(self):
+        xs = rng.standard_normal((5, 3)).astype(np.float32)
+        w = Tensor(rng.standard_normal((3,)), tensor_type=TensorType.PARAMETER)
+        
+        _, (gradient,) = per_example_gradients(lambda x, w: sum(x * w * w), [w], in_axes=(0, None))(xs, w)
+        
+        np.testing.assert_allclose(gradient, 2 * xs * w.data, rtol=1e-6)
+    
+    def test_grad_is_unchanged(self):
+        W.grad = None
+        per_example_gradients(self.loss, [W])(np.zeros((3, 4)), np.zeros((3, 1, 5)))
+        
+        assert W.grad is None
+    
+    def test_inside_no_grad(self):
+        xs = rng.standard_normal((4, 3)).astype(np.float32)
+        w = Tensor([1.0, 2.0, 3.0], tensor_type=TensorType.PARAMETER)
+        
+        with no_grad():
+            _, (gradient,) = per_example_gradients(lambda x: sum(x * w), [w])(xs)
+        
+        np.testing.assert_allclose(gradient, xs)
+    
+    def test_requires_single_element(self):
+        with pytest.raises(ValueError):
+            per_example_gradients(lambda x: x * W, [W])(np.zeros((2, 3, 4)))